@@ -0,0 +1,120 @@
+#Benjamin Gamman, 001439763
+"""BatchPlanner.py defines the BatchPlanner class, which plans many days' deliveries (for one or more hubs) in one run,
+importing each hub's network only once and planning independent days in parallel."""
+
+from Planner import Planner
+from profiling import Profiler
+from concurrent.futures import ProcessPoolExecutor
+
+#The networks used by a worker process, keyed by locations file, set once when the worker starts.
+_worker_networks=None
+
+def _init_worker(networks):
+    """This function stores the networks in a worker process when the process pool starts, so that every plan made by that worker shares them
+    (networks mapped from a network file are mapped again by the worker rather than copied, see DistanceMatrix.__setstate__())."""
+    #Time complexity: O(H)
+    #Space complexity: O(1)
+
+    global _worker_networks
+    _worker_networks=networks
+
+def plan_day(network, packages, settings, profile=False):
+    """This function plans one day from a shared network and returns its Planner. If profile is True, planning is profiled (see profiling.py)
+    and the Profiler's report is stored as the Planner's profile; otherwise its profile is None."""
+    #Time complexity: O(N^3)
+    #See TruckList.deliver().
+
+    planner=Planner(network, packages, **settings)
+    if profile==True:
+        with Profiler() as profiler:
+            planner.plan()
+        planner.profile=profiler.report()
+    else:
+        planner.plan()
+    return planner
+
+def _plan_worker(network_key, packages, settings, profile):
+    """This function runs in a worker process to plan one day, and returns its Planner without the shared network, which the BatchPlanner restores.
+    The day's LocationTable is returned without the network's distance matrix, neighbor index, and address index, so that only the day's O(N) data is sent back."""
+    #Time complexity: O(N^3)
+    #See TruckList.deliver().
+
+    planner=plan_day(_worker_networks[network_key], packages, settings, profile)
+    planner.locations_source=None
+    planner.__dict__.pop('network', None)
+    planner.locations.distances=None
+    planner.locations.neighbors=None
+    planner.locations.address_index=None
+    return planner
+
+class BatchPlanner:
+    """The BatchPlanner class holds a batch of days to plan, each with its own packages file and settings (a day at another hub uses that hub's locations file).
+    Each hub's network is imported once (see Planner.network) and shared by every day planned from it, while each day's locations, packages, loads, and trucks are its own
+    (see LocationTable.copy()). If workers is greater than 1, days are planned in parallel in that many worker processes.
+    If profile is True, each day's planning is profiled, so that the stages and counts that make a day slow to plan can be compared between days (see plan_day())."""
+    #Space complexity: O(H*N^2+D*N)
+    #Each of H networks is held once, along with the O(N) data of each of D days.
+
+    def __init__(self, workers=1, profile=False, **settings):
+        """Initializes an empty BatchPlanner. Any other keyword arguments are settings of Planner.__init__() used by every day unless the day overrides them."""
+        #Time complexity: O(1)
+        #Space complexity: O(1)
+
+        self.workers=workers
+        self.profile=profile
+        self.settings=settings
+        self.networks={}
+        self.days={}
+
+    def add(self, name, packages, locations='locations.csv', **settings):
+        """This method adds a day to plan under the provided name, with its packages (a csv file path, or a file-like object holding csv data) and its hub's locations csv file.
+        Keyword arguments override the BatchPlanner's settings for this day only (such as start_time or num_trucks).
+        When days are planned in parallel, the packages and settings are sent to a worker process, so a file-like object must be one that can be pickled (such as io.StringIO)."""
+        #Time complexity: O(1)
+
+        if name in self.days:
+            raise ValueError('A day named "'+str(name)+'" has already been added.')
+        day_settings=dict(self.settings)
+        day_settings.update(settings)
+        self.days[name]=(locations, packages, day_settings)
+
+    def network(self, locations):
+        """This method returns the network imported from a locations csv file, importing it the first time it is requested."""
+        #Time complexity: O(N) from a compiled network file, O(N^2) otherwise
+        #See Planner.network.
+
+        if locations not in self.networks:
+            self.networks[locations]=Planner(locations).network
+        return self.networks[locations]
+
+    def run(self):
+        """This method plans every day and returns a dictionary of their Planners, keyed by name, whose plans have been computed (see Planner.plan()).
+        All networks are imported before any day is planned, so that worker processes receive them already imported."""
+        #Time complexity: O(D*N^3/W)
+        #Each of D days is planned once (see TruckList.deliver()), divided between W worker processes.
+        #Space complexity: O(H*N^2+D*N)
+
+        for name in self.days:
+            self.network(self.days[name][0])
+        planners={}
+        if self.workers<=1 or len(self.days)<=1:
+            for name in self.days:
+                locations, packages, settings=self.days[name]
+                planners[name]=plan_day(self.networks[locations], packages, settings, self.profile)
+            return planners
+
+        #Each worker's Planner is returned without the network, which is restored here (along with its plan's distance matrix, neighbor index, and address index)
+        #so that the returned Planners share the networks held by the BatchPlanner.
+        futures={}
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker, initargs=(self.networks,)) as pool:
+            for name in self.days:
+                locations, packages, settings=self.days[name]
+                futures[name]=pool.submit(_plan_worker, locations, packages, settings, self.profile)
+            for name in futures:
+                planners[name]=futures[name].result()
+                network=self.networks[self.days[name][0]]
+                planners[name].locations_source=network
+                planners[name].locations.distances=network.distances
+                planners[name].locations.neighbors=network.neighbors
+                planners[name].locations.address_index=network.address_index
+        return planners
@@ -0,0 +1,281 @@
+#Benjamin Gamman, 001439763
+"""DistanceMatrix.py defines the DistanceMatrix class, a dense matrix of distances between locations with batched query methods."""
+
+from array import array
+import mmap
+
+#NumPy is optional. If it is installed, the matrix is stored as a dense two-dimensional array and the batched queries below are vectorized;
+#otherwise each row is stored as a typed array from the standard library and the same queries are answered with plain loops over a row.
+try:
+    import numpy
+except ImportError:
+    numpy=None
+
+def map_file(path):
+    """This function maps a file into memory read-only and returns the mapping, whose pages are shared by every process mapping the same file."""
+    #Time complexity: O(1)
+    #Pages of the file are only read from disk when they are first accessed.
+    with open(path, 'rb') as f:
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+class DistanceMatrix:
+    """The DistanceMatrix class stores the distance between every pair of locations, indexed by location key, and answers row, nearest-neighbor, and radius queries."""
+    #Space complexity: O(N^2)
+    #One entry is stored for each pair of locations.
+
+    def __init__(self, size, dtype='float64', backend=None):
+        """Initializes a DistanceMatrix of the specified size filled with zeroes, using NumPy if available (or if requested with backend='numpy') and typed arrays otherwise."""
+        #Time complexity: O(N^2)
+        #Space complexity: O(N^2)
+        #Every entry of the matrix is allocated and zeroed.
+
+        if backend is None:
+            backend='numpy' if numpy is not None else 'python'
+        if backend=='numpy' and numpy is None:
+            raise ValueError('The numpy backend was requested but NumPy is not installed.')
+        if dtype not in ('float32', 'float64'):
+            raise ValueError('Unsupported distance dtype: '+str(dtype))
+        self.size=size
+        self.dtype=dtype
+        self.backend=backend
+        if backend=='numpy':
+            self.array=numpy.zeros((size, size), dtype=dtype)
+            self.rows=list(self.array)
+        else:
+            self.array=None
+            typecode='f' if dtype=='float32' else 'd'
+            self.rows=[array(typecode, bytes(size*array(typecode).itemsize)) for i in range(size)]
+        self.buffer=None
+        self.source=None
+
+    @classmethod
+    def from_buffer(cls, buffer, size, dtype='float64', backend=None, offset=0, source=None):
+        """This method returns a DistanceMatrix whose entries are read directly from a buffer (such as a memory-mapped file) holding the full matrix row by row, starting at the offset, without copying it.
+        If source is provided (the path of a mapped file and the offset), the matrix is mapped again from that file when unpickled, rather than its entries being copied."""
+        #Time complexity: O(N)
+        #Only a view of each row is created; entries are read from the buffer when accessed.
+        #Space complexity: O(N)
+
+        matrix=cls.__new__(cls)
+        matrix.map_buffer(buffer, size, dtype, backend, offset)
+        matrix.source=source
+        return matrix
+
+    def map_buffer(self, buffer, size, dtype, backend, offset):
+        """This method sets the matrix to read its entries from a buffer, as a NumPy array or as a memoryview of each row depending on the backend."""
+        #Time complexity: O(N)
+        #Space complexity: O(N)
+
+        if backend is None:
+            backend='numpy' if numpy is not None else 'python'
+        if backend=='numpy' and numpy is None:
+            raise ValueError('The numpy backend was requested but NumPy is not installed.')
+        self.size=size
+        self.dtype=dtype
+        self.backend=backend
+        self.buffer=buffer
+        if backend=='numpy':
+            self.array=numpy.frombuffer(buffer, dtype=dtype, count=size*size, offset=offset).reshape((size, size))
+            self.rows=list(self.array)
+        else:
+            typecode='f' if dtype=='float32' else 'd'
+            entries=memoryview(buffer)[offset:offset+size*size*array(typecode).itemsize].cast(typecode)
+            self.array=None
+            self.rows=[entries[i*size:(i+1)*size] for i in range(size)]
+
+    def __getstate__(self):
+        """Returns the matrix's data for pickling (such as when it is sent to a worker process). A matrix mapped from a file is pickled as the file's path and offset,
+        and a NumPy matrix without its row views, which are recreated when unpickled."""
+        state=dict(self.__dict__)
+        state['buffer']=None
+        if self.source is not None:
+            state['array']=None
+            state['rows']=None
+        elif self.backend=='numpy':
+            state['rows']=None
+        return state
+
+    def __setstate__(self, state):
+        """Restores the matrix's data when unpickled, mapping its file again if it was mapped from one."""
+        self.__dict__.update(state)
+        if self.source is not None:
+            self.map_buffer(map_file(self.source[0]), self.size, self.dtype, self.backend, self.source[1])
+        elif self.backend=='numpy':
+            self.rows=list(self.array)
+
+    def to_bytes(self):
+        """This method returns the entries of the matrix as bytes, row by row, in the layout read by from_buffer()."""
+        #Time complexity: O(N^2)
+        #Space complexity: O(N^2)
+
+        if self.backend=='numpy':
+            return self.array.tobytes()
+        return b''.join([row.tobytes() for row in self.rows])
+
+    @classmethod
+    def from_triangular(cls, rows, dtype='float64', backend=None):
+        """This method builds a symmetric DistanceMatrix from a list of rows in which only one half of the matrix is filled in (missing entries are None)."""
+        #Time complexity: O(N^2)
+        #Each entry of the matrix is filled once, either from the provided half or from its mirror entry.
+        #Space complexity: O(N^2)
+
+        matrix=cls(len(rows), dtype, backend)
+        n=matrix.size
+        if matrix.backend=='numpy':
+            #The provided rows are copied into an array with missing entries as NaN, which are then filled from the transposed array in a single vectorized step
+            #(so entry[i][j]=entry[j][i], making the table bi-directional).
+            full=numpy.full((n, n), numpy.nan, dtype='float64')
+            for i in range(n):
+                given=[numpy.nan if d is None else d for d in rows[i][:n]]
+                full[i, :len(given)]=given
+            full=numpy.where(numpy.isnan(full), full.T, full)
+            matrix.array[:, :]=full
+        else:
+            #Each row is built from the provided entries, taking the mirror entry from the other half of the matrix wherever one is missing, and then converted to a typed array in one step.
+            for i in range(n):
+                given=rows[i]
+                m=min(len(given), n)
+                matrix.rows[i]=array(matrix.rows[i].typecode, [given[j] if j<m and given[j] is not None else rows[j][i] for j in range(n)])
+        return matrix
+
+    def __len__(self):
+        """Returns the number of locations covered by the matrix."""
+        return self.size
+
+    def __getitem__(self, key):
+        """Returns the row of distances from the location with the provided key, so that entries can be accessed as matrix[i][j]."""
+        #Time complexity: O(1)
+        #Rows are stored (or viewed) individually, so no copying is done.
+        return self.rows[key]
+
+    def row(self, key):
+        """This method returns the row of distances from the location with the provided key to every other location."""
+        #Time complexity: O(1)
+        return self.rows[key]
+
+    def row_sums(self):
+        """This method returns a list of the sum of each row of the matrix (the total distance from each location to all others)."""
+        #Time complexity: O(N^2)
+        #Space complexity: O(N)
+        if self.backend=='numpy':
+            return self.array.sum(axis=1, dtype='float64').tolist()
+        return [sum(row) for row in self.rows]
+
+    def nearest(self, origin, candidates, tolerance=0.001):
+        """This method returns the key of the candidate location nearest to the origin, or None if there are no candidates.
+        Candidates within the provided tolerance of the shortest distance are treated as tied, and the first of them (in the order provided) is returned."""
+        #Time complexity: O(N)
+        #The distance to each candidate is read once to find the minimum, then the candidates are scanned again for the first one within the tolerance of that minimum.
+        #Space complexity: O(N)
+
+        candidates=list(candidates)
+        if candidates==[]:
+            return None
+        if self.backend=='numpy':
+            dists=self.array[origin, candidates]
+            return candidates[int(numpy.argmax(dists<=dists.min()+tolerance))]
+        row=self.rows[origin]
+        shortest=min([row[c] for c in candidates])
+        for c in candidates:
+            if row[c]<=shortest+tolerance:
+                return c
+
+    def within(self, sources, radius, candidates=None):
+        """This method returns a sorted list of the keys of all locations closer than the provided radius to any of the source locations.
+        If a collection of candidate keys is provided, only those locations are considered."""
+        #Time complexity: O(S*N)
+        #The row of each of S source locations is compared against the radius, either in one vectorized step or with a loop per row.
+        #Space complexity: O(N)
+
+        sources=list(sources)
+        if sources==[]:
+            return []
+        if self.backend=='numpy':
+            mask=(self.array[sources]<radius).any(axis=0)
+            if candidates is not None:
+                allowed=numpy.zeros(self.size, dtype=bool)
+                allowed[list(candidates)]=True
+                mask&=allowed
+            return numpy.flatnonzero(mask).tolist()
+        found=set()
+        if candidates is None:
+            keys=range(self.size)
+        else:
+            keys=list(candidates)
+        for s in sources:
+            row=self.rows[s]
+            for k in keys:
+                if row[k]<radius:
+                    found.add(k)
+        return sorted(found)
+
+    def assign(self, centers, keys):
+        """This method returns, for each of the provided location keys, the index (in the list of centers) of the center location nearest to it."""
+        #Time complexity: O(K*N)
+        #The distance from each of K centers to each of N locations is compared, either in one vectorized step or with a loop per location.
+        #Space complexity: O(N)
+
+        keys=list(keys)
+        if self.backend=='numpy':
+            return self.array[numpy.ix_(list(centers), keys)].argmin(axis=0).tolist()
+        rows=[self.rows[c] for c in centers]
+        nearest=[]
+        for k in keys:
+            best=0
+            for i in range(1, len(rows)):
+                if rows[i][k]<rows[best][k]:
+                    best=i
+            nearest.append(best)
+        return nearest
+
+    def kmedoids(self, keys, k, iterations=10, candidates=16):
+        """This method partitions the provided location keys into k clusters around medoids (the member of each cluster with the least total distance to the others),
+        and returns a tuple of the list of medoids and the list of each key's cluster index.
+        The first medoid is the location furthest from the first key provided, and each following one the location furthest from those already chosen.
+        When medoids are updated, only the members nearest to the current medoid are tried as replacements, which keeps each iteration linear in the number of locations."""
+        #Time complexity: O(I*K*N)
+        #Each of I iterations assigns N locations to the nearest of K medoids, then tries a fixed number of candidate medoids for each cluster, each costing O(cluster size).
+        #Space complexity: O(N)
+
+        keys=list(keys)
+        if keys==[]:
+            return [], []
+        k=min(k, len(keys))
+        row=self.rows[keys[0]]
+        first_dist=[row[j] for j in keys]
+        medoids=[keys[first_dist.index(max(first_dist))]]
+        row=self.rows[medoids[0]]
+        nearest_dist=[row[j] for j in keys]
+        while len(medoids)<k:
+            far=nearest_dist.index(max(nearest_dist))
+            medoids.append(keys[far])
+            row=self.rows[keys[far]]
+            for i in range(len(keys)):
+                if row[keys[i]]<nearest_dist[i]:
+                    nearest_dist[i]=row[keys[i]]
+        clusters=self.assign(medoids, keys)
+        for iteration in range(iterations):
+            members=[[] for m in medoids]
+            for i in range(len(keys)):
+                members[clusters[i]].append(keys[i])
+            changed=False
+            for c in range(len(medoids)):
+                if members[c]==[]:
+                    continue
+                row=self.rows[medoids[c]]
+                tried=sorted(members[c], key=row.__getitem__)[:candidates]
+                best=medoids[c]
+                best_cost=sum([row[j] for j in members[c]])
+                for t in tried:
+                    t_row=self.rows[t]
+                    cost=sum([t_row[j] for j in members[c]])
+                    if cost<best_cost-0.000001:
+                        best=t
+                        best_cost=cost
+                if best!=medoids[c]:
+                    medoids[c]=best
+                    changed=True
+            if changed==False:
+                break
+            clusters=self.assign(medoids, keys)
+        return medoids, clusters
@@ -0,0 +1,170 @@
+#Benjamin Gamman, 001439763
+"""Feasibility.py defines the FeasibilityReport class, which records whether a delivered plan met its constraints (deadlines, truck requirements, bundles, delays, and load capacities),
+the check_plan() function that computes it, and the DeadlineOracle class, which counts a tour's late stops incrementally for route improvement."""
+
+from timemath import calc_time
+from timemath import format_time
+
+class FeasibilityReport:
+    """The FeasibilityReport class holds the constraint violations found in a delivered plan by check_plan(), one list for each kind of violation:
+    late (packages delivered after their deadlines, as tuples of package ID, deadline, and delivery time), undelivered (IDs of packages with no delivery time),
+    truck (packages on a load assigned to a different truck than they require, as tuples of package ID, required truck, and assigned truck),
+    split_bundles (pairs of IDs of bundled packages on different loads), early (packages on loads leaving the hub before they arrive, as tuples of package ID, delay time, and departure time),
+    and overloaded (loads holding more packages than their capacity, as tuples of load label, number of packages, and capacity).
+    It also holds the plan's total miles, the time the last truck returns to the hub, and the greatest lateness of any package, in seconds."""
+    #Space complexity: O(V)
+    #One entry is held for each of V violations.
+
+    def __init__(self):
+        """Initializes a FeasibilityReport with no violations."""
+        #Time complexity: O(1)
+        #Space complexity: O(1)
+
+        self.late=[]
+        self.undelivered=[]
+        self.truck=[]
+        self.split_bundles=[]
+        self.early=[]
+        self.overloaded=[]
+        self.miles=0.0
+        self.finish_time=0
+        self.max_lateness=0
+
+    def violations(self):
+        """This method returns the total number of violations of every kind."""
+        #Time complexity: O(1)
+        return len(self.late)+len(self.undelivered)+len(self.truck)+len(self.split_bundles)+len(self.early)+len(self.overloaded)
+
+    def feasible(self):
+        """This method returns True if the plan met every constraint."""
+        #Time complexity: O(1)
+        return self.violations()==0
+
+    def as_dict(self):
+        """This method returns the report as a dictionary of lists and numbers, as can be written as JSON."""
+        #Time complexity: O(V)
+        #Space complexity: O(V)
+
+        return {'feasible':self.feasible(), 'miles':round(self.miles, 1), 'finish_time':self.finish_time, 'max_lateness':self.max_lateness,
+                'late':[list(v) for v in self.late], 'undelivered':list(self.undelivered), 'truck':[list(v) for v in self.truck],
+                'split_bundles':[list(v) for v in self.split_bundles], 'early':[list(v) for v in self.early], 'overloaded':[list(v) for v in self.overloaded]}
+
+    def write(self, sink):
+        """This method writes the report as text to a file-like object, one line per violation after a summary line."""
+        #Time complexity: O(V)
+
+        if self.feasible()==True:
+            summary='Feasible'
+        elif self.violations()==1:
+            summary='1 violation'
+        else:
+            summary=str(self.violations())+' violations'
+        sink.write(summary+': '+str(round(self.miles, 1))+' miles, finished at '
+                   +format_time(self.finish_time, '%I:%M %p')+'\n')
+        for id, deadline, delivery_time in self.late:
+            sink.write('Package '+str(id)+' was delivered at '+format_time(delivery_time, '%I:%M %p')+', after its deadline of '+format_time(deadline, '%I:%M %p')+'\n')
+        for id in self.undelivered:
+            sink.write('Package '+str(id)+' was not delivered\n')
+        for id, required, assigned in self.truck:
+            sink.write('Package '+str(id)+' must be on truck '+str(required)+', but its load is on truck '+str(assigned)+'\n')
+        for id, other in self.split_bundles:
+            sink.write('Package '+str(id)+' must be delivered with package '+str(other)+', but they are on different loads\n')
+        for id, delay_time, departure_time in self.early:
+            sink.write('Package '+str(id)+' arrives at '+format_time(delay_time, '%I:%M %p')+', but its load leaves at '+format_time(departure_time, '%I:%M %p')+'\n')
+        for label, count, capacity in self.overloaded:
+            sink.write('Load '+label+' holds '+str(count)+' packages, more than its capacity of '+str(capacity)+'\n')
+
+def check_plan(packages, loads):
+    """This function checks a delivered plan (see TruckList.deliver()) against its constraints and returns a FeasibilityReport of the violations found.
+    Each load's route is read once for its mileage and end time, and each of its packages is checked once, with bundled packages compared by the index of the load holding them."""
+    #Time complexity: O(N+B+S)
+    #Each of N packages and B bundle connections is checked once, and the end of each route (S stops in total) is read in O(1) time.
+    #Space complexity: O(V)
+
+    report=FeasibilityReport()
+    loaded=0
+    for load in loads.list:
+        if len(load.route)>0:
+            report.miles+=load.route.distances[len(load.route)-1]
+            report.finish_time=max(report.finish_time, load.route.times[len(load.route)-1])
+        if len(load.package_list)>load.capacity:
+            report.overloaded.append((load.label, len(load.package_list), load.capacity))
+        for id in load.package_list:
+            loaded+=1
+            p=packages.table[id]
+            if p.delivery_time==0:
+                report.undelivered.append(id)
+            elif p.deadline!=0 and p.delivery_time>p.deadline:
+                report.late.append((id, p.deadline, p.delivery_time))
+                report.max_lateness=max(report.max_lateness, p.delivery_time-p.deadline)
+            if p.truck_requirement!=0 and p.truck_requirement!=load.truck_assigned:
+                report.truck.append((id, p.truck_requirement, load.truck_assigned))
+            if p.delay_time>load.departure_time:
+                report.early.append((id, p.delay_time, load.departure_time))
+            for other in p.bundle:
+                if other>id and packages.table[other] is not None and packages.table[other].load_ind!=load.index:
+                    report.split_bundles.append((id, other))
+
+    #Packages not held by any load were never delivered. The whole table is only scanned for them if the loads hold fewer packages than it does.
+    if loaded<len(packages.table)-1:
+        for p in packages.table[1:]:
+            if p is not None and p.load_ind<0:
+                report.undelivered.append(p.id)
+    return report
+
+class DeadlineOracle:
+    """The DeadlineOracle class counts the stops of a tour (a list of location keys starting at the hub) that are reached after their location's deadline, and keeps the distance travelled and number of late stops up to each position of the current tour. A changed tour that keeps the current tour's stops up to some position
+    (as a 2-opt or Or-opt move does) is then only checked from that position on, giving exactly the same count as checking it in full."""
+    #Space complexity: O(N)
+    #Two values are kept for each of N positions in the tour.
+
+    def __init__(self, tour, locations, departure_time, speed_mph):
+        """Initializes the DeadlineOracle with its current tour, and the departure time and speed its stops are reached at."""
+        #Time complexity: O(N)
+        #Space complexity: O(N)
+
+        self.locations=locations
+        self.departure_time=departure_time
+        self.speed_mph=speed_mph
+        self.tour=[]
+        self.distances=[0.0]
+        self.late_counts=[0]
+        self.accept(tour, 0)
+
+    def late(self):
+        """This method returns the number of late stops on the current tour."""
+        #Time complexity: O(1)
+        return self.late_counts[len(self.late_counts)-1]
+
+    def late_with(self, tour, start):
+        """This method returns the number of late stops on a tour that has the same stops as the current tour up to position start."""
+        #Time complexity: O(N-start)
+        #Only the stops after position start are checked.
+
+        return self.scan(tour, start, None, None)
+
+    def accept(self, tour, start):
+        """This method makes a tour that has the same stops as the current tour up to position start the current tour."""
+        #Time complexity: O(N-start)
+
+        del self.distances[start+1:]
+        del self.late_counts[start+1:]
+        self.scan(tour, start, self.distances, self.late_counts)
+        self.tour=tour
+
+    def scan(self, tour, start, distances, late_counts):
+        """This method returns the number of late stops on a tour that has the same stops as the current tour up to position start, checking each stop after that position.
+        If lists are provided for distances and late_counts, the distance travelled and number of late stops up to each of those stops are appended to them."""
+        #Time complexity: O(N-start)
+
+        late=self.late_counts[start]
+        dist=self.distances[start]
+        for i in range(start+1, len(tour)):
+            dist+=self.locations.distances[tour[i-1]][tour[i]]
+            deadline=self.locations.table[tour[i]].deadline
+            if deadline!=0 and self.departure_time+calc_time(dist, self.speed_mph)>deadline:
+                late+=1
+            if distances is not None:
+                distances.append(dist)
+                late_counts.append(late)
+        return late
@@ -5,8 +5,14 @@ from Package import Package
 from Package import PackageTable
 from Location import Location
 from Location import LocationTable
-from datetime import time
+from timemath import make_time
+from timemath import format_time
+from timemath import calc_time
+from localsearch import two_opt
+from Report import TextReportWriter
+from Route import Route
 from math import ceil
+import sys
 
 class Load:
     """The Load class holds information about one load of packages to be delivered."""
@@ -25,73 +31,75 @@ class Load:
         self.package_list=[]
         self.truck_requirement=0
         self.truck_assigned=0
-        self.departure_time=time(0,0)
-        self.route=[]
+        self.departure_time=0
+        self.route=Route()
         self.capacity=capacity
+        self.index=-1
 
     def print_route(self, locations, packages):
         """This method prints the time, distance, location, and packages delivered at each stop for one load of packages."""
         #Space Complexity: O(N^2)
         #The method accesses the PackageTable and LocationTable objects, which are each O(N^2).
-        #Time complexity: O(N^2)
-        #The method loops through print commands for each stop in a load's route list, and through each package in the load's package list within that.
-        #The nested loops, each of which has potentially O(N) time complexity, multiply to O(N^2).
-
-        print(self.label+' Load'+', '+'Truck '+str(self.truck_assigned))
-        print('     Time:        Distance:      Stop Address:                   Packages Delivered:')
-        for stop in self.route:
-            print('     '+str(stop[4])+'     '+'{0:>4.1f}'.format(stop[2])+' miles     '
-                +'{0:<29}'.format(locations.table[stop[0]].address[:29]), end='   ')
-            for id in self.package_list:
-                if packages.table[id].delivery_time==stop[4]:
-                    print('#'+str(id), end='  ')
-            print()
-        print()
+        #Time complexity: O(N)
+        #The load's packages are first grouped by the time they were delivered, so that each stop's packages are found with one lookup rather than by checking every package in the load
+        #(see Report.py). Each stop and package is then printed once.
+
+        writer=TextReportWriter(sys.stdout)
+        writer.write_route(self, locations, packages)
+        writer.flush()
         
-    def add(self, package, packages, locations, loadslist):
-        """Adds the specified Package object to the specific load, and recursively adds bundled packages."""
-        #Space Complexity: O(N^2)
-        #The method accesses the PackageTable and LocationTable objects, which are each O(N^2).
-        #Time complexity: O(N^2)
-        #The add method can call itself recursively, but also has safeguard checks built-in to only do so if the target package is not already sorted.
-        #This means that while a call to the function not resulting in recursion would have time complexity O(N) (checking each other package),
-        #a call triggering recursion will still only have worst case time and space complexities of O(N2).
-        #This is because in a worst case in which a package is connected to every other package by either bundle or shared location,
-        #the function will end up calling itself for each other package, but not calling itself for the same packages repeatedly,
-        #for a total of O(N) checks made by each of O(N) packages for a maximum of O(N^2) time complexity.
-        #Because of the check that the package has not already been sorted, any subsequent calls after that worst case will only have O(1) time complexity though,
-        #as all packages would have been sorted.
+    def add(self, package, packages):
+        """Adds the specified Package object to the specific load, along with every package that must be loaded with it, and returns True if they were added."""
+        #Space Complexity: O(N)
+        #The method builds a list of the packages to be added, which could include every package.
+        #Time complexity: O(G)
+        #The groups of packages that must be loaded together (bundles and packages going to the same location) were precomputed by PackageTable.build_groups(),
+        #so the method only collects the members of the package's group (and of any groups linked to it), G packages in total, and adds them in one iterative step.
         
-        #First checks that the package selected is not yet sorted (assigned to a load), that the load is not already at capacity,
-        #and that the package is not required to be on a different truck than that assigned to the load.
-        #If accepted, the package's ID is added to the load's list of packages and the load's index in LoadList is attached to the Package object,
+        #First checks that the package selected is not yet sorted (assigned to a load).
+        #Then collects the unsorted packages in its group, along with those in groups linked to it by a delayed package's location, which must all be added together.
+        if package.sorted==True:
+            return False
+        roots=[packages.group[package.id]]
+        found=set(roots)
+        i=0
+        while i<len(roots):
+            for root in packages.group_links.get(roots[i], []):
+                if root not in found:
+                    found.add(root)
+                    roots.append(root)
+            i+=1
+        members=[package.id]
+        truck_requirement=self.truck_requirement
+        for root in roots:
+            for id in packages.group_members[root]:
+                p=packages.table[id]
+                if p.sorted==True or id==package.id:
+                    continue
+                members.append(id)
+        for id in members:
+            p=packages.table[id]
+            if p.truck_requirement!=0:
+                if truck_requirement==0:
+                    truck_requirement=p.truck_requirement
+                elif truck_requirement!=p.truck_requirement:
+                    return False
+
+        #Checks that the load has room for the whole group and that no package in it is required to be on a different truck than that assigned to the load.
+        #If accepted, each package's ID is added to the load's list of packages and the load's index in LoadList is attached to the Package object,
         #so that the Load's information can be accessed using the Package object later.
-        if (package.sorted==False and len(self.package_list)<self.capacity
-            and (self.truck_requirement==0
-            or package.truck_requirement==0
-            or self.truck_requirement==package.truck_requirement)):
-                self.package_list.append(package.id)
-                package.load_ind=loadslist.index(self)
-                package.sorted=True                    
-                
-                #If the load does not have a truck requirement already and the package does, sets the same value for the load.
-                if self.truck_requirement==0 and package.truck_requirement!=0:
-                    self.truck_requirement=package.truck_requirement
-
-                #If the package has an associated bundle, recursively adds those packages.
-                if package.bundle!=set():
-                    for id in package.bundle:
-                        if packages.table[id].sorted==False and len(self.package_list)<self.capacity:
-                            self.add(packages.table[id], packages, locations, loadslist)
-
-                #If the package's destination key indicates a known address, adds that location to the load's stops.
-                #Then recursively adds other packages with the same destination, provided they are not delayed.
-                if package.destination>0:
-                    self.stops.add(package.destination)
-                    for id in locations.table[package.destination].package_list:
-                        if (packages.table[id].delay_time==time(0,0)
-                        and packages.table[id].sorted==False and len(self.package_list)<self.capacity):
-                            self.add(packages.table[id], packages, locations, loadslist)
+        #Known destinations are added to the load's stops, and the load takes on the group's truck requirement if it did not have one already.
+        if len(self.package_list)+len(members)>self.capacity:
+            return False
+        for id in members:
+            p=packages.table[id]
+            self.package_list.append(id)
+            p.load_ind=self.index
+            p.sorted=True
+            if p.destination>0:
+                self.stops.add(p.destination)
+        self.truck_requirement=truck_requirement
+        return True
 
 class LoadList:
     """The LoadList class holds a list of all loads into which packages are sorted."""
@@ -115,14 +123,24 @@ class LoadList:
         #Each Load object takes O(1) time to initialize, so O(N) time is used to create a variable number of them.
         
         self.list=[]
+        self.capacity=load_capacity
         min_loads=ceil(num_packages/load_capacity)
         for i in range(min_loads):
             if len(labels)>i:
                 next_label=labels[i]
             else:
                 next_label='Load '+str(i+1)
-            new_load=Load(load_capacity, next_label)
-            self.list.append(new_load)
+            self.append_load(load_capacity, next_label)
+
+    def append_load(self, capacity, label):
+        """This method creates a new Load with the specified capacity and label, records its index in the LoadList on the Load itself, and adds it to the end of the list."""
+        #Space Complexity: O(1)
+        #Time complexity: O(1)
+
+        new_load=Load(capacity, label)
+        new_load.index=len(self.list)
+        self.list.append(new_load)
+        return new_load
 
     def sort(self, packages, locations):
         """This method sorts all of the packages in the provided PackagesList object into loads to be delivered together."""
@@ -132,36 +150,36 @@ class LoadList:
         #The most complex portion of the method uses nested loops to check for locations near a load's existing stops
         #and add those locations' packages to the load by calling the Load.add(Package) method.
         #These loops can be reduced to "for at most the remaining capacity of the load, add qualifying package."
-        #The time complexity of the add method may be O(N^2) for one worst case scenario (with maximum recursion), but any subsequent calls would then be O(1),
-        #else it could execute repeated calls each at O(N).
-        #So these loops could execute a worst case of 1*O(N^2)+N*O(1)=O(N^2) or N*O(N)=O(N^2), in either case giving the loop O(N^2) time complexity.
+        #Locations near each stop are found with the LocationTable's neighbor index in O(log(N)+K log(K)) time rather than by checking every location.
+        #The add method is O(G) for a group of G packages, and each package is added only once, so the adds total O(N) across the whole sort,
+        #but the loops may still check O(N) packages O(N) times, giving the loop O(N^2) time complexity.
         #That s the most complex portion of the method, so its overall time complexity is also O(N^2).
 
         #The algorithm I designed requires three loads, so this generates additional loads if less were created initially.
         while len(self.list)<3:
-            new_load=Load(self.list[0].capacity, 'Load '+str(len(self.list)+1))
-            self.list.append(new_load)
+            self.append_load(self.list[0].capacity, 'Load '+str(len(self.list)+1))
 
         #Packages with deadlines before 10:30 are sorted into the first load, to ensure they make the early deadline on time.
-        #Dependencies (bundled packages or those going to the same location) are also added automatically by recursive calls in the add method.
+        #Dependencies (bundled packages or those going to the same location) are also added automatically by the add method.
         for p in packages.table[1:]:
-            if p.deadline!=time(0,0) and p.deadline<time(10,30):
-                self.list[0].add(p, packages, locations, self.list)
+            if p.deadline!=0 and p.deadline<make_time(10,30):
+                self.list[0].add(p, packages)
 
         #Packages with destinations in ring 2 and within 3 miles of already-added stops (and with no delays at the location) are added to the first load.
         #The first load will have to range far from the hub to deliver early deadlines and dependencies,
         #so this takes care of stops that might be remote for other routes but will add less mileage here.
         #For efficiency, breaks out of loops if the load is full.
+        #Candidate locations are found with a radius query on the neighbor index built during import, returned in key order.
         for id in self.list[0].package_list:
             if len(self.list[0].package_list)==self.list[0].capacity:
                 break
-            for l in locations.table:
+            for key in locations.neighbors.within(packages.table[id].destination, 3.0):
+                l=locations.table[key]
                 if len(self.list[0].package_list)==self.list[0].capacity:
                     break
-                if (l.ring==2 and l.delay==False
-                and locations.distances[packages.table[id].destination][l.key]<3.0):
+                if l.ring==2 and l.delay==False:
                     for id2 in l.package_list:
-                        self.list[0].add(packages.table[id2], packages, locations, self.list)
+                        self.list[0].add(packages.table[id2], packages)
                         if len(self.list[0].package_list)==self.list[0].capacity:
                             break
 
@@ -169,45 +187,45 @@ class LoadList:
         #Adding these stops from ring 2 will make the shape of the route more of a circuit,
         #while keeping them in its dominant region prevents it from traversing the entire perimeter of the map.
         #For efficiency, breaks out of loops if the load is full.
+        #If no package has an early deadline, the load has no stops yet and no dominant region, so this step is skipped.
         region_sum=0
         for stop in self.list[0].stops:
             region_sum+=locations.table[stop].region
-        dominant_region=round(region_sum/len(self.list[0].stops))
+        dominant_region=round(region_sum/len(self.list[0].stops)) if self.list[0].stops!=set() else 0
         for p in packages.table[1:]:
-            if len(self.list[0].package_list)==self.list[0].capacity:
+            if len(self.list[0].package_list)==self.list[0].capacity or dominant_region==0:
                 break
             l=locations.table[p.destination]
-            if l.ring==2 and l.region==dominant_region and p.delay_time==time(0,0):
-                self.list[0].add(p, packages, locations, self.list)
+            if l.ring==2 and l.region==dominant_region and p.delay_time==0:
+                self.list[0].add(p, packages)
 
         #Packages with a delay are added to the second load.
         #This is essential because they cannot leave with the first load (deadlines before these packages are available),
         #but leaving in the third load may not get them to their destinations in time.
         for p in packages.table[1:]:
-            if p.delay_time!=time(0,0):
-                self.list[1].add(p, packages, locations, self.list)
+            if p.delay_time!=0:
+                self.list[1].add(p, packages)
 
         #Determines the second load's dominant region and adds packages to the load from destinations that are either:
         #in the dominant region and within 2 miles of existing stops (being in the dominant region means they are likely to be near multiple stops, so a wider range of distances is okay),
         #or in the non-dominant region within 1 mile of existing stops (some regional crossover is okay, and revisiting these areas later would likely be less efficient,
         #but they need to be very close to existing stops to be worth it).
-        #For efficiency, breaks out of loops if the load is full.
+        #For efficiency, breaks out of loops if the load is full. (If no package has a delay, the load has no stops, so no packages are added here.)
         region_sum=0
         for stop in self.list[1].stops:
             region_sum+=locations.table[stop].region
-        dominant_region=round(region_sum/len(self.list[1].stops))
+        dominant_region=round(region_sum/len(self.list[1].stops)) if self.list[1].stops!=set() else 0
         for id in self.list[1].package_list:
             if len(self.list[1].package_list)==self.list[1].capacity:
                 break
-            for l in locations.table:
+            dest_row=locations.distances.row(packages.table[id].destination)
+            for key in locations.neighbors.within(packages.table[id].destination, 2.0):
+                l=locations.table[key]
                 if len(self.list[1].package_list)==self.list[1].capacity:
                     break
-                if ((l.region==dominant_region
-                and locations.distances[packages.table[id].destination][l.key]<2.0)
-                or (l.region!=dominant_region
-                and locations.distances[packages.table[id].destination][l.key]<1.0)):
+                if l.region==dominant_region or dest_row[key]<1.0:
                     for id2 in l.package_list:
-                        self.list[1].add(packages.table[id2], packages, locations, self.list)
+                        self.list[1].add(packages.table[id2], packages)
                         if len(self.list[1].package_list)==self.list[1].capacity:
                             break
                         
@@ -217,13 +235,409 @@ class LoadList:
         #This section also covers packages with unknown destinations (applies to those with incorrect information provided and new address not yet available as well).
         #These packages are thereby delivered toward the end of the day, when their destinations will hopefully be known/updated,
         #and in a load that is not strictly bound geographically to avoid disturbing more carefully sorted routes.
-        leftovers=True
-        while leftovers==True:
-            leftovers=False
-            if len(self.list[len(self.list)-1].package_list)==self.list[len(self.list)-1].capacity:
-                new_load=Load(self.list[0].capacity, 'Load '+str(len(self.list)+1))
-                self.list.append(new_load)
-            for p in packages.table[1:]:
-                if p.sorted==False:
-                    Leftovers=True
-                    self.list[len(self.list)-1].add(p, packages, locations, self.list)
+        #If a package's group does not fit in (or cannot be assigned to the truck of) the last load, a new load is started for it.
+        #A group that cannot be added even to an empty load (larger than a load's capacity, or requiring two different trucks) cannot be delivered, and raises an error.
+        self.add_leftovers(packages)
+
+    def add_leftovers(self, packages):
+        """This method places every package not yet sorted into the last load in the list, starting a new load whenever the last one cannot take a package's group."""
+        #Space Complexity: O(1)
+        #Time complexity: O(N)
+        #Each package is checked once, and each group is added once by Load.add().
+
+        for p in packages.table[1:]:
+            if p.sorted==False:
+                if self.list==[] or self.list[len(self.list)-1].add(p, packages)==False:
+                    new_load=self.append_load(self.capacity, 'Load '+str(len(self.list)+1))
+                    if new_load.add(p, packages)==False:
+                        raise ValueError('Package '+str(p.id)+' cannot be loaded: the packages that must be loaded with it exceed a load\'s capacity or require different trucks.')
+
+    def build(self, packages, locations, num_trucks, start_time=make_time(8,0), speed_mph=18):
+        """This method sorts all of the packages in the provided PackagesList object into loads for any number of trucks, as an alternative to sort(), which requires three loads and two trucks.
+        The map is split into one region per truck (see LocationTable.assign_regions()), and the groups of packages that must be loaded together are divided into three classes:
+        express (with a deadline and no delay), delayed, and final (all others).
+        Each class is split by region, and each region's share is split into as many loads as its size requires by clustering its destinations.
+        Partly filled loads are then merged and rebalanced across regions and classes wherever deadlines allow (see merge_parts()), for trucks leaving at start_time and travelling at speed_mph.
+        The loads replace any already in the list, and are ordered with the express loads first, so that each truck leaves with one at the start of the day, then the delayed and final loads.
+        If the three loads sort() would make are estimated to be delivered with fewer late stops or fewer miles (see estimate_plan()), they are used instead
+        (Planner.loads also compares the two once they are delivered).
+        Packages without a known destination are left for the last load, as in sort()."""
+        #Space Complexity: O(N)
+        #Each group is recorded once in a class and region, then once in a load.
+        #Time complexity: O(N^2)
+        #Sorting the packages as sort() does is O(N^2); see sort().
+        #Assigning regions and splitting each region's share into loads cluster N destinations around L medoids in a fixed number of iterations, which is O(N*L),
+        #and the groups are then merged and rebalanced (see merge_parts()) and placed in loads by Load.add() in O(N) total.
+
+        #The packages are first sorted as sort() does, and the resulting loads are kept aside for comparison, with the packages left unsorted again.
+        #This is done before the regions are assigned, since sort() relies on the regions found during import.
+        classic=LoadList(len(packages.table)-1, self.capacity, ['Express', 'Delay', 'Final'])
+        classic.sort(packages, locations)
+        for load in classic.list:
+            for id in load.package_list:
+                packages.table[id].sorted=False
+                packages.table[id].load_ind=-1
+
+        #Groups linked by a delayed package's location (see PackageTable.build_groups()) are loaded together by Load.add(), so they are treated as one group here,
+        #identified by the lowest of their roots.
+        linked={}
+        def find_linked(root):
+            while linked.get(root, root)!=root:
+                root=linked[root]
+            return root
+        for root in packages.group_links:
+            for linked_root in packages.group_links[root]:
+                a=find_linked(root)
+                b=find_linked(linked_root)
+                if a!=b:
+                    linked[max(a, b)]=min(a, b)
+        roots={}
+        for root in packages.group_members:
+            roots.setdefault(find_linked(root), []).append(root)
+
+        #Each group is classified by its members' deadlines and delays and placed in the region of its first member with a known destination.
+        #Groups are recorded with their earliest deadline, so that within a load the most urgent are added first.
+        #The stops, required trucks, and latest delay time of each group's members are also recorded, for estimating the routes of loads (see describe_part()),
+        #along with the update time and corrected location of each package in a group with no known destination, which is left for the last load (see estimate_plan()).
+        locations.assign_regions(num_trucks)
+        classes=[{}, {}, {}]
+        groups={}
+        members={}
+        pending=[]
+        for root in roots:
+            deadline=0
+            delayed=False
+            destination=0
+            stops=set()
+            trucks=set()
+            ready_time=0
+            size=0
+            for id in [id for linked_root in roots[root] for id in packages.group_members[linked_root]]:
+                size+=1
+                p=packages.table[id]
+                if p.deadline!=0 and (deadline==0 or p.deadline<deadline):
+                    deadline=p.deadline
+                if p.delay_time!=0:
+                    delayed=True
+                    ready_time=max(ready_time, p.delay_time)
+                if destination<=0 and p.destination>0:
+                    destination=p.destination
+                if p.destination>0:
+                    stops.add(p.destination)
+                if p.truck_requirement!=0:
+                    trucks.add(p.truck_requirement)
+            groups[root]=(deadline, root, destination, size)
+            members[root]=(stops, trucks, ready_time)
+            if destination<=0:
+                for id in [id for linked_root in roots[root] for id in packages.group_members[linked_root]]:
+                    if packages.table[id].update_time!=0 and locations.find(packages.table[id].corrected_address)>=0:
+                        pending.append((packages.table[id].update_time, locations.find(packages.table[id].corrected_address)))
+                continue
+            if delayed==True:
+                group_class=1
+            elif deadline!=0:
+                group_class=0
+            else:
+                group_class=2
+            region=locations.table[destination].region
+            classes[group_class].setdefault(region, []).append(groups[root])
+
+        #Each class's groups in each region are split into parts of at most a load's capacity, which are merged and rebalanced.
+        parts=[]
+        for group_class in range(3):
+            for region in sorted(classes[group_class]):
+                parts+=self.split_groups(classes[group_class][region], locations)
+        parts=self.merge_parts(parts, members, num_trucks, start_time, locations, speed_mph)
+
+        #The loads sort() made are used if they are estimated to be better, each described by the groups of its packages.
+        classic_parts=[]
+        for load in classic.list:
+            load_roots=[]
+            for id in load.package_list:
+                if find_linked(packages.group[id]) not in load_roots:
+                    load_roots.append(find_linked(packages.group[id]))
+            classic_parts.append([groups[root] for root in load_roots])
+        if (self.estimate_plan(classic_parts, members, num_trucks, start_time, locations, speed_mph, pending)
+        <self.estimate_plan(parts, members, num_trucks, start_time, locations, speed_mph, pending)):
+            self.list=classic.list
+            for load in self.list:
+                for id in load.package_list:
+                    packages.table[id].sorted=True
+                    packages.table[id].load_ind=load.index
+            return
+
+        #Otherwise, the parts are added to loads, earliest deadline first.
+        self.list=[]
+        labels=['Express', 'Delay', 'Final']
+        for part in parts:
+            load=self.append_load(self.capacity, labels[self.part_class(part, members)]+' '+str(len(self.list)+1))
+            for group in sorted(part):
+                for root in roots[group[1]]:
+                    load.add(packages.table[root], packages)
+
+        #Any groups that could not be added (such as those linked to a group in another load, or with no known destination) are placed as in sort().
+        self.add_leftovers(packages)
+
+    def estimate_route(self, stops, departure_time, locations, speed_mph):
+        """This method returns a tuple of the length of a route through a set of stops from the hub and back, leaving at departure_time, the number of stops it reaches after their deadlines,
+        and the route's list of location keys. It is an estimate for comparing loads before they are routed: each stop is followed by the nearest stop remaining, either through all stops or through the stops with deadlines first
+        (as GreedyRouting chooses between), each also shortened with 2-opt moves (see localsearch.two_opt()), and whichever of these reaches fewer stops late (then the shorter) is used."""
+        #Space Complexity: O(S)
+        #Time complexity: O(S^2)
+        #Each of S stops is chosen by reading the distances to those remaining, once for each order, and each 2-opt pass checks every pair of the S stops.
+
+        best=None
+        for deadline_first in (False, True):
+            if deadline_first==True:
+                phases=[[key for key in stops if locations.table[key].deadline!=0], [key for key in stops if locations.table[key].deadline==0]]
+            else:
+                phases=[list(stops)]
+            tour=[0]
+            for remaining in phases:
+                remaining=set(remaining)
+                while remaining!=set():
+                    key=locations.distances.nearest(tour[len(tour)-1], sorted(remaining))
+                    remaining.discard(key)
+                    tour.append(key)
+            tour.append(0)
+            for candidate in (tour, two_opt(tour, locations)):
+                length=0.0
+                late=0
+                for i in range(1, len(candidate)):
+                    length+=locations.distances[candidate[i-1]][candidate[i]]
+                    deadline=locations.table[candidate[i]].deadline
+                    if deadline!=0 and departure_time+calc_time(length, speed_mph)>deadline:
+                        late+=1
+                if best is None or (late, length)<(best[1], best[0]):
+                    best=(length, late, candidate)
+        return best
+
+    def describe_part(self, part, members, departure_time, locations, speed_mph):
+        """This method returns a dictionary describing a part (a list of groups, see build()) as a load leaving no earlier than departure_time: its groups, number of packages, stops,
+        required trucks, the time all of its packages have arrived (its ready time), and its estimated route (see estimate_route()).
+        The stops, required trucks, and latest delay time of each group's members are provided in members, keyed by the group's root ID."""
+        #Space Complexity: O(S)
+        #Time complexity: O(S^2)
+        #See estimate_route().
+
+        stops=set()
+        trucks=set()
+        ready_time=0
+        for group in part:
+            stops.update(members[group[1]][0])
+            trucks.update(members[group[1]][1])
+            ready_time=max(ready_time, members[group[1]][2])
+        return {'groups':part, 'size':sum([group[3] for group in part]), 'stops':stops, 'trucks':trucks, 'ready_time':ready_time,
+                'route':self.estimate_route(stops, max(departure_time, ready_time), locations, speed_mph)}
+
+    def part_class(self, part, members):
+        """This method returns the class of load a part (a list of groups, see build()) makes: delayed (1) if it holds a delayed package, otherwise express (0) if it holds a package with a deadline,
+        otherwise final (2)."""
+        #Time complexity: O(G)
+        #Each of the part's G groups is checked once.
+
+        if any([members[group[1]][2]!=0 for group in part]):
+            return 1
+        elif any([group[0]!=0 for group in part]):
+            return 0
+        return 2
+
+    def schedule_parts(self, info, members, num_trucks, start_time, speed_mph):
+        """This method returns the estimated departure time of each of a list of described parts (see describe_part()) if they were delivered as TruckList.deliver() delivers loads:
+        in order of class, each on the truck it requires or otherwise the truck available soonest, leaving once that truck is back and its packages have arrived."""
+        #Space Complexity: O(P)
+        #Time complexity: O(P log(P)+P*T)
+        #The P parts are sorted by class, then each chooses among T trucks.
+
+        departures=[0]*len(info)
+        available={}
+        for truck in range(1, num_trucks+1):
+            available[truck]=start_time
+        for i in sorted(range(len(info)), key=lambda i: (self.part_class(info[i]['groups'], members), i)):
+            if len(info[i]['trucks'])==1 and min(info[i]['trucks']) in available:
+                truck=min(info[i]['trucks'])
+            else:
+                truck=min(available, key=lambda t: (available[t], t))
+            departures[i]=max(available[truck], info[i]['ready_time'])
+            available[truck]=departures[i]+calc_time(info[i]['route'][0], speed_mph)
+        return departures
+
+    def estimate_plan(self, parts, members, num_trucks, start_time, locations, speed_mph, pending=[]):
+        """This method returns a tuple of the estimated number of late stops and total miles of delivering a list of parts (lists of groups, see build()) as loads,
+        each leaving at its estimated departure time (see schedule_parts()).
+        The packages in pending (tuples of update time and corrected location key) have no known destination, so they are left for the last part (see add_leftovers()),
+        whose truck delivers each as TruckList.deliver() does: at a stop on its route reached after the update, otherwise from its last stop if the update has been made by then,
+        or else by returning to the hub and leaving again once the update is made."""
+        #Space Complexity: O(N)
+        #Time complexity: O(P*S^2+U*S)
+        #Each of P parts is estimated twice, and each of U pending packages checks the S stops of the last part's route.
+
+        info=[self.describe_part(part, members, start_time, locations, speed_mph) for part in parts]
+        departures=self.schedule_parts(info, members, num_trucks, start_time, speed_mph)
+        late=0
+        miles=0.0
+        for i in range(len(info)):
+            length, part_late, tour=self.estimate_route(info[i]['stops'], departures[i], locations, speed_mph)
+            late+=part_late
+            miles+=length
+            if i==len(info)-1:
+                #The time each stop on the last part's route is reached, for checking whether a pending package's update has been made by then.
+                #Pending packages going to the same location are delivered together, so each location is counted once.
+                times=[departures[i]]
+                distance=0.0
+                for j in range(1, len(tour)):
+                    distance+=locations.distances[tour[j-1]][tour[j]]
+                    times.append(departures[i]+calc_time(distance, speed_mph))
+                updates={}
+                for update_time, key in pending:
+                    updates[key]=min(updates.get(key, update_time), update_time)
+                last_stop=tour[len(tour)-2]
+                for key in sorted(updates):
+                    update_time=updates[key]
+                    if any([tour[j]==key and times[j]>=update_time for j in range(1, len(tour)-1)]):
+                        continue
+                    if times[len(tour)-2]>=update_time:
+                        miles+=locations.distances[last_stop][key]+locations.distances[key][0]-locations.distances[last_stop][0]
+                    else:
+                        miles+=2*locations.distances[0][key]
+        return late, miles
+
+    def merge_parts(self, parts, members, num_trucks, start_time, locations, speed_mph, neighbors=8, passes=5):
+        """This method merges and rebalances a list of parts (lists of groups, see build()) so that the loads made from them are estimated to travel less distance (see estimate_route()),
+        and returns the resulting parts in order of class (see part_class()).
+        First, pairs of parts whose groups fit in one load are merged one at a time, always the pair whose merged route saves the most distance compared to routing them separately.
+        Then each group is moved to, or exchanged with a group of, another part if that saves distance, trying the parts holding any of the neighbors nearest its stops,
+        with each part leaving at its estimated departure time (see schedule_parts()). No change may exceed a load's capacity, require two different trucks in one part,
+        add a part requiring a truck, or reach more stops late than before, so partly filled loads are combined across regions and classes wherever deadlines allow."""
+        #Space Complexity: O(P^2+N)
+        #The merged estimate of each pair of P parts is kept until one of them is merged.
+        #Time complexity: O(P^2*S^2+N*K*C*S^2)
+        #Each pair of parts is estimated once, along with the pairs of each merged part, and each estimate is O(S^2) for S stops in a load.
+        #Each of N groups is then tried in, and exchanged with each of the C groups of, the parts of its K nearest neighbors, for a fixed number of passes.
+
+        info=[self.describe_part(list(part), members, start_time, locations, speed_mph) for part in parts]
+
+        #Pairs of parts are merged while any merge saves distance. Merged estimates are kept by the pair of parts' numbers, and a merged part is given a new number.
+        numbers=list(range(len(info)))
+        next_number=len(info)
+        merged={}
+        while True:
+            best=None
+            for i in range(len(info)):
+                for j in range(i+1, len(info)):
+                    a=info[i]
+                    b=info[j]
+                    if a['size']+b['size']>self.capacity or len(a['trucks'].union(b['trucks']))>1:
+                        continue
+                    key=(numbers[i], numbers[j])
+                    if key not in merged:
+                        merged[key]=self.describe_part(a['groups']+b['groups'], members, start_time, locations, speed_mph)
+                    route=merged[key]['route']
+                    saving=a['route'][0]+b['route'][0]-route[0]
+                    if saving>0 and route[1]<=a['route'][1]+b['route'][1] and (best is None or saving>best[0]):
+                        best=(saving, i, j, key)
+            if best is None:
+                break
+            saving, i, j, key=best
+            info[i]=merged[key]
+            numbers[i]=next_number
+            next_number+=1
+            del info[j]
+            del numbers[j]
+
+        #Each group is then moved to (or exchanged with a group of) the part that saves the most distance, among the parts holding the nearest neighbors of its stops.
+        #Each pass estimates every part at its departure time, and passes over every group are repeated until no group moves, up to a fixed number of passes.
+        for rebalance_pass in range(passes):
+            departures=self.schedule_parts(info, members, num_trucks, start_time, speed_mph)
+            info=[self.describe_part(info[i]['groups'], members, departures[i], locations, speed_mph) for i in range(len(info))]
+            where={}
+            for i in range(len(info)):
+                for key in info[i]['stops']:
+                    where.setdefault(key, set()).add(i)
+            moved=False
+            for i in range(len(info)):
+                for group in list(info[i]['groups']):
+                    if group not in info[i]['groups']:
+                        continue
+                    candidates=set()
+                    for stop in members[group[1]][0]:
+                        for key in [stop]+locations.neighbors.nearest(stop, neighbors):
+                            candidates.update(where.get(key, set()))
+                    candidates.discard(i)
+                    rest=[g for g in info[i]['groups'] if g!=group]
+                    best=None
+                    for j in sorted(candidates):
+                        target=info[j]
+                        for other in [None]+target['groups']:
+                            if other is None:
+                                source_groups=rest
+                                target_groups=target['groups']+[group]
+                            else:
+                                source_groups=rest+[other]
+                                target_groups=[g for g in target['groups'] if g!=other]+[group]
+                            source_trucks=set().union(*[members[g[1]][1] for g in source_groups])
+                            target_trucks=set().union(*[members[g[1]][1] for g in target_groups])
+                            if (sum([g[3] for g in source_groups])>self.capacity or sum([g[3] for g in target_groups])>self.capacity
+                            or len(source_trucks)>1 or len(target_trucks)>1 or len(source_trucks)+len(target_trucks)>len(info[i]['trucks'])+len(target['trucks'])):
+                                continue
+                            source=self.describe_part(source_groups, members, departures[i], locations, speed_mph)
+                            result=self.describe_part(target_groups, members, departures[j], locations, speed_mph)
+                            saving=info[i]['route'][0]+target['route'][0]-source['route'][0]-result['route'][0]
+                            if (saving>0.001 and source['route'][1]+result['route'][1]<=info[i]['route'][1]+target['route'][1]
+                            and (best is None or saving>best[0])):
+                                best=(saving, j, source, result)
+                    if best is not None:
+                        info[i]=best[2]
+                        info[best[1]]=best[3]
+                        for key in info[i]['stops']:
+                            where.setdefault(key, set()).add(i)
+                        for key in info[best[1]]['stops']:
+                            where.setdefault(key, set()).add(best[1])
+                        moved=True
+            info=[part for part in info if part['groups']!=[]]
+            if moved==False:
+                break
+
+        parts=[part['groups'] for part in info]
+        parts.sort(key=lambda part: self.part_class(part, members))
+        return parts
+
+    def split_groups(self, groups, locations):
+        """This method splits a list of groups of packages (tuples of deadline, root ID, destination, and size) into as few lists as will fit in loads of the LoadList's capacity,
+        by clustering the groups' destinations around one medoid per load. Groups are placed in order of how much further their second-nearest medoid is than their nearest ("regret"),
+        each in the nearest list with room for it, and groups that fit in none are placed in additional lists."""
+        #Space Complexity: O(N)
+        #Time complexity: O(N*L log(L))
+        #The destinations are clustered around L medoids (see DistanceMatrix.kmedoids()), then each of N groups sorts its distances to the L medoids.
+
+        size=0
+        for group in groups:
+            size+=group[3]
+        num_loads=ceil(size/self.capacity)
+        if num_loads<=1:
+            return [groups]
+        medoids, clusters=locations.distances.kmedoids(sorted(set([group[2] for group in groups])), num_loads)
+        ranked=[]
+        for group in groups:
+            row=locations.distances.row(group[2])
+            choices=sorted([(row[medoids[i]], i) for i in range(len(medoids))])
+            regret=choices[1][0]-choices[0][0] if len(choices)>1 else 0
+            ranked.append((-regret, group, choices))
+        ranked.sort()
+        parts=[[] for m in medoids]
+        room=[self.capacity for m in medoids]
+        for regret, group, choices in ranked:
+            placed=False
+            for dist, i in choices:
+                if room[i]>=group[3]:
+                    parts[i].append(group)
+                    room[i]-=group[3]
+                    placed=True
+                    break
+            if placed==False:
+                if room[len(room)-1]<group[3] or len(parts)==len(medoids):
+                    parts.append([])
+                    room.append(self.capacity)
+                parts[len(parts)-1].append(group)
+                room[len(room)-1]-=group[3]
+        return [part for part in parts if part!=[]]
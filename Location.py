@@ -1,9 +1,41 @@
 #Benjamin Gamman, 001439763
 """Location.py defines the Location and LocationTable classes and associated methods."""
 
-from datetime import time
+from DistanceMatrix import DistanceMatrix
+from NeighborIndex import NeighborIndex
+from csvimport import CSVFormatError
+from csvimport import read_rows
+from csvimport import read_float
+from networkcache import source_hash
+from networkcache import cache_path
+from networkcache import read_network
+from networkcache import write_network
 from math import fabs
-import csv
+
+#Street suffix, direction, and unit designator variants are mapped to a single abbreviation when addresses are normalized,
+#so that "4001 South 700 East" and "4001 S. 700 E" are recognized as the same address.
+ADDRESS_ABBREVIATIONS={
+    'north':'n', 'south':'s', 'east':'e', 'west':'w',
+    'street':'st', 'avenue':'ave', 'av':'ave', 'boulevard':'blvd', 'road':'rd', 'drive':'dr',
+    'lane':'ln', 'court':'ct', 'place':'pl', 'parkway':'pkwy', 'highway':'hwy', 'circle':'cir',
+    'apartment':'#', 'apt':'#', 'suite':'#', 'ste':'#', 'unit':'#',
+}
+
+def normalize_address(address):
+    """This function returns a normalized form of an address string (lowercase, with punctuation and extra whitespace removed and common variants abbreviated), for use as a lookup key."""
+    #Time complexity: O(1)
+    #Addresses are of limited length, so a fixed amount of work is done for each.
+    #Space complexity: O(1)
+
+    words=address.lower().replace('.', ' ').replace(',', ' ').replace('#', ' # ').split()
+    normalized=[]
+    for w in words:
+        w=ADDRESS_ABBREVIATIONS.get(w, w)
+        if normalized!=[] and normalized[len(normalized)-1]=='#' and w!='#':
+            normalized[len(normalized)-1]='#'+w
+        elif w!='#' or normalized==[] or normalized[len(normalized)-1]!='#':
+            normalized.append(w)
+    return ' '.join(normalized)
 
 class Location:
     """The Location class stores data associated with individual locations, except for distances to each other."""
@@ -24,7 +56,7 @@ class Location:
         self.state=''
         self.zip=''
         self.package_list=[]
-        self.deadline=time(0,0)
+        self.deadline=0
         self.avg_dist=0
         self.ring=0
         self.region=0
@@ -40,8 +72,9 @@ class LocationTable:
     #plus one entry for each package in their package lists collectively, O(N), giving O(N)+O(N)=O(N).
     #However, the matrix of distances will be O(N^2) as each location's row contains an entry for each location, making ths the LocationTable's overall space complexity.
 
-    def __init__(self):
-        """Initializes a LocationTable with emptry data structures."""
+    def __init__(self, dtype='float64', backend=None, max_neighbors=None):
+        """Initializes a LocationTable with emptry data structures. The dtype and backend are passed on to the DistanceMatrix built during import,
+        and max_neighbors to the NeighborIndex."""
         #Time complexity: O(1)
         #Though more will be required to populate the object's fields later, initialization executes only a set number of assignments.
         #Space complexity: O(1)
@@ -49,6 +82,22 @@ class LocationTable:
         
         self.table=[]
         self.distances=[]
+        self.dtype=dtype
+        self.backend=backend
+        self.max_neighbors=max_neighbors
+        self.neighbors=None
+        self.address_index={}
+        self.medoids=[]
+
+    def find(self, address):
+        """This method returns the key of the location with the provided address (compared in normalized form), or -1 if there is no such location."""
+        #Time complexity: O(1)
+        #The address is normalized and looked up in a dictionary maintained during import, rather than compared against each location.
+        #Space complexity: O(1)
+
+        if address=='':
+            return -1
+        return self.address_index.get(normalize_address(address), -1)
 
     def import_csv(self, locations_file):
         """This method populates the LocationTable's data structures with information from a csv file."""
@@ -57,21 +106,36 @@ class LocationTable:
         #to populate and fill in the matrix of distances.
         #Space complexity: O(N^2)
         #This method will populate a LocationTable object, which will use O(N^2) space, from a csv file which will contain a corresponding O(N^2) pieces of data.
+        #Each row must have the location's name, address, and its distances to the locations before it (or these must be given in the other locations' rows);
+        #a CSVFormatError naming the line is raised otherwise.
         
-        #Opens the file and uses each line to generate a Location object, add the object to a table, and add distances to a row of the distance matrix.
+        #Reads the whole file, then uses each line to generate a Location object, add the object to a table, and add distances to a row of the distance matrix.
         #Each location is assigned a key value that will correspond to its index in the table and each dimension of the distances matrix.
-        locations_import=csv.reader(open(locations_file), delimiter=',')
-        for line in locations_import:
-            dist_list_str=line[2:]
-            dist_list=[]
-            for d in dist_list_str:
-                if d!='':
-                    dist_list.append(float(d))
-                else:
-                    dist_list.append(None)
-            self.distances.append(dist_list)
-            l=Location(line[0], line[1], len(self.distances)-1)
+        #The location's normalized address is also added to the address index, so that packages can be matched to locations by address in O(1) time.
+        #Each row of distances is converted in a single step, and only checked value by value to report an error if that fails.
+        lines=read_rows(locations_file, 3)
+        n=len(lines)
+        dist_rows=[]
+        for line in lines:
+            try:
+                dist_list=[float(d) if d!='' else None for d in line[2:n+2]]
+            except ValueError:
+                for j in range(2, min(len(line), n+2)):
+                    if line[j]!='':
+                        read_float(line[j], locations_file, len(dist_rows)+1, 'Distance to location '+str(j-2))
+            dist_rows.append(dist_list)
+            l=Location(line[0], line[1], len(dist_rows)-1)
             self.table.append(l)
+            self.address_index.setdefault(normalize_address(l.address), l.key)
+
+        #Checks that each distance is given in at least one half of the matrix. Rows giving the lower half (each location's distances to those before it) are checked in one step,
+        #and any others value by value against the upper half.
+        for i in range(n):
+            row=dist_rows[i]
+            if len(row)<i+1 or None in row[:i+1]:
+                for j in range(i+1):
+                    if (j>=len(row) or row[j] is None) and (i>=len(dist_rows[j]) or dist_rows[j][i] is None):
+                        raise CSVFormatError(locations_file, i+1, 'the distance to location '+str(j)+' ('+lines[j][0]+') is missing from both this row and that location\'s row')
             
         #Because city, state, and zip are added during the import of packages later, and no packages are associated with the hub, this information is added here.
         #"(HUB)" is also added to the address of the hub to make it easer to identify in printouts of routes.
@@ -80,17 +144,18 @@ class LocationTable:
         self.table[0].state='UT'
         self.table[0].zip='84107'
 
-        #This fills in each entry in the distance table with the equivalent entry from the half of the matrix filled in by the original spreadsheet
+        #This builds the distance matrix, filling in each entry with the equivalent entry from the half of the matrix filled in by the original spreadsheet
         #(so entry[i][j]=entry[j][i], making the table bi-directional).
-        for i in range(len(self.distances)):
-            for j in range(len(self.distances)):
-                if self.distances[i][j]!=None and self.distances[j][i]==None:
-                    self.distances[j][i]=self.distances[i][j]
+        self.distances=DistanceMatrix.from_triangular(dist_rows, self.dtype, self.backend)
+
+        #Builds an index of each location's neighbors sorted by distance, used to answer "locations within a radius" queries while sorting packages into loads.
+        self.neighbors=NeighborIndex(self.distances, self.max_neighbors)
                     
         #Assigns each location to a "ring" based on its distance from the hub; ring 1 is closer than average to the hub, ring 2 is further.
         #This will be used later in the process of sorting the packages into loads.
+        row_sums=self.distances.row_sums()
         for l in self.table:
-                l.avg_dist=sum(self.distances[l.key])/27
+                l.avg_dist=row_sums[l.key]/len(self.table)
                 if self.distances[l.key][0]<self.table[0].avg_dist:
                     l.ring=1
                 else:
@@ -145,3 +210,74 @@ class LocationTable:
                         l.region=1
                     else:
                         l.region=2
+
+    def import_cached(self, locations_file, network_file=None):
+        """This method populates the LocationTable from a compiled network file if one exists for the current contents of the csv file (see networkcache.py),
+        and otherwise imports the csv file and compiles the network file for later use. If no network file path is provided, the csv file's path with the extension .netcache is used.
+        If the network file cannot be written (such as in a read-only directory), the network imported from the csv file is used without it.
+        The distance matrix and neighbor index are memory-mapped from the network file rather than read into memory, so they are loaded quickly and shared by all processes using them."""
+        #Time complexity: O(N) if the network file is current, O(N^2) otherwise
+        #The csv file is hashed to check the network file, which is then mapped without reading the O(N^2) distance matrix until its entries are accessed.
+        #If the network file must be rebuilt, see import_csv().
+        #Space complexity: O(N^2)
+
+        if network_file is None:
+            network_file=cache_path(locations_file)
+        digest=source_hash(locations_file)
+        network=read_network(network_file, digest, self.dtype, self.backend, self.max_neighbors)
+        if network is None:
+            self.import_csv(locations_file)
+            try:
+                write_network(self, network_file, digest)
+            except OSError:
+                pass
+            return
+        info, self.address_index, self.distances, self.neighbors=network
+        for i in range(len(info)):
+            name, address, city, state, zip_code, avg_dist, ring, region=info[i]
+            l=Location(name, address, i)
+            l.city=city
+            l.state=state
+            l.zip=zip_code
+            l.avg_dist=avg_dist
+            l.ring=ring
+            l.region=region
+            self.table.append(l)
+
+    def copy(self):
+        """This method returns a new LocationTable with the same network (sharing the distance matrix, neighbor index, and address index, which are not changed after import)
+        and new Location objects with the same information, but without any packages' information, so that the network can be reused to plan another set of packages."""
+        #Time complexity: O(N)
+        #One new Location object is created for each location; the O(N^2) distance matrix is shared rather than copied.
+        #Space complexity: O(N)
+
+        new_table=LocationTable(self.dtype, self.backend, self.max_neighbors)
+        new_table.distances=self.distances
+        new_table.neighbors=self.neighbors
+        new_table.address_index=self.address_index
+        new_table.medoids=list(self.medoids)
+        for l in self.table:
+            new_l=Location(l.name, l.address, l.key)
+            new_l.city=l.city
+            new_l.state=l.state
+            new_l.zip=l.zip
+            new_l.avg_dist=l.avg_dist
+            new_l.ring=l.ring
+            new_l.region=l.region
+            new_table.table.append(new_l)
+        return new_table
+
+    def assign_regions(self, num_regions):
+        """This method splits the map into the specified number of regions by k-medoids clustering of the locations (other than the hub) on the distance matrix,
+        replacing the two regions assigned during import. Regions are numbered from 1, and the hub is placed in region 0. Returns the list of medoid keys, one per region."""
+        #Time complexity: O(K*N)
+        #See DistanceMatrix.kmedoids(); a fixed maximum number of iterations is used.
+        #Space complexity: O(N)
+
+        keys=[l.key for l in self.table[1:]]
+        medoids, clusters=self.distances.kmedoids(keys, num_regions)
+        self.table[0].region=0
+        for i in range(len(keys)):
+            self.table[keys[i]].region=clusters[i]+1
+        self.medoids=medoids
+        return medoids
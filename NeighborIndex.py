@@ -0,0 +1,149 @@
+#Benjamin Gamman, 001439763
+"""NeighborIndex.py defines the NeighborIndex class, a precomputed index of each location's neighbors sorted by distance."""
+
+from DistanceMatrix import map_file
+from array import array
+from bisect import bisect_left
+from heapq import nsmallest
+
+try:
+    import numpy
+except ImportError:
+    numpy=None
+
+#The number of nearest neighbors kept for each location unless another maximum is specified. Queries reaching past them scan the location's row of the DistanceMatrix instead.
+DEFAULT_NEIGHBORS=64
+
+class NeighborIndex:
+    """The NeighborIndex class holds, for each location, the keys of the other locations sorted by distance along with those distances,
+    so that radius and k-nearest queries can be answered with a binary search instead of a scan of every location."""
+    #Space complexity: O(N*K)
+    #Each of N locations stores its K nearest neighbors (K=DEFAULT_NEIGHBORS unless another maximum is specified), along with their distances.
+
+    def __init__(self, distances, max_neighbors=None):
+        """Initializes the NeighborIndex from a DistanceMatrix, selecting each location's nearest neighbors from its row of distances.
+        Only max_neighbors of each location's nearest neighbors are kept (DEFAULT_NEIGHBORS if not specified, or every other location if there are no more than that),
+        and queries reaching past them fall back to the matrix."""
+        #Time complexity: O(N^2 log(K))
+        #The K nearest of each of N rows of the matrix are selected with a heap, at O(N log(K)) per row. This is done only once, during import.
+        #Space complexity: O(N*K)
+
+        self.distances=distances
+        self.size=len(distances)
+        if max_neighbors is None:
+            max_neighbors=DEFAULT_NEIGHBORS
+        if max_neighbors>=self.size:
+            max_neighbors=self.size-1
+        self.max_neighbors=max_neighbors
+        self.keys=[]
+        self.dists=[]
+        for i in range(self.size):
+            row=distances.row(i)
+            if numpy is not None and distances.backend=='numpy':
+                order=numpy.argsort(row, kind='stable')
+                order=order[order!=i][:max_neighbors]
+                self.keys.append(array('l', order.tolist()))
+                self.dists.append(array('d', row[order].tolist()))
+            else:
+                #Ties are kept in order of key, as heapq.nsmallest() is equivalent to a stable sort.
+                order=nsmallest(max_neighbors+1, range(self.size), key=row.__getitem__)
+                if i in order:
+                    order.remove(i)
+                order=order[:max_neighbors]
+                self.keys.append(array('l', order))
+                self.dists.append(array('d', [row[k] for k in order]))
+        self.source=None
+
+    @classmethod
+    def from_buffer(cls, distances, max_neighbors, buffer, keys_offset, dists_offset, source=None):
+        """This method returns a NeighborIndex read directly from a buffer (such as a memory-mapped file) without copying it. The buffer holds max_neighbors keys (as 8-byte integers)
+        for each location starting at keys_offset, and their distances (as 8-byte floats) starting at dists_offset, in the layout written by to_bytes().
+        If source is provided (the path of a mapped file), the index is mapped again from that file when unpickled."""
+        #Time complexity: O(N)
+        #Only a view of each location's row is created.
+        #Space complexity: O(N)
+
+        index=cls.__new__(cls)
+        index.distances=distances
+        index.size=len(distances)
+        index.max_neighbors=max_neighbors
+        index.map_buffer(buffer, keys_offset, dists_offset)
+        index.source=None
+        if source is not None:
+            index.source=(source, keys_offset, dists_offset)
+        return index
+
+    def map_buffer(self, buffer, keys_offset, dists_offset):
+        """This method sets the index to read each location's neighbors and their distances from memoryviews of a buffer."""
+        #Time complexity: O(N)
+        #Space complexity: O(N)
+
+        count=self.size*self.max_neighbors
+        keys=memoryview(buffer)[keys_offset:keys_offset+count*8].cast('q')
+        dists=memoryview(buffer)[dists_offset:dists_offset+count*8].cast('d')
+        k=self.max_neighbors
+        self.keys=[keys[i*k:(i+1)*k] for i in range(self.size)]
+        self.dists=[dists[i*k:(i+1)*k] for i in range(self.size)]
+
+    def __getstate__(self):
+        """Returns the index's data for pickling. An index mapped from a file is pickled as the file's path and offsets."""
+        state=dict(self.__dict__)
+        if self.source is not None:
+            state['keys']=None
+            state['dists']=None
+        return state
+
+    def __setstate__(self, state):
+        """Restores the index's data when unpickled, mapping its file again if it was mapped from one."""
+        self.__dict__.update(state)
+        if self.source is not None:
+            self.map_buffer(map_file(self.source[0]), self.source[1], self.source[2])
+
+    def to_bytes(self):
+        """This method returns a tuple of the neighbor keys (as 8-byte integers) and distances (as 8-byte floats) of every location as bytes, in the layout read by from_buffer()."""
+        #Time complexity: O(N*K)
+        #Space complexity: O(N*K)
+
+        keys=b''.join([array('q', k).tobytes() for k in self.keys])
+        dists=b''.join([array('d', d).tobytes() for d in self.dists])
+        return keys, dists
+
+    def is_complete(self, key, radius):
+        """This method returns True if the index holds every neighbor of the location closer than the provided radius."""
+        #Time complexity: O(1)
+        dists=self.dists[key]
+        return self.max_neighbors==self.size-1 or (len(dists)>0 and dists[len(dists)-1]>=radius)
+
+    def within(self, key, radius, include_self=True):
+        """This method returns a list of the keys of all locations closer than the provided radius to the specified location, sorted by key."""
+        #Time complexity: O(log(N)+K log(K))
+        #A binary search finds how many neighbors are within the radius, and those K keys are then sorted.
+        #If the index was capped and does not reach the radius, the DistanceMatrix is scanned instead, which is O(N).
+        #Space complexity: O(K)
+
+        if key<0:
+            key+=self.size
+        if not self.is_complete(key, radius):
+            found=self.distances.within([key], radius)
+            if not include_self and key in found:
+                found.remove(key)
+            return found
+        count=bisect_left(self.dists[key], radius)
+        found=self.keys[key][:count].tolist()
+        if include_self and radius>0:
+            found.append(key)
+        found.sort()
+        return found
+
+    def nearest(self, key, k):
+        """This method returns a list of the keys of the k locations nearest to the specified location (excluding itself), nearest first."""
+        #Time complexity: O(K)
+        #Space complexity: O(K)
+
+        if key<0:
+            key+=self.size
+        if k<=len(self.keys[key]):
+            return self.keys[key][:k].tolist()
+        row=self.distances.row(key)
+        order=sorted([j for j in range(self.size) if j!=key], key=row.__getitem__)
+        return order[:k]
@@ -1,18 +1,28 @@
 #Benjamin Gamman, 001439763
 """Package.py defines the Package and PackageTable classes and associated methods."""
 
-from datetime import datetime
-from datetime import time
+from timemath import format_time
+from timemath import parse_time
 from Location import Location
 from Location import LocationTable
-import csv
-
+from Timeline import package_status
+from Report import status_line
+from SearchIndex import SearchIndex
+from csvimport import CSVFormatError
+from csvimport import read_rows
+from csvimport import read_int
+from csvimport import read_time
+from array import array
 
 class Package:
     """The Package class stores data associated with individual packages. Destinations are stored as a location key rather than full addresses, to avoid redundant data and maintain consistency."""
     #Space complexity: O(N)
     #In most cases closer to O(1), but it is possible to reach N pieces of data in the object
     #if an individual package is bundled with all other packages and thus has a bundle set of size N.
+    #The attributes are declared as slots, so that each Package object does not also carry a dictionary of its attributes.
+
+    __slots__=('id', 'destination', 'weight', 'truck_requirement', 'delay_time', 'deadline', 'bundle',
+               'update_time', 'corrected_address', 'notes', 'sorted', 'load_ind', 'delivery_time')
 
     def __init__(self, id):
         """Initializes a Package object with a unique ID number; other information is set to default values."""
@@ -25,85 +35,324 @@ class Package:
         self.destination=0
         self.weight=0
         self.truck_requirement=0
-        self.delay_time=time(0,0)
-        self.deadline=time(0,0)
+        self.delay_time=0
+        self.deadline=0
         self.bundle=set()
-        self.update_time=time(0,0)
+        self.update_time=0
         self.corrected_address=''
         self.notes=''
         self.sorted=False
         self.load_ind=-1
-        self.delivery_time=time(0,0)
+        self.delivery_time=0
 
-    def print_package_status(self, packages, locations, loads, status_time):
-        """This method prints information about a provided Package object along with its status at a specified time."""
+    def print_package_status(self, packages, locations, loads, status_time, status=None):
+        """This method prints information about a provided Package object along with its status at a specified time.
+        If the package's status code at that time has already been found (see Timeline.py), it can be provided so that it is not determined again."""
         #Time complexity: O(1)
         #This executes a set number of instructions for a single Package object.
         #Space complexity: O(N^2)
         #The method accesses PackageTable and LocationTable structures that use O(N^2) space.       
         
-        print('{0:>11}'.format(self.id), end='   ')
-        print('{0:>4}'.format(str(self.weight)), end=' kg     ')
-        print('{0:>29}'.format(locations.table[self.destination].address[:29]), end='  ')
-        print('{0:>16}'.format(locations.table[self.destination].city), end=', ')
-        print(locations.table[self.destination].state, end=' ')
-        print(locations.table[self.destination].zip, end='     ')
-        if self.deadline==time(0,0):
-            print('{0:>8}'.format('EOD'), end='     ')
-        else:
-            print(self.deadline.strftime('%H:%M %p'), end='     ')
-        if self.delivery_time<=status_time:
-            print('Delivered by Truck '+str(loads.list[self.load_ind].truck_assigned)
-                  +' at '+self.delivery_time.strftime('%H:%M %p'))
-        elif loads.list[self.load_ind].departure_time<=status_time:
-            print('En route, loaded onto Truck '+str(loads.list[self.load_ind].truck_assigned)
-                  +' at '+loads.list[self.load_ind].departure_time.strftime('%I:%M %p'))
-        elif self.delay_time>status_time:
-            print('Delayed, arriving at the Hub at '+self.delay_time.strftime('%I:%M %p'))
-        else:
-            print('At the Hub')
+        if status is None:
+            status=package_status(self.delivery_time, loads.list[self.load_ind].departure_time, self.delay_time, status_time)
+        print(status_line(self, locations, loads, status))
+
+def _column_property(name):
+    """This function returns a property that reads and writes the named column of a PackageColumns object at a PackageView's ID."""
+    #Time complexity: O(1)
+    #Space complexity: O(1)
+
+    def get_value(self):
+        return getattr(self.columns, name)[self.id]
+    def set_value(self, value):
+        getattr(self.columns, name)[self.id]=value
+    return property(get_value, set_value)
+
+class PackageView:
+    """The PackageView class is a lightweight view of one package stored in a PackageColumns object, with the same attributes and methods as a Package object."""
+    #Space complexity: O(1)
+    #A view stores only a reference to the columns and the package's ID; it is created when the package is accessed and holds none of its data.
+
+    __slots__=('columns', 'id')
+
+    def __init__(self, columns, id):
+        """Initializes a PackageView of the package with the provided ID in the provided PackageColumns object."""
+        #Time complexity: O(1)
+        #Space complexity: O(1)
+
+        self.columns=columns
+        self.id=id
+
+    destination=_column_property('destination')
+    weight=_column_property('weight')
+    truck_requirement=_column_property('truck_requirement')
+    delay_time=_column_property('delay_time')
+    deadline=_column_property('deadline')
+    update_time=_column_property('update_time')
+    corrected_address=_column_property('corrected_address')
+    notes=_column_property('notes')
+    load_ind=_column_property('load_ind')
+    delivery_time=_column_property('delivery_time')
+
+    @property
+    def sorted(self):
+        return self.columns.sorted[self.id]==1
+
+    @sorted.setter
+    def sorted(self, value):
+        self.columns.sorted[self.id]=1 if value else 0
+
+    @property
+    def bundle(self):
+        return self.columns.get_bundle(self.id)
+
+    print_package_status=Package.print_package_status
+
+class PackageColumns:
+    """The PackageColumns class stores the data of all packages as parallel typed arrays indexed by package ID (a struct of arrays), rather than as one object per package.
+    Bundles are stored in compressed sparse row form: the IDs bundled with package i are bundle_ids[bundle_start[i]:bundle_start[i+1]]."""
+    #Space complexity: O(N+B)
+    #Each column holds one fixed-size entry per package, and the bundle arrays hold one entry per bundle connection (B).
+
+    def __init__(self):
+        """Initializes empty columns, with an empty entry at index 0 so that each package's index matches its ID."""
+        #Time complexity: O(1)
+        #Space complexity: O(1)
+
+        self.present=bytearray(1)
+        self.destination=array('l', [0])
+        self.weight=array('l', [0])
+        self.truck_requirement=array('l', [0])
+        self.delay_time=array('l', [0])
+        self.deadline=array('l', [0])
+        self.update_time=array('l', [0])
+        self.load_ind=array('l', [-1])
+        self.delivery_time=array('l', [0])
+        self.sorted=bytearray(1)
+        self.corrected_address=['']
+        self.notes=['']
+        self.bundle_start=array('l', [0, 0])
+        self.bundle_ids=array('l')
+        self.pending_bundles={}
+
+    def __len__(self):
+        """Returns the number of entries in the columns, including the empty entry at index 0."""
+        return len(self.present)
+
+    def __getitem__(self, key):
+        """Returns a PackageView for an ID (or None if there is no package with that ID), or a list of them for a slice, so that the columns can be indexed like a list of Package objects."""
+        #Time complexity: O(1) for an ID, O(N) for a slice.
+
+        if isinstance(key, slice):
+            return [self[id] for id in range(*key.indices(len(self.present)))]
+        if key<0:
+            key+=len(self.present)
+        if self.present[key]==0:
+            return None
+        return PackageView(self, key)
+
+    def __iter__(self):
+        """Iterates through the entries in the columns as PackageViews (None for IDs with no package)."""
+        for id in range(len(self.present)):
+            yield self[id]
+
+    def append(self, package):
+        """This method copies the data of a Package object into the next entry of each column. Bundles are held until link_bundles() is called."""
+        #Time complexity: O(1)
+        #Space complexity: O(1)
+
+        self.present.append(1)
+        self.destination.append(package.destination)
+        self.weight.append(package.weight)
+        self.truck_requirement.append(package.truck_requirement)
+        self.delay_time.append(package.delay_time)
+        self.deadline.append(package.deadline)
+        self.update_time.append(package.update_time)
+        self.load_ind.append(package.load_ind)
+        self.delivery_time.append(package.delivery_time)
+        self.sorted.append(1 if package.sorted else 0)
+        self.corrected_address.append(package.corrected_address)
+        self.notes.append(package.notes)
+        if package.bundle!=set():
+            self.pending_bundles[package.id]=set(package.bundle)
+        self.bundle_start.append(len(self.bundle_ids))
+
+    def get_bundle(self, id):
+        """This method returns the set of IDs of packages bundled with the package with the provided ID."""
+        #Time complexity: O(B)
+        #B is the number of packages bundled with this one.
+
+        if id in self.pending_bundles:
+            return frozenset(self.pending_bundles[id])
+        return frozenset(self.bundle_ids[self.bundle_start[id]:self.bundle_start[id+1]])
+
+    def link_bundles(self):
+        """This method makes every bundle connection two-way, then packs all bundles into the compressed bundle arrays."""
+        #Time complexity: O(N+B)
+        #Space complexity: O(N+B)
+
+        for id, bundle in list(self.pending_bundles.items()):
+            for other in bundle:
+                self.pending_bundles.setdefault(other, set()).add(id)
+        self.bundle_start=array('l', [0])
+        self.bundle_ids=array('l')
+        for id in range(len(self.present)):
+            if id in self.pending_bundles:
+                self.bundle_ids.extend(sorted(self.pending_bundles[id]))
+            self.bundle_start.append(len(self.bundle_ids))
+        self.pending_bundles={}
 
 class PackageTable:
     """The PackageTable class functions as a direct access hash table to index all created Package objects."""
     #Space complexity: O(N^2)
     #It is possible for each Package object to have N items in its bundled packages set. These can (and often will) be repeated in the corresponding packages' sets,
     #so the table's size will be N packages times O(N) for each package, giving O(N^2).
+    #In compact mode, the table is a PackageColumns object instead, which is O(N+B) for B bundle connections.
     
-    def __init__(self):
-        """Initializes an empty PackageTable. The first entry is filled with None so that the the highest index of the table will match the most recently added Package's ID."""
-        self.table=[None]
+    def __init__(self, compact=False):
+        """Initializes an empty PackageTable. The first entry is filled with None so that the the highest index of the table will match the most recently added Package's ID.
+        If compact is True, packages are stored in a PackageColumns object (parallel typed arrays) and accessed through PackageViews, rather than as a list of Package objects."""
+        self.compact=compact
+        if compact:
+            self.table=PackageColumns()
+        else:
+            self.table=[None]
+        self.group=array('l')
+        self.group_members={}
+        self.group_links={}
+        self.search_index=None
         #Time complexity: O(1)
         #Though more will be required to populate the object's fields later, initialization executes only a set number of assignments.
         #Space complexity: O(1)
         #Although a PackageTable object may use up to O(N^2) space, this will be filled in the import process, not initialization.
 
     def insert(self, package):
-        """This method inserts a Package by increasing the table's size by 1 (to match the new index to the Package's ID, assuming Packages are added in order), then inserting the Package at the index of its ID number."""
+        """This method inserts a Package by increasing the table's size by 1 (to match the new index to the Package's ID), then inserting the Package at the index of its ID number.
+        Packages must be added in order of ID with no IDs skipped, so a ValueError is raised for any other ID; both storage modes then hold a package at every index after 0."""
         #Time complexity: O(1)
         #Only two operations are performed, appending a list item and the assignment of a reference variable for the Package object being added.
         #Space complexity: O(N^2)
         #Insertion accesses the PackageTable, which is O(N^2).
 
-        self.table.append(None)
-        self.table[package.id]=package
+        if package.id!=len(self.table):
+            raise ValueError('Package ID '+str(package.id)+' is out of order: the next package ID must be '+str(len(self.table))+'.')
+        if self.compact:
+            self.table.append(package)
+        else:
+            self.table.append(None)
+            self.table[package.id]=package
+
+    def link_bundles(self):
+        """This method runs through the table checking for packages with "bundle" information ("must be delivered with").
+        Each package in the current package's bundle has the current package added to its own bundle."""
+        #Time complexity: O(N^2)
+        #This could reach O(N^2) in a worst case that all packages are bundled together.
+
+        if self.compact:
+            self.table.link_bundles()
+        else:
+            for p in self.table[1:]:
+                if p.bundle!={}:
+                    for id in p.bundle:
+                        self.table[id].bundle.add(p.id)
+
+    def build_groups(self, locations):
+        """This method precomputes the groups of packages that must be loaded together, so that Load.add() can add a whole group in one step.
+        Packages are joined into connected components using a union-find (disjoint set) structure: bundled packages are joined, as are packages without a delay going to the same location.
+        A package with a delay also brings along the packages without a delay at its location when it is loaded (but not the reverse), so these one-way links between groups are stored separately."""
+        #Time complexity: O(N*a(N))
+        #Each bundle connection and each shared destination performs one union, and each find is nearly O(1) (a(N) being the inverse Ackermann function) with path halving and union by size.
+        #Space complexity: O(N)
+
+        parent=list(range(len(self.table)))
+        size=[1]*len(self.table)
+
+        def find(id):
+            while parent[id]!=id:
+                parent[id]=parent[parent[id]]
+                id=parent[id]
+            return id
+
+        def union(id1, id2):
+            root1=find(id1)
+            root2=find(id2)
+            if root1!=root2:
+                if size[root1]<size[root2]:
+                    root1, root2=root2, root1
+                parent[root2]=root1
+                size[root1]+=size[root2]
+
+        for p in self.table[1:]:
+            if p is not None:
+                for id in p.bundle:
+                    union(p.id, id)
+        location_root={}
+        for l in locations.table[1:]:
+            for id in l.package_list:
+                if self.table[id].delay_time==0:
+                    if l.key in location_root:
+                        union(location_root[l.key], id)
+                    else:
+                        location_root[l.key]=id
+
+        #Each package is then labeled with its group's root, and each group's members (in ID order) and one-way links are recorded.
+        #Truck requirements are not recorded per group, as Load.add() checks those of only the members not yet loaded.
+        self.group=array('l', [find(id) for id in range(len(self.table))])
+        self.group_members={}
+        self.group_links={}
+        for p in self.table[1:]:
+            if p is None:
+                continue
+            root=self.group[p.id]
+            self.group_members.setdefault(root, []).append(p.id)
+            if p.delay_time!=0 and p.destination>0 and p.destination in location_root:
+                linked_root=self.group[location_root[p.destination]]
+                if linked_root!=root:
+                    self.group_links.setdefault(root, []).append(linked_root)
         
-    def lookup(self, locations, loads, search_term, status_time):
-        """This method searches the table of packages for those matching a provided search term or status at a specified time and returns a list of matching Package objects."""
-        #Time complexity: O(N)
-        #In the case that the search term registers as a package id number, just one Package object is added to the matches list and returned.
-        #Otherwise each package is checked for one of two sets of criteria depending n the search term,
-        #performing the checks and operations N times in either case, producing O(N) runtime.
+    def lookup(self, locations, loads, search_term, status_time, timeline=None):
+        """This method searches the table of packages for those matching a provided search term or status at a specified time and returns a list of matching Package objects, in order of ID.
+        Several search terms can be combined with '&' (such as "84115 & en route"), in which case only packages matching all of them are returned.
+        If a Timeline is provided, packages are found by status using it rather than by checking each package's times."""
+        #Time complexity: O(M)
+        #Each search term is matched using the SearchIndex built during import (see match_term()), which takes time proportional to the M matching packages
+        #rather than checking each package, and the results of combined terms are intersected.
         #Space complexity: O(N^2)
         #Lookup accesses the PackageTable, which is O(N^2).
-        
-        matches=[]
-        
+
+        #Combined terms are split apart and stripped of the spaces around the '&'s; a single term is used as entered.
+        if '&' in search_term:
+            terms=[term.strip() for term in search_term.split('&')]
+        else:
+            terms=[search_term]
+        ids=None
+        for term in terms:
+            found=self.match_term(locations, loads, term, status_time, timeline)
+            if ids is None:
+                ids=found
+            else:
+                ids&=found
+            if ids==set():
+                break
+        return [self.table[id] for id in sorted(ids)]
+
+    def match_term(self, locations, loads, search_term, status_time, timeline=None):
+        """This method returns the set of IDs of packages matching a single search term (an ID, a status, or a value of one of the package's fields) at a specified time."""
+        #Time complexity: O(M)
+        #In the case that the search term registers as a package id number, just that package's ID is returned.
+        #Statuses are found with the Timeline if provided, and other fields with the SearchIndex, each of which takes time proportional to the M matching packages.
+        #Without them (for a table not built by import_csv()), each package is checked, which is O(N).
+        #Space complexity: O(M)
+
         #Immediately selects the package with matching ID if search term is a valid ID number, in which case only this is returned.
         if search_term.isdigit() and int(search_term)<len(self.table):
-            matches=[self.table[int(search_term)]]
+            return set([int(search_term)])
 
         #Searches based on status at specified time if search term is a designated status.
-        elif search_term in {'delivered', 'en route', 'at hub', 'delayed'}:
+        if search_term in {'delivered', 'en route', 'at hub', 'delayed'}:
+            if timeline is not None:
+                return set(timeline.with_status(search_term, status_time))
+            matches=set()
             for p in self.table[1:]:
                 if ((search_term=='delivered' and p.delivery_time<=status_time)
                 or (search_term=='en route' and p.delivery_time>status_time
@@ -111,82 +360,128 @@ class PackageTable:
                 or (search_term=='at hub' and p.delay_time<=status_time
                 and loads.list[p.load_ind].departure_time>status_time)
                 or (search_term=='delayed' and p.delay_time>status_time)):
-                    matches.append(p)
-                    
-        #Otherwise, compares search term to several other pieces of the Package's information.
-        else:
-            for p in self.table[1:]:
-                if (search_term==str(p.weight)+' kg'
-                or search_term in locations.table[p.destination].address
-                or search_term in locations.table[p.destination].city
-                or search_term==locations.table[p.destination].state
-                or search_term==locations.table[p.destination].zip):
-                    matches.append(p)
-                if ':' in search_term:
-                    if datetime.time(datetime.strptime(search_term, '%I:%M %p'))==p.deadline:
-                        matches.append(p)
+                    matches.add(p.id)
+            return matches
+
+        #Otherwise, compares search term to several other pieces of the Package's information, using the SearchIndex if one was built.
+        #A search term containing ':' is parsed as a deadline once, rather than for each package.
+        if self.search_index is not None:
+            return self.search_index.find(search_term)
+        deadline=None
+        if ':' in search_term:
+            deadline=parse_time(search_term, '%I:%M %p')
+        matches=set()
+        for p in self.table[1:]:
+            if (search_term==str(p.weight)+' kg'
+            or search_term in locations.table[p.destination].address
+            or search_term in locations.table[p.destination].city
+            or search_term==locations.table[p.destination].state
+            or search_term==locations.table[p.destination].zip
+            or deadline==p.deadline):
+                matches.add(p.id)
         return matches
 
+    def build_index(self, locations):
+        """This method builds the SearchIndex used by lookup() to find packages by their fields without checking each package."""
+        #Time complexity: O(N)
+        #Space complexity: O(N)
+        #See SearchIndex.py.
+
+        self.search_index=SearchIndex(self, locations)
+
+    def update_destination(self, id, key, locations):
+        """This method changes the destination of the package with the provided ID to the location with the provided key once its corrected address is known,
+        clearing its update time and adding it to the location's package list (and the SearchIndex, if one was built)."""
+        #Time complexity: O(1)
+        #Space complexity: O(1)
+
+        p=self.table[id]
+        old_destination=p.destination
+        p.destination=key
+        p.update_time=0
+        locations.table[key].package_list.append(id)
+        if self.search_index is not None:
+            self.search_index.move(id, old_destination, key)
+
     def import_csv(self, packages_file, locations):
         """This method populates the PackageTable with information from a csv file."""
         #Time complexity: O(N^2)
-        #The most complex portions of the method involve taking actions in nested loops for each line in the import file (each package) and locations in the locations table
-        #("for each package, for each location").
+        #Each line in the import file (each package) is matched to its location with a single lookup in the LocationTable's address index, which is O(1), for O(N) overall.
         #There is also a loop for each package through its bundle list, which could reach O(N^2) in a worst case that all packages are bundled together.
         #Space complexity: O(N^2)
         #This method will populate a PackageTable object, which will use O(N^2) space, from a csv file which will contain a corresponding O(N^2) pieces of data,
         #although this will be closer to O(N) as long as bundles of packages are relatively small, which should usually be the case.
 
-        #Opens the file, then generates a Package object and adds appropriate information to the object from each line of the file.
-        #This requires a csv file to be formatted correctly, with the various different types of "notes" split into their own distinct columns.
-        packages_import=csv.reader(open(packages_file), delimiter=',')
-        for line in packages_import:
-            p=Package(int(line[0]))
+        #Reads the whole file, then generates a Package object and adds appropriate information to the object from each line of the file.
+        #This requires a csv file to be formatted correctly, with the various different types of "notes" split into their own distinct columns;
+        #a CSVFormatError naming the line and field is raised for a missing or invalid value.
+        #Times are parsed with a cache (see timemath.parse_time()), as the same few deadlines and times repeat across many packages.
+        lines=read_rows(packages_file, 13)
+        bundled=[]
+        for line_num in range(1, len(lines)+1):
+            line=lines[line_num-1]
+            p=Package(read_int(line[0], packages_file, line_num, 'Package ID'))
+            if p.id!=len(self.table):
+                raise CSVFormatError(packages_file, line_num, 'package IDs must be numbered in order from 1 with none skipped, expected '+str(len(self.table))+' but found '+str(p.id))
             p_address=line[1]
             if line[5]!='EOD':
-                p.deadline=datetime.time(datetime.strptime(line[5], '%I:%M %p'))
-            p.weight=int(line[6])
+                p.deadline=read_time(line[5], '%I:%M %p', packages_file, line_num, 'Deadline')
+            p.weight=read_int(line[6], packages_file, line_num, 'Weight')
             if line[7]!='':
                 b=line[7].split('/')
                 for x in b:
-                    p.bundle.add(int(x))
+                    p.bundle.add(read_int(x, packages_file, line_num, 'Bundled package ID'))
+                bundled.append((line_num, p.bundle))
             if line[8]!='':
-                p.delay_time=datetime.time(datetime.strptime(line[8], '%H:%M'))
+                p.delay_time=read_time(line[8], '%H:%M', packages_file, line_num, 'Delay time')
             if line[9]!='':
-                p.truck_requirement=int(line[9])
+                p.truck_requirement=read_int(line[9], packages_file, line_num, 'Truck requirement')
             p.notes=line[12]
 
             #If the package has the wrong address, removes its existing destination information, then sets a time at which the corrected address's key will replace it.
             if line[10]!='':
-                p.update_time=datetime.time(datetime.strptime(line[10], '%H:%M'))
+                p.update_time=read_time(line[10], '%H:%M', packages_file, line_num, 'Update time')
                 p.destination=-1
                 p.corrected_address=line[11]
                 p_address=''
 
             #Then assigns the package a location key based on the address in the file, and fills city, state, and zip information for the location object if not already filled.
-            for l in locations.table:
-                if l.address==p_address:
-                    p.destination=l.key
-                    l.package_list.append(p.id)
-                    if l.city=='':
-                        l.city=line[2]
-                        l.state=line[3]
-                        l.zip=line[4]
-                    if ((p.deadline!=time(0,0) and p.deadline<l.deadline)
-                    or (p.deadline!=time(0,0) and l.deadline==time(0,0))):
-                        l.deadline=p.deadline
-                    if p.delay_time!=time(0,0):
-                        l.delay=True
+            #The location is found using the LocationTable's address index rather than by comparing against each location.
+            key=locations.find(p_address)
+            if key<0 and p_address!='':
+                raise CSVFormatError(packages_file, line_num, 'the address "'+p_address+'" does not match any location')
+            if key>=0:
+                l=locations.table[key]
+                p.destination=l.key
+                l.package_list.append(p.id)
+                if l.city=='':
+                    l.city=line[2]
+                    l.state=line[3]
+                    l.zip=line[4]
+                if ((p.deadline!=0 and p.deadline<l.deadline)
+                or (p.deadline!=0 and l.deadline==0)):
+                    l.deadline=p.deadline
+                if p.delay_time!=0:
+                    l.delay=True
 
             #Then inserts the Package object into the PackageTable.
             self.insert(p)
 
+        #Checks that each package referred to in a bundle exists.
+        for line_num, bundle in bundled:
+            for id in bundle:
+                if id<1 or id>=len(self.table) or self.table[id] is None:
+                    raise CSVFormatError(packages_file, line_num, 'bundled package '+str(id)+' does not exist')
+
         #Lastly, runs through the table checking for packages with "bundle" information ("must be delivered with").
         #Each package in the current package's bundle has the current package added to its own bundle.
         #This creates a web of two-way connections, so that all packages connected by bundles are placed in the same load when any one of them is sorted later.
         #Ths must be done in a separate loop after all Packages have been created and added to the table,
         #otherwise those referenced in a bundle may not have been generated yet and would be missed.
-        for p in self.table[1:]:
-            if p.bundle!={}:
-                for id in p.bundle:
-                    self.table[id].bundle.add(p.id)
+        self.link_bundles()
+
+        #Then groups the packages that must be loaded together, for use when sorting packages into loads.
+        self.build_groups(locations)
+
+        #Finally, indexes the packages' fields for searches.
+        self.build_index(locations)
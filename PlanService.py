@@ -0,0 +1,250 @@
+#Benjamin Gamman, 001439763
+"""PlanService.py defines the PlanService class, which serves the queries of the program's menu (the schedule and package statuses) as JSON over a local HTTP endpoint using asyncio,
+and accepts events during the day (see Replanner.py), which are applied in a worker process while queries continue to be answered from the current plan."""
+
+from Package import Package
+from Replanner import Replanner
+from Replanner import AddressCorrection
+from Replanner import PackageDelay
+from Replanner import NewPackage
+from Replanner import TruckBreakdown
+from Replanner import EventError
+from timemath import parse_time
+from snapshot import snapshot
+from snapshot import restore
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import urlsplit
+from urllib.parse import parse_qs
+import asyncio
+import io
+import json
+import signal
+
+#The content type sent for each report format, by name (see Report.py).
+CONTENT_TYPES={'jsonl':'application/x-ndjson', 'csv':'text/csv', 'text':'text/plain'}
+
+#The time format used for times in queries and events, as entered in the menu.
+TIME_FORMAT='%I:%M %p'
+
+class RequestError(ValueError):
+    """The RequestError class is the error raised for an invalid request, holding the HTTP status code to respond with."""
+
+    def __init__(self, message, status=400):
+        """Initializes the error with a description of the problem and the HTTP status code."""
+        ValueError.__init__(self, message)
+        self.status=status
+
+def read_event(data):
+    """This function returns the event (see Replanner.py) described by a JSON object with a "type" ("correction", "delay", "package", or "breakdown"), a "time" as "X:XX am",
+    and the event's fields: "package_id" and "address" for a correction, "package_id" and "arrival_time" for a delay, "address" (with optional "city", "state", "zip",
+    "weight", "deadline", "truck_requirement", and "notes") for a new package, and "truck" for a breakdown. A RequestError is raised if a field is missing or invalid."""
+    #Time complexity: O(1)
+    #Space complexity: O(1)
+
+    if not isinstance(data, dict):
+        raise RequestError('Each event must be a JSON object')
+    try:
+        time=parse_time(data['time'], TIME_FORMAT)
+        if data['type']=='correction':
+            return AddressCorrection(time, int(data['package_id']), data['address'])
+        elif data['type']=='delay':
+            return PackageDelay(time, int(data['package_id']), parse_time(data['arrival_time'], TIME_FORMAT))
+        elif data['type']=='package':
+            package=Package(0)
+            package.weight=int(data.get('weight', 0))
+            if data.get('deadline', 'EOD')!='EOD':
+                package.deadline=parse_time(data['deadline'], TIME_FORMAT)
+            package.truck_requirement=int(data.get('truck_requirement', 0))
+            package.notes=data.get('notes', '')
+            return NewPackage(time, package, data['address'], data.get('city', ''), data.get('state', ''), data.get('zip', ''))
+        elif data['type']=='breakdown':
+            return TruckBreakdown(time, int(data['truck']))
+    except KeyError as e:
+        raise RequestError('Event is missing the field '+str(e)) from None
+    except (TypeError, ValueError) as e:
+        raise RequestError('Invalid event: '+str(e)) from None
+    raise RequestError('Unknown event type: '+str(data.get('type')))
+
+#The network used by a worker process, set once when the worker starts.
+_worker_network=None
+
+def _init_worker(network):
+    """This function stores the network in a worker process when the process pool starts, so that each plan sent to the worker only holds the plan's own O(N) data (see snapshot.py)."""
+    #Time complexity: O(1)
+    #Space complexity: O(1)
+
+    global _worker_network
+    _worker_network=network
+
+def _replan(data, events):
+    """This function runs in a worker process to apply a list of events to a copy of the plan, restored from a snapshot of its LocationTable, PackageTable, LoadList, and TruckList.
+    It returns a snapshot of the Schedule of the updated plan, its TruckList, and the indexes of the changed loads."""
+    #Time complexity: O(E*(N+R)+N log(N))
+    #See Replanner.apply() and Schedule.__init__(); the plan is restored and the result taken as snapshots in O(N) time.
+
+    locations, packages, loads, trucks=restore(data, _worker_network)
+    replanner=Replanner(locations, packages, loads, trucks)
+    changed=replanner.apply_all(events)
+    return snapshot((replanner.schedule(), trucks, changed), _worker_network)
+
+class PlanService:
+    """The PlanService class holds the current plan and answers HTTP requests about it. Its routes are:
+    GET /schedule (the delivery schedule), GET /status?time=10:00 am (the status of all packages), GET /status?time=10:00 am&search=84115 (packages matching a search term),
+    GET /plan (the plan's version and number of packages and loads), and POST /events (a JSON list of events, or a single event; see read_event()).
+    Reports are JSON lines by default, or csv or text with the format parameter (such as /schedule?format=csv).
+    Requests are handled by one event loop, and each report is written from a single plan without yielding to other requests, so every reader sees a consistent plan.
+    Events are applied to a copy of the plan in a worker process, and the new plan then replaces the current one in one step, so status queries are not held up while it is computed."""
+    #Space complexity: O(N^2)
+    #The service holds the current plan, including its LocationTable.
+
+    def __init__(self, planner, host='127.0.0.1', port=8080, workers=1):
+        """Initializes the service with a Planner, whose plan is computed if it has not been already, and the address to listen on.
+        Events are applied in a pool of the specified number of worker processes."""
+        #Time complexity: O(N^3) if the plan has not been computed
+        #See Planner.plan().
+
+        self.host=host
+        self.port=port
+        self.workers=workers
+        self.plan=(planner.locations, planner.packages, planner.loads, planner.trucks)
+        self.network=planner.network
+        self.schedule=planner.plan()
+        self.version=1
+        self.executor=None
+        self.replan_lock=None
+
+    async def serve(self):
+        """This method starts the service and answers requests until it is cancelled (or the process is sent SIGTERM, where supported), then stops the worker processes.
+        SIGTERM is only handled when the service runs in the main thread, so it can also be served from another thread."""
+        try:
+            asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+        except (NotImplementedError, RuntimeError, ValueError):
+            pass
+        #The worker processes are started before any connection is accepted, as a process started later would hold open a copy of the connection being answered.
+        #Each worker receives the network once, when it starts.
+        self.executor=ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker, initargs=(self.network,))
+        await asyncio.get_running_loop().run_in_executor(self.executor, int)
+        self.replan_lock=asyncio.Lock()
+        server=await asyncio.start_server(self.handle, self.host, self.port)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            self.executor.shutdown()
+
+    def run(self):
+        """This method runs the service until it is interrupted."""
+        try:
+            asyncio.run(self.serve())
+        except (KeyboardInterrupt, asyncio.CancelledError):
+            pass
+
+    async def handle(self, reader, writer):
+        """This method reads one HTTP request from a connection, responds to it, and closes the connection."""
+        #Time complexity: O(N)
+        #See the query methods below.
+
+        try:
+            request_line=(await reader.readline()).decode('latin-1').split()
+            headers={}
+            line=await reader.readline()
+            while line not in (b'\r\n', b'\n', b''):
+                name, value=line.decode('latin-1').split(':', 1)
+                headers[name.strip().lower()]=value.strip()
+                line=await reader.readline()
+            if len(request_line)<2:
+                raise RequestError('Malformed request')
+            body=b''
+            if 'content-length' in headers:
+                body=await reader.readexactly(int(headers['content-length']))
+            status, content_type, content=await self.respond(request_line[0], request_line[1], body)
+        except RequestError as e:
+            status, content_type, content=e.status, 'application/json', json.dumps({'error':str(e)})
+        except (ValueError, asyncio.IncompleteReadError) as e:
+            status, content_type, content=400, 'application/json', json.dumps({'error':str(e)})
+        except Exception as e:
+            #Any other error (such as a worker process exiting during a replan) is reported rather than dropping the connection; the current plan is kept.
+            status, content_type, content=500, 'application/json', json.dumps({'error':'Internal error: '+type(e).__name__+': '+str(e)})
+        content=content.encode('utf-8')
+        writer.write(('HTTP/1.1 '+str(status)+' '+('OK' if status==200 else 'Error')+'\r\n'
+                      +'Content-Type: '+content_type+'; charset=utf-8\r\n'
+                      +'Content-Length: '+str(len(content))+'\r\n'
+                      +'Connection: close\r\n\r\n').encode('latin-1')+content)
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def respond(self, method, target, body):
+        """This method returns a tuple of the HTTP status code, content type, and content of the response to a request."""
+        #Time complexity: O(N)
+
+        url=urlsplit(target)
+        query={}
+        for name, values in parse_qs(url.query).items():
+            query[name]=values[len(values)-1]
+        if method=='GET' and url.path=='/schedule':
+            return self.report(query, lambda schedule, sink, report_format: schedule.write_schedule(sink, report_format))
+        elif method=='GET' and url.path=='/status':
+            if 'time' not in query:
+                raise RequestError('The time parameter is required, such as /status?time=10:00 am')
+            status_time=parse_time(query['time'], TIME_FORMAT)
+            return self.report(query, lambda schedule, sink, report_format: schedule.write_status(sink, status_time, query.get('search'), report_format))
+        elif method=='GET' and url.path=='/plan':
+            return 200, 'application/json', json.dumps(self.summary())
+        elif method=='POST' and url.path=='/events':
+            data=json.loads(body.decode('utf-8'))
+            if not isinstance(data, list):
+                data=[data]
+            changed=await self.apply([read_event(item) for item in data])
+            summary=self.summary()
+            summary['changed_loads']=changed
+            return 200, 'application/json', json.dumps(summary)
+        elif url.path in ('/schedule', '/status', '/plan', '/events'):
+            raise RequestError('Method not allowed', 405)
+        raise RequestError('Not found', 404)
+
+    def report(self, query, write):
+        """This method writes a report of the current schedule in the requested format to a string, and returns the response.
+        It does not yield to the event loop, so the whole report comes from the same plan."""
+        #Time complexity: O(N)
+        #See Schedule.write_schedule() and Schedule.write_status().
+
+        report_format=query.get('format', 'jsonl')
+        if report_format not in CONTENT_TYPES:
+            raise RequestError('Unknown format: '+report_format)
+        sink=io.StringIO()
+        write(self.schedule, sink, report_format)
+        return 200, CONTENT_TYPES[report_format], sink.getvalue()
+
+    def summary(self):
+        """This method returns a dictionary describing the current plan: its version (increased each time events are applied), and its number of packages, loads, and miles."""
+        #Time complexity: O(L)
+        #Each of L loads' mileage is added.
+
+        miles=0.0
+        for load in self.schedule.loads.list:
+            miles+=load.route[len(load.route)-1][2]
+        return {'version':self.version, 'packages':len(self.schedule.packages.table)-1, 'loads':len(self.schedule.loads.list), 'miles':round(miles, 1)}
+
+    async def apply(self, events):
+        """This method applies a list of events to the plan in a worker process, then replaces the current plan and schedule with the result, and returns the indexes of the changed loads.
+        Events are applied one request at a time, each to the plan left by the last. If an event cannot be applied, the current plan is kept and a RequestError is raised:
+        with status 400 if it refers to a package or truck that does not exist, or 409 if it conflicts with the plan."""
+        #Time complexity: O(E*(N+R))
+        #See Replanner.apply(); the plan is also sent to and from the worker process as snapshots without the network, which is O(N).
+
+        async with self.replan_lock:
+            loop=asyncio.get_running_loop()
+            try:
+                result=await loop.run_in_executor(self.executor, _replan, snapshot(self.plan, self.network), events)
+            except EventError as e:
+                raise RequestError(str(e)) from None
+            except ValueError as e:
+                raise RequestError(str(e), 409) from None
+            schedule, trucks, changed=restore(result, self.network)
+            #The new plan's Schedule (and Timeline) was built by the worker, so it replaces the current one in one step and readers never see a partly built plan.
+            self.plan=(schedule.locations, schedule.packages, schedule.loads, trucks)
+            self.schedule=schedule
+            self.version+=1
+            return changed
@@ -0,0 +1,166 @@
+#Benjamin Gamman, 001439763
+"""Planner.py defines the Planner class, the entry point for planning deliveries from files or from data structures already in memory."""
+
+from Package import PackageTable
+from Location import LocationTable
+from Load import LoadList
+from Truck import TruckList
+from Schedule import Schedule
+from Feasibility import check_plan
+from snapshot import snapshot
+from snapshot import restore
+from timemath import make_time
+from functools import cached_property
+
+class Planner:
+    """The Planner class holds the inputs and settings for one delivery plan and computes each stage of the plan (the network, packages, loads, routes, and schedule) only when it is first requested,
+    keeping the result for later requests. The network can be passed on to other Planners, so that a program answering many planning requests only imports it once."""
+    #Space complexity: O(N^2)
+    #The Planner holds the LocationTable, which is O(N^2), along with the other data structures of the plan.
+
+    def __init__(self, locations='locations.csv', packages='packages.csv', num_trucks=2, truck_capacity=16, truck_speed=18, start_time=make_time(8,0),
+                 labels=('Express', 'Delay', 'Final'), build_loads=False, strategy=None, improve=False, workers=1, compact=False):
+        """Initializes a Planner without computing anything.
+        The locations can be the path of a csv file (imported through a compiled network file, see LocationTable.import_cached()), a file-like object holding csv data,
+        or a LocationTable, which is copied for this plan so that it can be reused (see LocationTable.copy()).
+        The packages can be the path of a csv file, a file-like object holding csv data, or a PackageTable already imported with the provided LocationTable, which is then used as is.
+        Loads are sorted with LoadList.sort(), or with LoadList.build() if build_loads is True (needed for more than two trucks), unless sort() plans the packages better (see loads);
+        the strategy, improve, and workers settings are passed on to the TruckList (see TruckList.__init__()), and compact to the PackageTable."""
+        #Time complexity: O(1)
+        #Space complexity: O(1)
+
+        self.locations_source=locations
+        self.packages_source=packages
+        self.num_trucks=num_trucks
+        self.truck_capacity=truck_capacity
+        self.truck_speed=truck_speed
+        self.start_time=start_time
+        self.labels=tuple(labels)
+        self.build_loads=build_loads
+        self.strategy=strategy
+        self.improve=improve
+        self.workers=workers
+        self.compact=compact
+        #The Profiler's report of planning, if planning was profiled (see BatchPlanner.plan_day()).
+        self.profile=None
+        #The method that sorted the packages into loads once they are sorted ("sort" for LoadList.sort() or "build" for LoadList.build(), see loads).
+        self.load_builder=None
+
+    @cached_property
+    def network(self):
+        """The LocationTable holding the network (locations and distances) before any packages are imported, which can be passed to other Planners as their locations."""
+        #Time complexity: O(N) from a compiled network file, O(N^2) otherwise
+        #Space complexity: O(N^2)
+
+        if isinstance(self.locations_source, LocationTable):
+            return self.locations_source
+        network=LocationTable()
+        if isinstance(self.locations_source, str):
+            network.import_cached(self.locations_source)
+        else:
+            network.import_csv(self.locations_source)
+        return network
+
+    @cached_property
+    def locations(self):
+        """The LocationTable used for this plan, holding the network along with the information of the packages to be delivered."""
+        #Time complexity: O(N)
+        #Space complexity: O(N)
+
+        if isinstance(self.packages_source, PackageTable):
+            return self.network
+        return self.network.copy()
+
+    @cached_property
+    def packages(self):
+        """The PackageTable of the packages to be delivered."""
+        #Time complexity: O(N)
+        #See PackageTable.import_csv().
+        #Space complexity: O(N)
+
+        if isinstance(self.packages_source, PackageTable):
+            return self.packages_source
+        packages=PackageTable(self.compact)
+        packages.import_csv(self.packages_source, self.locations)
+        return packages
+
+    @cached_property
+    def loads(self):
+        """The LoadList of the packages sorted into loads. The loads are not routed until the trucks are requested.
+        Loads built by LoadList.build() can only be estimated before they are routed, so both they and the loads sort() makes are first delivered on copies of the data (see trial()),
+        and sort()'s loads are used instead if they are delivered with fewer violations or fewer miles."""
+        #Time complexity: O(N^3)
+        #See LoadList.sort() and LoadList.build(); building loads also delivers both sets of loads once (see TruckList.deliver()).
+        #Space complexity: O(N)
+
+        loads=LoadList(len(self.packages.table)-1, self.truck_capacity, self.labels)
+        if self.build_loads==True:
+            data=snapshot((self.locations, self.packages), self.locations)
+            sorted_result=self.trial(data, False)
+            built_result=self.trial(data, True) if sorted_result is not None else None
+            if sorted_result is None or (built_result is not None and built_result<=sorted_result):
+                loads.build(self.packages, self.locations, self.num_trucks, self.start_time, self.truck_speed)
+                self.load_builder='build'
+                return loads
+        loads.sort(self.packages, self.locations)
+        self.load_builder='sort'
+        return loads
+
+    def trial(self, data, build_loads):
+        """This method plans a copy of the locations and packages held in a snapshot (see snapshot.py), with loads built by LoadList.build() if build_loads is True or sorted by LoadList.sort() otherwise,
+        and returns a tuple of the number of violations and the miles of the delivered plan (see check_plan()), or None if the plan could not be made."""
+        #Time complexity: O(N^3)
+        #See TruckList.deliver().
+        #Space complexity: O(N)
+
+        locations, packages=restore(data, self.locations)
+        loads=LoadList(len(packages.table)-1, self.truck_capacity, self.labels)
+        try:
+            if build_loads==True:
+                loads.build(packages, locations, self.num_trucks, self.start_time, self.truck_speed)
+            else:
+                loads.sort(packages, locations)
+            trucks=TruckList(self.num_trucks, self.start_time, self.truck_speed, self.improve, strategy=self.strategy, workers=self.workers)
+            trucks.deliver(loads, packages, locations)
+        except ValueError:
+            return None
+        report=check_plan(packages, loads)
+        return report.violations(), round(report.miles, 1)
+
+    @cached_property
+    def trucks(self):
+        """The TruckList whose trucks have delivered all loads, giving each load its route and each package its delivery time."""
+        #Time complexity: O(N^3)
+        #See TruckList.deliver().
+        #Space complexity: O(N)
+
+        trucks=TruckList(self.num_trucks, self.start_time, self.truck_speed, self.improve, strategy=self.strategy, workers=self.workers)
+        trucks.deliver(self.loads, self.packages, self.locations)
+        return trucks
+
+    @cached_property
+    def schedule(self):
+        """The Schedule of the delivered plan, used to display routes and package statuses."""
+        #Time complexity: O(N log(N))
+        #See Schedule.__init__(); delivery is done first if it has not been already.
+        #Space complexity: O(N)
+
+        #The loads are delivered first, if they have not been already.
+        self.trucks
+        return Schedule(self.locations, self.packages, self.loads)
+
+    @cached_property
+    def feasibility(self):
+        """The FeasibilityReport of the delivered plan, recording any package delivered late or any constraint the plan did not meet (see Feasibility.py)."""
+        #Time complexity: O(N)
+        #See check_plan(); delivery is done first if it has not been already.
+        #Space complexity: O(V)
+
+        self.trucks
+        return check_plan(self.packages, self.loads)
+
+    def plan(self):
+        """This method computes every stage of the plan that has not yet been computed, and returns the Schedule."""
+        #Time complexity: O(N^3)
+        #See TruckList.deliver().
+        return self.schedule
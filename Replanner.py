@@ -0,0 +1,496 @@
+#Benjamin Gamman, 001439763
+"""Replanner.py defines the event classes describing changes received during the day (address corrections, delays, new packages, and truck breakdowns),
+and the Replanner class, which updates a delivered plan for each event without planning the day again from the start."""
+
+from Load import Load
+from Route import Route
+from Schedule import Schedule
+from Routing import next_stop_greedy
+from localsearch import improve_route
+from timemath import calc_time
+from timemath import format_time
+from timemath import subtract_times
+
+class AddressCorrection:
+    """The AddressCorrection class describes a corrected address for a package, received at the specified time."""
+
+    def __init__(self, time, package_id, address):
+        """Initializes the event with the time it was received, the package's ID, and the corrected address."""
+        self.time=time
+        self.package_id=package_id
+        self.address=address
+
+class PackageDelay:
+    """The PackageDelay class describes a package that will not arrive at the hub until the specified arrival time, received at the specified time."""
+
+    def __init__(self, time, package_id, arrival_time):
+        """Initializes the event with the time it was received, the package's ID, and the time the package will arrive at the hub."""
+        self.time=time
+        self.package_id=package_id
+        self.arrival_time=arrival_time
+
+class NewPackage:
+    """The NewPackage class describes a package added to the day's deliveries at the specified time, going to the specified address."""
+
+    def __init__(self, time, package, address, city='', state='', zip=''):
+        """Initializes the event with the time it was received, a Package object holding the package's information (its ID is assigned when it is added),
+        and its address, along with the city, state, and zip code, which are recorded for the location if not already known."""
+        self.time=time
+        self.package=package
+        self.address=address
+        self.city=city
+        self.state=state
+        self.zip=zip
+
+class EventError(ValueError):
+    """The EventError class is the error raised for an event that refers to a package or truck that does not exist, as opposed to an event that cannot be applied to the plan."""
+
+class TruckBreakdown:
+    """The TruckBreakdown class describes a truck breaking down at the specified time, after which it delivers nothing more for the day."""
+
+    def __init__(self, time, truck):
+        """Initializes the event with the time of the breakdown and the truck's number."""
+        self.time=time
+        self.truck=truck
+
+class Replanner:
+    """The Replanner class updates a delivered plan (the LocationTable, PackageTable, LoadList, and TruckList after TruckList.deliver()) as events are received during the day.
+    The parts of each route already driven at the time of an event are kept as they are; only the remaining stops of the loads an event affects are ordered again,
+    and later loads are only re-timed (keeping their order of stops) if their trucks become available at a different time."""
+    #Space complexity: O(N)
+    #The Replanner only holds references to the plan's data structures; the time each broken-down truck stopped is recorded on the TruckList (see TruckList.broken).
+
+    def __init__(self, locations, packages, loads, trucks):
+        """Initializes a Replanner for a delivered plan."""
+        #Time complexity: O(1)
+        #Space complexity: O(1)
+
+        self.locations=locations
+        self.packages=packages
+        self.loads=loads
+        self.trucks=trucks
+        self.broken=trucks.broken
+
+    @classmethod
+    def from_planner(cls, planner):
+        """This method returns a Replanner for the plan of a Planner, delivering its loads first if they have not been already."""
+        #Time complexity: O(1) if the plan has already been delivered
+        return cls(planner.locations, planner.packages, planner.loads, planner.trucks)
+
+    def schedule(self):
+        """This method returns a Schedule of the plan as it currently stands."""
+        #Time complexity: O(N log(N))
+        #See Schedule.__init__().
+        return Schedule(self.locations, self.packages, self.loads)
+
+    def apply(self, event):
+        """This method updates the plan for one event, and returns a sorted list of the indexes of the loads whose routes were changed.
+        A ValueError is raised if the event cannot be applied (such as a correction for a package already delivered), or an EventError if it refers to a package or truck that does not exist."""
+        #Time complexity: O(N+R)
+        #Only the affected loads' remaining stops are ordered again, which costs R (see reroute()); every other load is checked in O(1) time, or re-timed in time proportional to its route.
+        #Space complexity: O(N)
+
+        if isinstance(event, AddressCorrection):
+            dirty=self.correct_address(event.time, event.package_id, event.address)
+        elif isinstance(event, PackageDelay):
+            dirty=self.delay_package(event.time, event.package_id, event.arrival_time)
+        elif isinstance(event, NewPackage):
+            dirty=self.add_package(event.time, event.package, event.address, event.city, event.state, event.zip)
+        elif isinstance(event, TruckBreakdown):
+            dirty=self.break_down(event.time, event.truck)
+        else:
+            raise ValueError('Unknown event: '+str(event))
+        return self.settle(event.time, dirty)
+
+    def apply_all(self, events):
+        """This method updates the plan for each of a list of events in order of time, and returns a sorted list of the indexes of all loads whose routes were changed."""
+        #Time complexity: O(E*(N+R))
+        changed=set()
+        for event in sorted(events, key=lambda e: e.time):
+            changed.update(self.apply(event))
+        return sorted(changed)
+
+    def check_package(self, id):
+        """This method raises an EventError if there is no package with the provided ID."""
+        #Time complexity: O(1)
+        if id<1 or id>=len(self.packages.table) or self.packages.table[id] is None:
+            raise EventError('There is no package with ID '+str(id)+'.')
+
+    def check_truck(self, truck):
+        """This method raises an EventError if there is no truck with the provided number."""
+        #Time complexity: O(1)
+        if truck<1 or truck>=len(self.trucks.list):
+            raise EventError('There is no truck '+str(truck)+'; trucks are numbered 1 to '+str(len(self.trucks.list)-1)+'.')
+
+    def check_trucks(self, time, broken):
+        """This method raises a ValueError if the loads not yet departed at the specified time cannot be delivered once the trucks in broken (a collection of truck numbers) have broken down:
+        if no other truck is left, or if a load requires one of those trucks."""
+        #Time complexity: O(L)
+        #Each load is checked once.
+
+        if all(truck.number in broken for truck in self.trucks.list[1:]):
+            raise ValueError('No trucks are available to deliver the remaining packages.')
+        for load in self.loads.list:
+            if not self.departed(load, time) and load.truck_requirement in broken:
+                raise ValueError('Load '+load.label+' must be delivered by truck '+str(load.truck_requirement)+', which broke down.')
+
+    def departed(self, load, time):
+        """This method returns True if a load has left the hub by the specified time."""
+        #Time complexity: O(1)
+        return len(load.route)>0 and load.truck_assigned!=0 and load.departure_time<=time
+
+    def delivered(self, id, time):
+        """This method returns True if the package with the provided ID has been delivered by the specified time."""
+        #Time complexity: O(1)
+        delivery_time=self.packages.table[id].delivery_time
+        return delivery_time!=0 and delivery_time<=time
+
+    def note_destination(self, package):
+        """This method records a package's deadline for its destination, as done during import, so that routing considers it."""
+        #Time complexity: O(1)
+        l=self.locations.table[package.destination]
+        if package.deadline!=0 and (l.deadline==0 or package.deadline<l.deadline):
+            l.deadline=package.deadline
+
+    def move_packages(self, ids, load):
+        """This method moves the packages with the provided IDs from their current loads to the provided load, clearing their delivery times."""
+        #Time complexity: O(N)
+        #Each package is removed from its current load's package list.
+        for id in ids:
+            p=self.packages.table[id]
+            if p.load_ind>=0:
+                old_load=self.loads.list[p.load_ind]
+                old_load.package_list.remove(id)
+                self.update_stops(old_load)
+            p.load_ind=load.index
+            p.sorted=True
+            p.delivery_time=0
+            load.package_list.append(id)
+        self.update_stops(load)
+
+    def update_stops(self, load):
+        """This method recalculates the set of a load's known stops from its packages' destinations."""
+        #Time complexity: O(N)
+        load.stops=set()
+        for id in load.package_list:
+            if self.packages.table[id].destination>0:
+                load.stops.add(self.packages.table[id].destination)
+
+    def new_load(self, label):
+        """This method adds an empty load to the end of the LoadList, not yet assigned to a truck, and returns it."""
+        #Time complexity: O(1)
+        return self.loads.append_load(self.loads.capacity, label)
+
+    def correct_address(self, time, id, address):
+        """This method changes the destination of a package that has not yet been delivered to the location with the provided address, and returns the set of affected load indexes.
+        The package is removed from its previous location's package list, so that it is only listed at its new address."""
+        #Time complexity: O(P)
+        #The package is removed from the P packages listed at its previous location.
+
+        self.check_package(id)
+        p=self.packages.table[id]
+        if self.delivered(id, time):
+            raise ValueError('Package '+str(id)+' was already delivered at '+format_time(p.delivery_time, '%I:%M %p')+'.')
+        key=self.locations.find(address)
+        if key<0:
+            raise ValueError('The address "'+address+'" does not match any location.')
+        p.corrected_address=address
+        if p.destination>0 and id in self.locations.table[p.destination].package_list:
+            self.locations.table[p.destination].package_list.remove(id)
+        self.packages.update_destination(id, key, self.locations)
+        self.note_destination(p)
+        p.delivery_time=0
+        self.update_stops(self.loads.list[p.load_ind])
+        return set([p.load_ind])
+
+    def delay_package(self, time, id, arrival_time):
+        """This method records that a package still at the hub will not arrive until the specified time, and returns the set of affected load indexes.
+        If its load would leave before then, the package (with any packages in the same load that must be delivered with it) is moved to a later load with room,
+        or to a new load if there is none."""
+        #Time complexity: O(N)
+        #Each load is checked once for a later departure with room.
+
+        self.check_package(id)
+        p=self.packages.table[id]
+        load=self.loads.list[p.load_ind]
+        if self.departed(load, time):
+            raise ValueError('Package '+str(id)+' has already left the hub.')
+        p.delay_time=arrival_time
+        if load.departure_time>=arrival_time:
+            return set([load.index])
+        group=[id]
+        if id<len(self.packages.group):
+            group=[m for m in self.packages.group_members[self.packages.group[id]] if self.packages.table[m].load_ind==load.index]
+        target=self.find_load(time, self.packages.table[id], len(group), arrival_time, exclude=load.index)
+        if target is None:
+            target=self.new_load(load.label+' (Delayed)')
+        self.move_packages(group, target)
+        return set([load.index, target.index])
+
+    def find_load(self, time, package, count, ready_time, exclude=-1):
+        """This method returns the load not yet departed, leaving no earlier than ready_time, with room for count packages and no conflicting truck requirement,
+        that has a stop nearest to the package's destination; or None if there is no such load."""
+        #Time complexity: O(N)
+        #Each load's stops are checked once.
+
+        best=None
+        best_dist=0
+        row=self.locations.distances.row(package.destination)
+        for load in self.loads.list:
+            if (load.index==exclude or self.departed(load, time) or load.departure_time<ready_time
+            or len(load.package_list)+count>load.capacity
+            or (package.truck_requirement!=0 and load.truck_requirement not in (0, package.truck_requirement))
+            or (load.truck_assigned in self.broken)):
+                continue
+            dist=row[0]
+            for stop in load.stops:
+                if row[stop]<dist:
+                    dist=row[stop]
+            if best is None or dist<best_dist:
+                best=load
+                best_dist=dist
+        return best
+
+    def add_package(self, time, package, address, city='', state='', zip=''):
+        """This method adds a new package to the PackageTable and to the load best able to take it (see find_load()), or to a new load if none can,
+        and returns the set of affected load indexes."""
+        #Time complexity: O(N)
+
+        key=self.locations.find(address)
+        if key<0:
+            raise ValueError('The address "'+address+'" does not match any location.')
+        package.id=len(self.packages.table)
+        package.destination=key
+        package.sorted=False
+        package.load_ind=-1
+        package.delivery_time=0
+        self.packages.insert(package)
+        p=self.packages.table[package.id]
+        l=self.locations.table[key]
+        l.package_list.append(p.id)
+        if l.city=='':
+            l.city=city
+            l.state=state
+            l.zip=zip
+        self.note_destination(p)
+        if self.packages.search_index is not None:
+            self.packages.search_index.add(p)
+        target=self.find_load(time, p, 1, max(time, p.delay_time))
+        if target is None:
+            target=self.new_load('Added')
+            target.truck_requirement=p.truck_requirement
+        self.move_packages([p.id], target)
+        return set([target.index])
+
+    def break_down(self, time, truck):
+        """This method records that a truck broke down at the specified time. Its route ends at the last stop reached, and the packages it had not yet delivered
+        are moved to a new load, which leaves from the hub once another truck is available. Loads not yet departed on the truck are assigned to other trucks.
+        Returns the set of affected load indexes. The remaining loads are checked before anything is changed, so a ValueError for a breakdown that would leave them
+        undeliverable (see check_trucks()) leaves the plan as it was."""
+        #Time complexity: O(N)
+
+        self.check_truck(truck)
+        if truck in self.broken:
+            raise ValueError('Truck '+str(truck)+' already broke down.')
+        self.check_trucks(time, set(self.broken).union([truck]))
+        self.broken[truck]=time
+        dirty=set()
+        for load in list(self.loads.list):
+            if load.truck_assigned!=truck:
+                continue
+            if not self.departed(load, time):
+                load.truck_assigned=0
+                dirty.add(load.index)
+            elif load.route.times[len(load.route)-1]>time:
+                k=0
+                while k+1<len(load.route) and load.route.times[k+1]<=time:
+                    k+=1
+                load.route.truncate(k+1)
+                remaining=[id for id in load.package_list if not self.delivered(id, time)]
+                if remaining!=[]:
+                    recovery=self.new_load(load.label+' (Recovery)')
+                    self.move_packages(remaining, recovery)
+                    dirty.add(recovery.index)
+                dirty.add(load.index)
+        return dirty
+
+    def order_stops(self, load, start, start_time, stops):
+        """This method returns the order in which to visit a set of stops, starting from the location with key start at the specified time,
+        by greedy nearest-neighbor selection followed (if the TruckList improves routes) by 2-opt and Or-opt improvement."""
+        #Time complexity: O(S^2)
+        #Each of S stops is chosen by scanning those remaining; improvement is bounded by the TruckList's time budget.
+
+        remaining=set(stops)
+        remaining.discard(start)
+        order=[]
+        prev=start
+        while remaining!=set():
+            prev=next_stop_greedy(prev, remaining, self.locations)
+            order.append(prev)
+            remaining.discard(prev)
+        if self.trucks.improve==True and len(order)>2:
+            speed=self.trucks.list[load.truck_assigned].speed_mph
+            if start==0:
+                order=improve_route(order, self.locations, 0, start_time, speed, self.trucks.improve_budget)
+            else:
+                #The tour is treated as leaving the hub early enough to reach the starting location at the start time, with that first leg kept in place.
+                departure=subtract_times(start_time, calc_time(self.locations.distances[0][start], speed))
+                order=improve_route([start]+order, self.locations, 1, departure, speed, self.trucks.improve_budget)[1:]
+        return order
+
+    def visit(self, load, stop, undelivered, speed):
+        """This method adds a stop to the end of a load's route, applying any address updates received by then and delivering the undelivered packages going there."""
+        #Time complexity: O(K)
+        #Each of the K undelivered packages is checked.
+
+        time=load.route.times[load.route.append(stop, self.locations, speed)]
+        for id in list(undelivered):
+            p=self.packages.table[id]
+            if p.update_time!=0 and p.update_time<=time:
+                key=self.locations.find(p.corrected_address)
+                if key>=0:
+                    self.packages.update_destination(id, key, self.locations)
+            if p.destination==stop:
+                p.delivery_time=time
+                undelivered.remove(id)
+
+    def finish_route(self, load, order):
+        """This method extends a load's route (which must at least start at the hub) through the provided stops, then to any destinations of packages still undelivered,
+        waiting at the hub for address updates if needed as TruckList.deliver() does, and back to the hub."""
+        #Time complexity: O(S*K)
+        #Each of S stops checks the K packages still undelivered.
+
+        speed=self.trucks.list[load.truck_assigned].speed_mph
+        undelivered=[id for id in load.package_list if self.packages.table[id].delivery_time==0]
+        for stop in order:
+            self.visit(load, stop, undelivered, speed)
+        while undelivered!=[]:
+            known=set([self.packages.table[id].destination for id in undelivered if self.packages.table[id].destination>0])
+            if known!=set():
+                self.visit(load, next_stop_greedy(load.route.keys[len(load.route)-1], known, self.locations), undelivered, speed)
+                continue
+            pending=[self.packages.table[id].update_time for id in undelivered if self.packages.table[id].update_time!=0]
+            if pending==[]:
+                raise ValueError('Packages '+str(sorted(undelivered))+' cannot be delivered: their destinations are unknown and no update is expected.')
+            self.visit(load, 0, undelivered, speed)
+            if min(pending)>load.route.times[len(load.route)-1]:
+                load.route.wait(min(pending))
+                self.visit(load, 0, undelivered, speed)
+        self.visit(load, 0, undelivered, speed)
+
+    def reroute(self, load, time):
+        """This method orders again the stops of a departed load not yet reached by the specified time. The route is kept up to the last stop reached;
+        the stop the truck is driving to at that time is kept next (if any of the load's packages still go there), and the remaining stops are ordered from there."""
+        #Time complexity: O(S^2)
+        #See order_stops().
+
+        k=0
+        while k+1<len(load.route) and load.route.times[k+1]<=time:
+            k+=1
+        next_stop=load.route.keys[k+1] if k+1<len(load.route) else 0
+        load.route.truncate(k+1)
+        if self.trucks.list[load.truck_assigned].number in self.broken:
+            return
+        for id in load.package_list:
+            if not self.delivered(id, time):
+                self.packages.table[id].delivery_time=0
+        stops=set([self.packages.table[id].destination for id in load.package_list
+                   if self.packages.table[id].delivery_time==0 and self.packages.table[id].destination>0])
+        position=load.route.keys[k]
+        order=[]
+        if position in stops:
+            order.append(position)
+        if next_stop!=0 and next_stop!=position and next_stop in stops:
+            order.append(next_stop)
+        start=order[len(order)-1] if order!=[] else position
+        start_time=load.route.times[k]
+        order+=self.order_stops(load, start, start_time, stops.difference(order))
+        self.finish_route(load, order)
+
+    def route_from_hub(self, load, reorder):
+        """This method builds a load's route from the hub at its departure time, ordering its stops again if reorder is True, or otherwise keeping their previous order."""
+        #Time complexity: O(S^2)
+        #See order_stops().
+
+        speed=self.trucks.list[load.truck_assigned].speed_mph
+        if len(load.route)>0 and reorder==False:
+            order=[]
+            for key in load.route.keys[1:]:
+                if key!=0 and key not in order:
+                    order.append(key)
+        elif load.stops!=set():
+            order, fixed=self.trucks.strategy.order(load, self.packages, self.locations, speed)
+            if self.trucks.improve==True:
+                order=improve_route(order, self.locations, fixed, load.departure_time, speed, self.trucks.improve_budget)
+        else:
+            order=[]
+        for id in load.package_list:
+            self.packages.table[id].delivery_time=0
+        load.route=Route(load.departure_time)
+        self.finish_route(load, order)
+
+    def settle(self, time, dirty):
+        """This method updates the routes of all loads after an event at the specified time, and returns a sorted list of the indexes of the loads whose routes were changed.
+        Departed loads in the set of dirty load indexes have their remaining stops ordered again. Loads not yet departed are then taken in order, as in TruckList.deliver():
+        each keeps its truck (or takes the truck available soonest if its truck broke down), and leaves when that truck is available and its packages have arrived, but not before the event.
+        A load is only routed again if it is dirty or must leave later than planned."""
+        #Time complexity: O(N+R)
+        #Each load is checked once; see reroute() and route_from_hub() for the cost R of the loads routed again.
+
+        self.check_trucks(time, self.broken)
+        changed=set()
+        ready={}
+        for truck in self.trucks.list[1:]:
+            ready[truck.number]=truck.start_time
+        for load in self.loads.list:
+            if self.departed(load, time):
+                if load.index in dirty:
+                    self.reroute(load, time)
+                    changed.add(load.index)
+                if load.truck_assigned not in self.broken:
+                    ready[load.truck_assigned]=max(ready[load.truck_assigned], load.route.times[len(load.route)-1])
+        for truck in self.broken:
+            ready.pop(truck, None)
+
+        for load in self.loads.list:
+            if self.departed(load, time):
+                continue
+            if load.truck_requirement!=0:
+                truck=load.truck_requirement
+            elif load.truck_assigned in ready:
+                truck=load.truck_assigned
+            else:
+                truck=min(ready, key=lambda t: (ready[t], t))
+            departure=max(ready[truck], time)
+            for id in load.package_list:
+                departure=max(departure, self.packages.table[id].delay_time)
+            if load.package_list==[]:
+                if len(load.route)==0 or load.index in dirty:
+                    load.truck_assigned=truck
+                    load.departure_time=departure
+                    load.route=Route(departure)
+                    changed.add(load.index)
+                continue
+            if load.index not in dirty and load.truck_assigned==truck and len(load.route)>0 and departure<=load.departure_time:
+                ready[truck]=load.route.times[len(load.route)-1]
+                continue
+
+            #A load that must only leave later, with no address updates pending that could change its route, keeps its route and is only re-timed.
+            if (load.index not in dirty and load.truck_assigned==truck and len(load.route)>0
+            and all(self.packages.table[id].update_time==0 for id in load.package_list)):
+                shift=departure-load.departure_time
+                load.departure_time=departure
+                load.route.set_departure(departure)
+                for id in load.package_list:
+                    self.packages.table[id].delivery_time+=shift
+                ready[truck]=load.route.times[len(load.route)-1]
+                changed.add(load.index)
+                continue
+            load.truck_assigned=truck
+            load.departure_time=departure
+            self.route_from_hub(load, load.index in dirty)
+            ready[truck]=load.route.times[len(load.route)-1]
+            changed.add(load.index)
+        for truck in ready:
+            self.trucks.list[truck].time_available=ready[truck]
+        return sorted(changed)
@@ -0,0 +1,253 @@
+#Benjamin Gamman, 001439763
+"""Report.py defines the ReportWriter classes, which render the delivery schedule and package statuses as text, CSV, or JSON lines to any file-like object, in large buffered chunks."""
+
+from Timeline import DELAYED
+from Timeline import EN_ROUTE
+from Timeline import DELIVERED
+from Timeline import STATUS_NAMES
+from timemath import format_time
+import csv
+import json
+
+def stop_packages(load, packages):
+    """This function returns a dictionary of the IDs of the packages delivered on a load, keyed by the time they were delivered, so that each stop's packages can be found by its time.
+    IDs are listed in the order of the load's package list."""
+    #Time complexity: O(N)
+    #Each package in the load is visited once, rather than once for each stop.
+    #Space complexity: O(N)
+
+    delivered={}
+    for id in load.package_list:
+        delivered.setdefault(packages.table[id].delivery_time, []).append(id)
+    return delivered
+
+def status_details(package, loads, status):
+    """This function returns a tuple of the truck number and time that describe a package's status (the time delivered, loaded, or arriving at the hub); either may be None."""
+    #Time complexity: O(1)
+    #Space complexity: O(1)
+
+    if status==DELIVERED:
+        return loads.list[package.load_ind].truck_assigned, package.delivery_time
+    elif status==EN_ROUTE:
+        return loads.list[package.load_ind].truck_assigned, loads.list[package.load_ind].departure_time
+    elif status==DELAYED:
+        return None, package.delay_time
+    return None, None
+
+def stop_line(stop, locations, ids):
+    """This function returns the line of text describing one stop of a route (without a line break), as printed in the delivery schedule."""
+    #Time complexity: O(K)
+    #Each of the K packages delivered at the stop is listed.
+    #Space complexity: O(K)
+
+    line=('     '+format_time(stop[4])+'     '+'{0:>4.1f}'.format(stop[2])+' miles     '
+          +'{0:<29}'.format(locations.table[stop[0]].address[:29])+'   ')
+    for id in ids:
+        line+='#'+str(id)+'  '
+    return line
+
+def status_line(package, locations, loads, status):
+    """This function returns the line of text describing a package and its status (without a line break), as printed in status reports."""
+    #Time complexity: O(1)
+    #Space complexity: O(1)
+
+    l=locations.table[package.destination]
+    line=('{0:>11}'.format(package.id)+'   '+'{0:>4}'.format(str(package.weight))+' kg     '
+          +'{0:>29}'.format(l.address[:29])+'  '+'{0:>16}'.format(l.city)+', '+l.state+' '+l.zip+'     ')
+    if package.deadline==0:
+        line+='{0:>8}'.format('EOD')+'     '
+    else:
+        line+=format_time(package.deadline, '%H:%M %p')+'     '
+    truck, time=status_details(package, loads, status)
+    if status==DELIVERED:
+        line+='Delivered by Truck '+str(truck)+' at '+format_time(time, '%H:%M %p')
+    elif status==EN_ROUTE:
+        line+='En route, loaded onto Truck '+str(truck)+' at '+format_time(time, '%I:%M %p')
+    elif status==DELAYED:
+        line+='Delayed, arriving at the Hub at '+format_time(time, '%I:%M %p')
+    else:
+        line+='At the Hub'
+    return line
+
+class ReportWriter:
+    """The ReportWriter class collects the data for each part of a report (the routes of the schedule, or a list of package statuses) and passes it to methods
+    that each subclass defines to format it. Output is collected in a buffer and written to the sink (any object with a write() method) in chunks of at least buffer_size characters,
+    so that reports of any size are streamed without being built as one string, using few calls to write()."""
+    #Space complexity: O(B)
+    #Only the buffer, of about B characters, is held at a time.
+
+    def __init__(self, sink, buffer_size=65536):
+        """Initializes a ReportWriter writing to the provided sink with an empty buffer."""
+        #Time complexity: O(1)
+        #Space complexity: O(1)
+
+        self.sink=sink
+        self.buffer_size=buffer_size
+        self.buffer=[]
+        self.buffered=0
+
+    def write(self, text):
+        """This method adds text to the buffer, writing the buffer to the sink if it has reached the buffer size."""
+        #Time complexity: O(1) amortized
+        #Each character is copied once when the buffer is joined and written.
+
+        self.buffer.append(text)
+        self.buffered+=len(text)
+        if self.buffered>=self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        """This method writes the contents of the buffer to the sink and empties it."""
+        #Time complexity: O(B)
+
+        if self.buffer!=[]:
+            self.sink.write(''.join(self.buffer))
+            self.buffer=[]
+            self.buffered=0
+
+    def write_schedule(self, locations, packages, loads):
+        """This method writes the route of each load in the LoadList, followed by the total mileage of all routes."""
+        #Time complexity: O(N)
+        #Each load's packages are grouped by stop once (see stop_packages()), and each stop and package is then written once.
+        #Space complexity: O(B)
+
+        self.schedule_header()
+        mileage=0.0
+        for load in loads.list:
+            self.write_route(load, locations, packages)
+            mileage+=load.route[len(load.route)-1][2]
+        self.schedule_footer(mileage)
+        self.flush()
+
+    def write_route(self, load, locations, packages):
+        """This method writes the route of one load, with the packages delivered at each stop."""
+        #Time complexity: O(N)
+        #See write_schedule().
+
+        delivered=stop_packages(load, packages)
+        self.route_header(load)
+        for stop in load.route:
+            self.route_stop(load, stop, locations, delivered.get(stop[4], []))
+        self.route_footer(load)
+
+    def write_statuses(self, title, matches, locations, loads, statuses):
+        """This method writes a list of packages (any iterable of Package objects, which may be a generator) with their status codes,
+        taken from statuses (indexed by package ID, such as a Timeline snapshot)."""
+        #Time complexity: O(N)
+        #Each package is written once.
+        #Space complexity: O(B)
+
+        self.status_header(title)
+        count=0
+        for p in matches:
+            self.status_row(p, locations, loads, statuses[p.id])
+            count+=1
+        self.status_footer(count)
+        self.flush()
+
+    #The methods below write each part of a report. They write nothing by default, and are defined by each subclass as its format requires.
+    def schedule_header(self):
+        pass
+
+    def schedule_footer(self, mileage):
+        pass
+
+    def route_header(self, load):
+        pass
+
+    def route_stop(self, load, stop, locations, ids):
+        pass
+
+    def route_footer(self, load):
+        pass
+
+    def status_header(self, title):
+        pass
+
+    def status_row(self, package, locations, loads, status):
+        pass
+
+    def status_footer(self, count):
+        pass
+
+class TextReportWriter(ReportWriter):
+    """The TextReportWriter class writes reports as the formatted text displayed by the program's menu."""
+
+    def schedule_header(self):
+        self.write('Delivery Schedule:\n\n')
+
+    def schedule_footer(self, mileage):
+        self.write('Total Miles: '+'{:.1f}'.format(mileage)+'\n\n')
+
+    def route_header(self, load):
+        self.write(load.label+' Load'+', '+'Truck '+str(load.truck_assigned)+'\n'
+                   +'     Time:        Distance:      Stop Address:                   Packages Delivered:\n')
+
+    def route_stop(self, load, stop, locations, ids):
+        self.write(stop_line(stop, locations, ids)+'\n')
+
+    def route_footer(self, load):
+        self.write('\n')
+
+    def status_header(self, title):
+        self.write(title+'\n'+'Package ID:   Weight:     Destination:                                                 Deadline:     Status:\n')
+
+    def status_row(self, package, locations, loads, status):
+        self.write(status_line(package, locations, loads, status)+'\n')
+
+    def status_footer(self, count):
+        if count==0:
+            self.write('No matching packages found\n')
+        self.write('\n')
+
+class CSVReportWriter(ReportWriter):
+    """The CSVReportWriter class writes reports as CSV, with one row per stop (the schedule) or per package (statuses) and a header row naming the columns.
+    Times are written as HH:MM:SS, and the IDs of the packages delivered at a stop are separated by spaces."""
+
+    def __init__(self, sink, buffer_size=65536):
+        """Initializes a CSVReportWriter, which writes its rows to its own buffer through a csv writer."""
+        ReportWriter.__init__(self, sink, buffer_size)
+        self.rows=csv.writer(self, lineterminator='\n')
+
+    def schedule_header(self):
+        self.rows.writerow(['load', 'truck', 'time', 'distance', 'location', 'address', 'packages'])
+
+    def route_stop(self, load, stop, locations, ids):
+        self.rows.writerow([load.label, load.truck_assigned, format_time(stop[4]), '{0:.1f}'.format(stop[2]),
+                            stop[0], locations.table[stop[0]].address, ' '.join([str(id) for id in ids])])
+
+    def status_header(self, title):
+        self.rows.writerow(['id', 'weight', 'address', 'city', 'state', 'zip', 'deadline', 'status', 'truck', 'time'])
+
+    def status_row(self, package, locations, loads, status):
+        l=locations.table[package.destination]
+        truck, time=status_details(package, loads, status)
+        self.rows.writerow([package.id, package.weight, l.address, l.city, l.state, l.zip,
+                            format_time(package.deadline) if package.deadline!=0 else 'EOD', STATUS_NAMES[status],
+                            truck if truck is not None else '', format_time(time) if time is not None else ''])
+
+class JSONLinesReportWriter(ReportWriter):
+    """The JSONLinesReportWriter class writes reports as JSON lines, with one object per stop (the schedule) or per package (statuses), followed by a summary object.
+    Times are written as seconds since midnight."""
+
+    def write_object(self, data):
+        self.write(json.dumps(data)+'\n')
+
+    def schedule_footer(self, mileage):
+        self.write_object({'type':'schedule', 'miles':round(mileage, 1)})
+
+    def route_stop(self, load, stop, locations, ids):
+        self.write_object({'type':'stop', 'load':load.label, 'truck':load.truck_assigned, 'time':stop[4], 'distance':round(stop[2], 1),
+                           'location':stop[0], 'address':locations.table[stop[0]].address, 'packages':ids})
+
+    def status_row(self, package, locations, loads, status):
+        l=locations.table[package.destination]
+        truck, time=status_details(package, loads, status)
+        self.write_object({'type':'package', 'id':package.id, 'weight':package.weight, 'address':l.address, 'city':l.city, 'state':l.state, 'zip':l.zip,
+                           'deadline':package.deadline if package.deadline!=0 else None, 'status':STATUS_NAMES[status], 'truck':truck, 'time':time})
+
+    def status_footer(self, count):
+        self.write_object({'type':'summary', 'packages':count})
+
+#The writer used for each report format, by name.
+REPORT_WRITERS={'text':TextReportWriter, 'csv':CSVReportWriter, 'jsonl':JSONLinesReportWriter}
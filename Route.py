@@ -0,0 +1,106 @@
+#Benjamin Gamman, 001439763
+"""Route.py defines the Route class, which holds the stops of a load's route and their distances and times in typed columns."""
+
+from timemath import calc_time
+from array import array
+from itertools import accumulate
+
+class Route:
+    """The Route class holds a load's route as parallel typed arrays, one entry per stop: the location key, the distance from the previous stop, the distance travelled so far,
+    the time elapsed since leaving the hub (in seconds), and the time the stop is reached. The first stop is the hub, at the departure time.
+    Indexing a Route returns a stop's row as a tuple of those five values (route[i][4] being its time), so routes are read the same way as the lists of rows used before.
+    Elapsed times do not depend on the departure time, so moving the departure (see set_departure()) only recomputes the times, without any other work."""
+    #Space complexity: O(S)
+    #Each of S stops takes one entry in each of five arrays, with no object per stop.
+
+    __slots__=('keys', 'legs', 'distances', 'elapsed', 'times', 'departure_time')
+
+    def __init__(self, departure_time=None):
+        """Initializes a Route starting at the hub at the provided departure time, or an empty Route (for a load not yet routed) if no departure time is provided."""
+        #Time complexity: O(1)
+        #Space complexity: O(1)
+
+        self.keys=array('l')
+        self.legs=array('d')
+        self.distances=array('d')
+        self.elapsed=array('l')
+        self.times=array('l')
+        self.departure_time=0
+        if departure_time is not None:
+            self.departure_time=departure_time
+            self.add_row(0, 0.0, 0.0, 0)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __getitem__(self, index):
+        """Returns the row of the stop at an index (negative indexes count from the end), or a list of rows for a slice."""
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self.keys)))]
+        return (self.keys[index], self.legs[index], self.distances[index], self.elapsed[index], self.times[index])
+
+    def __iter__(self):
+        return zip(self.keys, self.legs, self.distances, self.elapsed, self.times)
+
+    def __eq__(self, other):
+        return list(self)==list(other)
+
+    def add_row(self, key, leg, distance, elapsed):
+        """This method adds a stop to the end of the route with its leg distance, distance so far, and elapsed time, and returns its index."""
+        #Time complexity: O(1) amortized
+        self.keys.append(key)
+        self.legs.append(leg)
+        self.distances.append(distance)
+        self.elapsed.append(elapsed)
+        self.times.append(self.departure_time+elapsed)
+        return len(self.keys)-1
+
+    def extend(self, keys, locations, speed_mph):
+        """This method adds the stops with the provided location keys to the end of the route, as TruckList.deliver() plans them before leaving the hub:
+        the distance so far is found with a cumulative sum of the legs, and the elapsed time at each stop is the time to travel that whole distance."""
+        #Time complexity: O(S)
+        #The legs are looked up in one pass, then summed in one call to accumulate().
+
+        prev=self.keys[len(self.keys)-1]
+        legs=[]
+        for key in keys:
+            legs.append(locations.distances[key][prev])
+            prev=key
+        start=self.distances[len(self.distances)-1]
+        for i, distance in enumerate(accumulate(legs, initial=start)):
+            if i>0:
+                self.add_row(keys[i-1], legs[i-1], distance, calc_time(distance, speed_mph))
+
+    def append(self, key, locations, speed_mph):
+        """This method adds one stop to the end of the route after it has left the hub, timing it by adding the time to travel its leg to the elapsed time at the previous stop,
+        and returns its index."""
+        #Time complexity: O(1) amortized
+
+        last=len(self.keys)-1
+        leg=locations.distances[key][self.keys[last]]
+        return self.add_row(key, leg, self.distances[last]+leg, self.elapsed[last]+calc_time(leg, speed_mph))
+
+    def wait(self, until):
+        """This method adds a second stop at the hub, where the truck waits until the provided time (such as for an address update), and returns its index."""
+        #Time complexity: O(1) amortized
+
+        last=len(self.keys)-1
+        return self.add_row(0, 0.0, self.distances[last], until-self.departure_time)
+
+    def truncate(self, length):
+        """This method removes every stop after the first length stops."""
+        #Time complexity: O(S)
+        del self.keys[length:]
+        del self.legs[length:]
+        del self.distances[length:]
+        del self.elapsed[length:]
+        del self.times[length:]
+
+    def set_departure(self, departure_time):
+        """This method moves the route's departure to the provided time, updating the time of each stop from its elapsed time."""
+        #Time complexity: O(S)
+        #Each stop's time is recomputed in place; the elapsed times are kept.
+
+        self.departure_time=departure_time
+        for i in range(len(self.times)):
+            self.times[i]=departure_time+self.elapsed[i]
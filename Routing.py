@@ -0,0 +1,435 @@
+#Benjamin Gamman, 001439763
+"""Routing.py defines the routing strategies used by TruckList.deliver() to choose the order of a load's stops, and associated functions."""
+
+from timemath import make_time
+from timemath import add_times
+from timemath import calc_time
+from localsearch import tour_length
+from math import fabs
+from math import inf
+
+def next_stop_greedy(prev_stop, stops_set, locations):
+    """This function employs a greedy algorithm with some built-in correction to select and return the next stop from a list of options given the previous stop."""
+    #This is defined as a separate function from the rest of the routing algorithm because it is used repeatedly (in GreedyRouting.order() and TruckList.deliver()), so is more efficiently defined once here.
+    #Space Complexity: O(N^2)
+    #The function accesses the LocationTable object, which is O(N^2).
+    #Time complexity: O(N)
+    #Each use of this greedy selection performs one batched nearest-neighbor query and one loop through the provided set of stops (which cannot exceed the total number of packages in length).
+    #Each is therefore O(N), and O(N)+O(N)=O(2N)=O(N).
+    
+    #First, applies a simple greedy algorithm to select the location within the provided set that is closest to the previous stop.
+    #This is a single query on the distance matrix over the row of the previous stop, rather than one lookup per stop.
+    #"Ties" in which two options are the same distance away are not addressed yet, as they will be in the second loop for corrections.
+    next_stop=locations.distances.nearest(prev_stop, stops_set)
+    if next_stop is None:
+        next_stop=0
+
+    #Then, each option is checked against the "greedy" winner. If their distances differ by less than 0.5 miles and the further option is closer to the hub, it is selected instead.
+    #The distance that is checked against remains unchanged though, to avoid a chain of switches in which each is within 0.5 miles of the last but may be much further from the original "greedy" choice.
+    #Choosing the point further from the hub here decreases the likelihood of leaving it for last, resulting in a long return distance to the hub at the end of the route.
+    #This must be done in a second separate loop to ensure that only the best "greedy" choice is compared to other options on this basis, not any intermediate options.
+    #The rows for the previous stop and the hub are fetched once, as the matrix is symmetric (distances[stop][prev_stop]==distances[prev_stop][stop]).
+    prev_row=locations.distances.row(prev_stop)
+    hub_row=locations.distances.row(0)
+    for stop in stops_set:
+        if (fabs(prev_row[stop]-prev_row[next_stop])<0.5
+        and hub_row[stop]-hub_row[next_stop]>1.0):
+            next_stop=stop
+    return next_stop
+
+class RoutingStrategy:
+    """The RoutingStrategy class defines the interface for routing strategies: given a load whose truck and departure time have been set, a strategy returns the order in which to visit its stops.
+    TruckList.deliver() then computes times, handles address updates, and returns the truck to the hub, whichever strategy is used."""
+    #Space complexity: O(1)
+
+    def order(self, load, packages, locations, speed_mph):
+        """This method returns a tuple of the list of location keys of the load's stops in the order to visit them (not including the hub),
+        and the number of stops at the start of that list that must stay in place if the route is improved further."""
+        raise NotImplementedError
+
+    def plan(self, load, packages, locations, speed_mph):
+        """This method is used when routes are planned in parallel, before the load's actual departure time is known (its departure_time is an estimate).
+        It returns a dictionary of candidate orders (as returned by order()), to be chosen from by select() once the actual departure time is set.
+        By default, the only candidate is the order for the estimated departure time."""
+        return {load.departure_time:self.order(load, packages, locations, speed_mph)}
+
+    def select(self, plan, load, packages, locations, speed_mph):
+        """This method returns the order from a plan that applies at the load's actual departure time, or None if the route must be ordered again."""
+        return plan.get(load.departure_time)
+
+class GreedyRouting(RoutingStrategy):
+    """The GreedyRouting class is the original routing strategy: if the load's first deadline is within an hour of departure, the stops with that deadline are visited first,
+    otherwise the route starts at a point between two poles of the load's stops; the rest of the stops are then chosen with a greedy nearest-neighbor selection."""
+    #Space complexity: O(1)
+
+    def first_deadline(self, load, packages, locations):
+        """This method returns the earliest deadline among the load's packages and the location of the package with that deadline.
+        If packages are tied with the same earliest deadline, the location closest to the hub is chosen."""
+        #Space Complexity: O(1)
+        #Time complexity: O(N)
+        #Each package in the load is checked once.
+
+        first_deadline_stop=0
+        first_deadline=make_time(23,59)
+        for id in load.package_list:
+            if (packages.table[id].deadline!=0 and packages.table[id].deadline<first_deadline):
+                first_deadline=packages.table[id].deadline
+                first_deadline_stop=packages.table[id].destination
+            elif (packages.table[id].deadline==first_deadline
+            and locations.distances[packages.table[id].destination][0]<locations.distances[first_deadline_stop][0]):
+                first_deadline=packages.table[id].deadline
+                first_deadline_stop=packages.table[id].destination
+        return first_deadline, first_deadline_stop
+
+    def deadline_first(self, load, packages, locations):
+        """This method returns True if the load's first deadline is within an hour of its departure time, in which case the stops with that deadline are visited first."""
+        #Space Complexity: O(1)
+        #Time complexity: O(N)
+
+        first_deadline, first_deadline_stop=self.first_deadline(load, packages, locations)
+        return add_times(load.departure_time, make_time(1,0))>=first_deadline
+
+    def order(self, load, packages, locations, speed_mph):
+        """This method returns the order of the load's stops determined by the greedy algorithm, along with the number of deadline stops visited first."""
+        #Space Complexity: O(N)
+        #Time complexity: O(N^2)
+        #See GreedyRouting.order_branch().
+
+        return self.order_branch(load, packages, locations, self.deadline_first(load, packages, locations))
+
+    def plan(self, load, packages, locations, speed_mph):
+        """This method returns the orders of the load's stops for both branches of the greedy algorithm (deadline stops first or not), keyed by the branch,
+        since which branch applies depends only on whether the departure time is within an hour of the load's first deadline."""
+        #Space Complexity: O(N)
+        #Time complexity: O(N^2)
+
+        return {True:self.order_branch(load, packages, locations, True),
+                False:self.order_branch(load, packages, locations, False)}
+
+    def select(self, plan, load, packages, locations, speed_mph):
+        """This method returns the order from the plan for the branch that applies at the load's actual departure time."""
+        #Space Complexity: O(1)
+        #Time complexity: O(N)
+
+        return plan.get(self.deadline_first(load, packages, locations))
+
+    def order_branch(self, load, packages, locations, deadline_first):
+        """This method returns the order of the load's stops determined by the greedy algorithm, either visiting the stops with the first deadline first or starting between two poles."""
+        #Space Complexity: O(N)
+        #Time complexity: O(N^2)
+        #Choosing stops by calling the core greedy selection function gives O(N^2) time complexity:
+        #At most one call for each stop, each of which loops through a list of possible stops no greater than N, and performing an O(N) task O(N) times gives O(N)*O(N)=O(N^2) complexity.
+
+        if load.stops==set():
+            return [], 0
+
+        #The route starts at the hub (location 0), so the hub is the first key in the list of stops being built; it is left off of the list returned.
+        #A new set is created of remaining stops that can be modified, leaving the load's original set of stops intact.
+        route=[locations.table[0].key]
+        fixed_stops=0
+        remaining_stops=set()
+        for stop in load.stops:
+            remaining_stops.add(stop)
+        first_deadline, first_deadline_stop=self.first_deadline(load, packages, locations)
+        if first_deadline_stop not in remaining_stops:
+            deadline_first=False
+
+        #If the load's first deadline is within an hour of the load's departure time, the following steps are used to determine a route.
+        #The first stop added to the route is the first deadline location.
+        if deadline_first==True:
+            deadline=True
+            next_stop=first_deadline_stop
+
+            #While any remaining stops have that same deadline, the nearest of those locations from the preceding location is added to the route next.
+            #This is a greedy selection, but not using the method above because it must consider only locations with the same deadline,
+            #and this variation of the greedy selection is employed only here.
+            #It breaks ties based on average distances, choosing the location with greater average distance first,
+            #on the basis that it will be more advantageous to leave shorter distances available for later at no cost to distance here.
+            while deadline==True:
+                route.append(next_stop)
+                remaining_stops.remove(next_stop)
+                deadline=False
+                next_stop_dist=100
+                next_stop=0
+                for stop in remaining_stops:
+                    if locations.table[stop].deadline==first_deadline:
+                        deadline=True
+                        stop_dist=locations.distances[stop][route[len(route)-1]]
+                        if (next_stop_dist-stop_dist>0.001
+                        or (fabs(next_stop_dist-stop_dist)<=0.001
+                        and locations.table[stop].avg_dist>locations.table[next_stop].avg_dist)):
+                            next_stop=stop
+                            next_stop_dist=stop_dist
+
+            #After those stops have been added to the route, the greedy selection method above selects next stops to add to the route until the remaining stops set is empty.
+            #This means that all known destinations have been visited, but does not necessarily complete the route;
+            #destination keys of packages with unknown/incorrect addresses were not added to the load's set of stops, so they may not have been visited yet.
+            #This will be accounted for later in the portion of the algorithm determining times.
+            fixed_stops=len(route)-1
+            while remaining_stops!=set():
+                next_stop=next_stop_greedy(route[len(route)-1], remaining_stops, locations)
+                route.append(next_stop)
+                remaining_stops.remove(next_stop)
+
+        #If the load's first deadline is more than an hour after departure, these steps are taken instead.
+        else:
+
+            #The route's first stop is determined based on two poles within the load's required stops that are far from each other and on average from other locations.
+            #This is similar to the process used to assign locations to regions during import,
+            #but restricted to stops in the load being considered and without the ring-based constraints (as a load may be heavily skewed toward one ring or another).
+            #Pole 1 of the route is set as the stop with the highest average distance.
+            #Pole 2 is set as the stop furthest from Pole 1.
+            #The "tie-breaking" calculations used in determining the overall regional poles earlier are not employed here.
+            #Given the smaller number of locations in a load vs. the entire set of destinations, ties are less likely,
+            #and breaking them in a precise way is less likely to be worth the calculations as it will affect only one load rather than the overall distribution of the packages.
+            route_pole1=0
+            high_dist=0
+            for l in load.stops:
+                if locations.table[l].avg_dist>high_dist:
+                    route_pole1=l
+                    high_dist=locations.table[l].avg_dist
+            route_pole2=route_pole1
+            high_dist=0
+            for l in load.stops:
+                if locations.distances[l][route_pole1]>high_dist:
+                    route_pole2=l
+                    high_dist=locations.distances[l][route_pole1]
+
+            #The first stop is selected as the location in the load's set of stops that has the highest sum of distances to the two route poles, minus its distance from the hub.
+            #(The route poles themselves are excluded from consideration as a start point.)
+            #Considering the sum of pole distances results in a start point that is more or less midway between the poles, and somewhat out from a direct line between them
+            #(based on the idea of the Pythagorean theorem, it will be further from the poles than a point along that direct line).
+            #This helps make the route more of a circuit in shape, while also factoring in the distance to the hub helps avoid a long initial distance to get to the start point.
+            first_stop=0
+            high_dist=0
+            for l in load.stops:
+                composite_dist=(locations.distances[l][route_pole1]
+                                +locations.distances[l][route_pole2]
+                                -locations.distances[l][0])
+                if composite_dist>high_dist and l!=route_pole1 and l!=route_pole2:
+                    first_stop=l
+                    high_dist=composite_dist
+            #If the load has too few stops for a start point other than the poles, the route starts at Pole 1.
+            if first_stop==0:
+                first_stop=route_pole1
+            route.append(first_stop)
+            remaining_stops.remove(first_stop)
+
+            #After that first stop is selected, the above greedy selection method is used to choose the order of the known remaining stops.
+            #As with the previous case, packages without known destinations are not considered for now.
+            while remaining_stops!=set():
+                next_stop=next_stop_greedy(route[len(route)-1], remaining_stops, locations)
+                route.append(next_stop)
+                remaining_stops.remove(next_stop)                            
+        return route[1:], fixed_stops
+
+class InsertionRouting(RoutingStrategy):
+    """The InsertionRouting class builds a route by repeatedly inserting a stop into the position in the route where it adds the least distance, while checking each stop's deadline.
+    With regret=True (the default), the stop inserted next is the one that would lose the most by waiting (the largest difference between its best and second-best insertion costs);
+    otherwise, the stop with the cheapest insertion is inserted next.
+    Deadlines are checked in O(1) time per candidate position using a forward slack array: for each position, the least extra distance any stop from there to the end of the route can absorb before missing its deadline.
+    Insertion can outline a load's route around its deadline stops in a way that makes the round trip longer than the greedy order's, which would leave the truck's later loads less time
+    for their deadlines, so the greedy order (see GreedyRouting) is used instead whenever it is better for the load (see order())."""
+    #Space complexity: O(1)
+
+    def __init__(self, regret=True):
+        """Initializes the strategy, selecting regret insertion or cheapest insertion."""
+        #Space complexity: O(1)
+        #Time complexity: O(1)
+
+        self.regret=regret
+
+    def select(self, plan, load, packages, locations, speed_mph):
+        """This method returns the planned order if it still meets every deadline of the load's packages at the load's actual departure time, or None otherwise."""
+        #Space complexity: O(N)
+        #Time complexity: O(N)
+        #The planned route's cumulative distance is computed once, and each package's deadline is checked against its stop's arrival time.
+
+        if load.departure_time in plan:
+            return plan[load.departure_time]
+        stop_keys, fixed_stops=list(plan.values())[0]
+        if self.late_packages(stop_keys, load, packages, locations, speed_mph)>0:
+            return None
+        return stop_keys, fixed_stops
+
+    def late_packages(self, stop_keys, load, packages, locations, speed_mph):
+        """This method returns the number of the load's packages that would be delivered after their deadlines if its stops were visited in the provided order from its departure time."""
+        #Space complexity: O(N)
+        #Time complexity: O(N)
+        #The route's cumulative distance is computed once, and each package's deadline is checked against its stop's arrival time.
+
+        arrival={}
+        dist=0.0
+        prev=0
+        for key in stop_keys:
+            dist+=locations.distances[prev][key]
+            arrival[key]=load.departure_time+calc_time(dist, speed_mph)
+            prev=key
+        late=0
+        for id in load.package_list:
+            p=packages.table[id]
+            if p.deadline!=0 and p.destination in arrival and arrival[p.destination]>p.deadline:
+                late+=1
+        return late
+
+    def order(self, load, packages, locations, speed_mph):
+        """This method returns the order of the load's stops determined by insertion (see insert_stops()), unless the greedy order of GreedyRouting delivers fewer of the load's packages late,
+        or as few late but with a shorter round trip from the hub, in which case the greedy order is returned.
+        The round trip sets when the truck is back at the hub for its next load, so choosing the shorter one never gives the truck's later loads less time for their deadlines."""
+        #Space Complexity: O(N)
+        #Time complexity: O(N^2)
+        #See insert_stops() and GreedyRouting.order(); each order is then checked in O(N) time.
+
+        best=None
+        best_score=None
+        for stop_keys, fixed_stops in (self.insert_stops(load, packages, locations, speed_mph), GreedyRouting().order(load, packages, locations, speed_mph)):
+            score=(self.late_packages(stop_keys, load, packages, locations, speed_mph), tour_length([0]+stop_keys+[0], locations))
+            if best is None or score<best_score:
+                best=(stop_keys, fixed_stops)
+                best_score=score
+        return best
+
+    def insert_stops(self, load, packages, locations, speed_mph):
+        """This method returns the order of the load's stops determined by insertion, with no stops fixed in place."""
+        #Space Complexity: O(N)
+        #Time complexity: O(N^2)
+        #Each of N insertions updates the route's cumulative distance and slack arrays in O(N) time, and updates each remaining stop's cached best insertions,
+        #which takes O(1) time per stop unless the cached positions were used up or made infeasible by the insertion, in which case that stop is re-evaluated in O(N) time.
+
+        if load.stops==set():
+            return [], 0
+        dist=locations.distances
+
+        #Each stop's deadline (the earliest among the load's packages going there) is converted into the latest cumulative route distance at which that stop can be reached.
+        #Half a second is allowed for the rounding of travel times to the nearest second.
+        latest={}
+        for id in load.package_list:
+            p=packages.table[id]
+            if p.deadline!=0 and p.destination in load.stops:
+                miles=(p.deadline-load.departure_time+0.5)*speed_mph/3600
+                if miles<latest.get(p.destination, inf):
+                    latest[p.destination]=miles
+
+        #The route begins as a trip from the hub straight back to the hub.
+        #For each position in the route, cum holds the cumulative distance and slack holds the forward slack described above; pos maps each stop to its position.
+        tour=[0, 0]
+        cum=[0.0, 0.0]
+        slack=[inf, inf]
+        pos={0:0}
+
+        def update_route(start):
+            for i in range(start, len(tour)):
+                cum[i]=cum[i-1]+dist[tour[i-1]][tour[i]]
+                pos[tour[i]]=i
+            pos[0]=0
+            slack[len(tour)-1]=inf
+            for i in range(len(tour)-2, 0, -1):
+                slack[i]=min(slack[i+1], latest.get(tour[i], inf)-cum[i])
+            slack[0]=slack[1]
+
+        def feasible(k, row, a):
+            #Inserting k after a is feasible if k is reached by its deadline and the added distance fits within the slack of the rest of the route.
+            i=pos[a]
+            b=tour[i+1]
+            detour=row[a]+row[b]-dist[a][b]
+            return cum[i]+row[a]<=latest.get(k, inf) and detour<=slack[i+1], detour
+
+        def evaluate(k):
+            #Returns [best cost, stop to insert after, second-best cost, stop to insert after] over all feasible positions.
+            row=dist.row(k)
+            entry=[inf, -1, inf, -1]
+            for i in range(len(tour)-1):
+                ok, detour=feasible(k, row, tour[i])
+                if ok==True:
+                    merge(entry, detour, tour[i])
+            return entry
+
+        def merge(entry, detour, a):
+            if detour<entry[0]:
+                entry[2]=entry[0]
+                entry[3]=entry[1]
+                entry[0]=detour
+                entry[1]=a
+            elif detour<entry[2]:
+                entry[2]=detour
+                entry[3]=a
+
+        unrouted=sorted(load.stops)
+        cache={}
+        for k in unrouted:
+            cache[k]=evaluate(k)
+        deferred=[]
+        while unrouted!=[]:
+
+            #Selects the next stop to insert. Stops with deadlines are inserted before stops without, so that the deadline stops form the outline of the route
+            #and the others are fit into the slack that remains. Stops with no feasible position left cannot be reached by their deadline however the route continues,
+            #so they are set aside and inserted after all others.
+            chosen=None
+            chosen_score=None
+            for k in unrouted:
+                best, after, second, second_after=cache[k]
+                if best==inf:
+                    continue
+                has_deadline=k in latest
+                if self.regret==True:
+                    score=(has_deadline, second-best, -best, -k)
+                else:
+                    score=(has_deadline, -best, -k)
+                if chosen is None or score>chosen_score:
+                    chosen=k
+                    chosen_score=score
+            if chosen is None:
+                deferred.extend(unrouted)
+                break
+            unrouted.remove(chosen)
+            a=cache[chosen][1]
+            del cache[chosen]
+
+            #Inserts the stop and updates the route's arrays from the insertion point on.
+            i=pos[a]
+            b=tour[i+1]
+            tour.insert(i+1, chosen)
+            cum.append(0.0)
+            slack.append(inf)
+            update_route(i+1)
+
+            #Updates each remaining stop's cached insertions. If either cached position used the edge just replaced, or is no longer feasible, the stop is re-evaluated;
+            #otherwise only the two new edges need to be checked.
+            for k in unrouted:
+                entry=cache[k]
+                row=dist.row(k)
+                if entry[1]==a or entry[3]==a:
+                    cache[k]=evaluate(k)
+                    continue
+                if ((entry[1]!=-1 and feasible(k, row, entry[1])[0]==False)
+                or (entry[3]!=-1 and feasible(k, row, entry[3])[0]==False)):
+                    cache[k]=evaluate(k)
+                    continue
+                for new_a in (a, chosen):
+                    ok, detour=feasible(k, row, new_a)
+                    if ok==True:
+                        merge(entry, detour, new_a)
+
+        #Any stops that cannot meet their deadlines are inserted where they add the least distance without making other stops late, or where they add the least distance if there is no such position.
+        for k in deferred:
+            row=dist.row(k)
+            best=inf
+            best_after=0
+            fallback=inf
+            fallback_after=0
+            for i in range(len(tour)-1):
+                detour=row[tour[i]]+row[tour[i+1]]-dist[tour[i]][tour[i+1]]
+                if detour<fallback:
+                    fallback=detour
+                    fallback_after=tour[i]
+                if detour<=slack[i+1] and detour<best:
+                    best=detour
+                    best_after=tour[i]
+            if best==inf:
+                best_after=fallback_after
+            i=pos[best_after]
+            tour.insert(i+1, k)
+            cum.append(0.0)
+            slack.append(inf)
+            update_route(i+1)
+        return tour[1:len(tour)-1], 0
@@ -0,0 +1,173 @@
+#Benjamin Gamman, 001439763
+"""ScenarioSweep.py defines the ScenarioSweep class, which evaluates a day's deliveries under every combination of a grid of fleet parameters (number of trucks, truck capacity,
+truck speed, and start time), importing the network and packages only once and planning the scenarios in parallel, and reports each scenario's mileage, late packages, other constraint violations,
+and finish time."""
+
+from Planner import Planner
+from Feasibility import check_plan
+from snapshot import snapshot
+from snapshot import restore
+from timemath import parse_time
+from timemath import format_time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+import csv
+
+#The fleet parameters that can be varied, each with the function that reads one of its values (start times are entered as "HH:MM").
+PARAMETERS={'num_trucks':int, 'truck_capacity':int, 'truck_speed':int, 'start_time':lambda value: parse_time(value, '%H:%M')}
+
+#The parameters whose values must be positive.
+POSITIVE=['num_trucks', 'truck_capacity', 'truck_speed']
+
+#The columns of the results table, after the parameters. The load builder is the method that sorted the packages into loads ("sort" for LoadList.sort() or "build" for LoadList.build(),
+#see Planner.loads), as it can change with the number of trucks and affects the results as much as the parameters do.
+COLUMNS=['load_builder', 'miles', 'late', 'violations', 'finish_time', 'error']
+
+def read_grid(args, defaults):
+    """This function returns a grid of parameter values (a dictionary of lists, keyed by parameter name) read from a list of arguments such as "num_trucks=2,3" or "start_time=08:00,09:30".
+    Parameters not given keep the single value provided in defaults. A ValueError is raised for an unknown parameter or invalid value, including a number of trucks, capacity, or speed that is not positive."""
+    #Time complexity: O(V)
+    #Each of V values is read once.
+
+    grid={}
+    for name in PARAMETERS:
+        grid[name]=[defaults[name]]
+    for arg in args:
+        name, separator, values=arg.partition('=')
+        if name not in PARAMETERS or separator=='':
+            raise ValueError('Unknown parameter: '+arg+' (expected one of '+', '.join(PARAMETERS)+', such as num_trucks=2,3)')
+        grid[name]=[]
+        for value in values.split(','):
+            try:
+                grid[name].append(PARAMETERS[name](value.strip()))
+            except ValueError:
+                raise ValueError('Invalid value for '+name+': "'+value+'"') from None
+            if name in POSITIVE and grid[name][len(grid[name])-1]<=0:
+                raise ValueError(name+' must be positive, found '+value)
+    return grid
+
+def scenarios(grid):
+    """This function returns the list of every combination of the grid's parameter values, each as a dictionary of settings for Planner.__init__()."""
+    #Time complexity: O(S)
+    #Space complexity: O(S)
+
+    names=list(grid)
+    return [dict(zip(names, values)) for values in product(*[grid[name] for name in names])]
+
+def evaluate(data, network, scenario, settings):
+    """This function plans the loads and routes of one scenario from a snapshot of the day's LocationTable and PackageTable (see snapshot.py) and returns a dictionary of its parameters and results:
+    the total miles driven, the number of packages delivered after their deadlines, the number of other constraint violations (see check_plan()), and the time the last truck returns to the hub.
+    If the scenario cannot be planned (such as when a package requires a truck that is not in the fleet), its results are None and its error describes why;
+    any error raised while planning is reported this way, so that one scenario never stops the sweep.
+    More than two trucks require loads to be built with LoadList.build(), which is requested unless the settings specify build_loads;
+    the Planner still uses LoadList.sort()'s loads if they are delivered better (see Planner.loads), so that building loads never plans a scenario worse than sorting them would, and the result's load_builder records which was used."""
+    #Time complexity: O(N^3)
+    #See TruckList.deliver().
+    #Space complexity: O(N)
+
+    locations, packages=restore(data, network)
+    scenario_settings=dict(settings)
+    scenario_settings.update(scenario)
+    scenario_settings.setdefault('build_loads', scenario_settings.get('num_trucks', 2)>2)
+    #The load builder requested is recorded until planning records the one used.
+    result=dict(scenario)
+    result['load_builder']='build' if scenario_settings['build_loads']==True else 'sort'
+    try:
+        planner=Planner(locations, packages, **scenario_settings)
+        planner.trucks
+        result['load_builder']=planner.load_builder
+    except Exception as e:
+        #A ValueError describes a scenario that cannot be planned, so its message is shown as is; any other error is also named.
+        error=str(e) if isinstance(e, ValueError) else type(e).__name__+': '+str(e)
+        result.update({'miles':None, 'late':None, 'violations':None, 'finish_time':None, 'error':error})
+        return result
+    report=check_plan(packages, planner.loads)
+    result.update({'miles':round(report.miles, 1), 'late':len(report.late), 'violations':report.violations()-len(report.late),
+                   'finish_time':report.finish_time, 'error':''})
+    return result
+
+#The snapshot and network used by a worker process, set once when the worker starts.
+_worker_data=None
+_worker_network=None
+
+def _init_worker(data, network):
+    """This function stores the snapshot and network in a worker process when the process pool starts, so that every scenario evaluated by that worker restores its plan from them."""
+    #Time complexity: O(1)
+    #Space complexity: O(1)
+
+    global _worker_data
+    global _worker_network
+    _worker_data=data
+    _worker_network=network
+
+def _evaluate_worker(scenario, settings):
+    """This function runs in a worker process to evaluate one scenario (see evaluate())."""
+    #Time complexity: O(N^3)
+    return evaluate(_worker_data, _worker_network, scenario, settings)
+
+class ScenarioSweep:
+    """The ScenarioSweep class evaluates one day's deliveries under many combinations of fleet parameters:
+        sweep=ScenarioSweep('locations.csv', 'packages.csv', workers=4)
+        results=sweep.run({'num_trucks':[2, 3], 'truck_speed':[18, 25], 'truck_capacity':[16], 'start_time':[make_time(8,0)]})
+        sweep.write_table(results, sys.stdout)
+    The network and packages are imported once, and a snapshot of them is restored for each scenario, so only sorting the loads and delivering them is repeated.
+    If workers is greater than 1, scenarios are evaluated in parallel in that many worker processes, each receiving the network and snapshot once."""
+    #Space complexity: O(N^2+S)
+    #The network is held once, along with the O(N) snapshot and one result for each of S scenarios.
+
+    def __init__(self, locations='locations.csv', packages='packages.csv', workers=1, **settings):
+        """Initializes a ScenarioSweep for a day's locations and packages (as accepted by Planner.__init__()), which are imported the first time the sweep is run.
+        Any other keyword arguments are settings of Planner.__init__() used by every scenario (such as strategy or improve)."""
+        #Time complexity: O(1)
+        #Space complexity: O(1)
+
+        self.planner=Planner(locations, packages)
+        self.workers=workers
+        self.settings=settings
+        self.data=None
+
+    def run(self, grid):
+        """This method evaluates every combination of the grid's parameter values (see scenarios()) and returns the list of their results (see evaluate()), in the order of the combinations."""
+        #Time complexity: O(S*N^3/W)
+        #Each of S scenarios is planned once (see TruckList.deliver()), divided between W worker processes.
+        #Space complexity: O(N^2+S)
+
+        if self.data is None:
+            self.data=snapshot((self.planner.locations, self.planner.packages), self.planner.network)
+        combinations=scenarios(grid)
+        if self.workers<=1 or len(combinations)<=1:
+            return [evaluate(self.data, self.planner.network, scenario, self.settings) for scenario in combinations]
+
+        #Scenarios are sent to the workers in chunks, as each is quick to evaluate compared to sending it to a worker on its own.
+        chunk_size=max(1, len(combinations)//(self.workers*4))
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker, initargs=(self.data, self.planner.network)) as pool:
+            return list(pool.map(_evaluate_worker, combinations, [self.settings]*len(combinations), chunksize=chunk_size))
+
+    def write_table(self, results, sink, report_format='text'):
+        """This method writes a table of results, one row per scenario, to a file-like object as aligned text (report_format 'text') or as csv (report_format 'csv').
+        Start and finish times are written as "HH:MM AM"."""
+        #Time complexity: O(S)
+
+        names=[name for name in PARAMETERS if len(results)>0 and name in results[0]]+COLUMNS
+        rows=[]
+        for result in results:
+            row=[]
+            for name in names:
+                value=result.get(name)
+                if value is None:
+                    value=''
+                elif name in ('start_time', 'finish_time'):
+                    value=format_time(value, '%I:%M %p')
+                row.append(str(value))
+            rows.append(row)
+        if report_format=='csv':
+            writer=csv.writer(sink)
+            writer.writerow(names)
+            writer.writerows(rows)
+            return
+        widths=[len(name) for name in names]
+        for row in rows:
+            widths=[max(widths[i], len(row[i])) for i in range(len(names)-1)]+[0]
+        sink.write('  '.join([names[i].ljust(widths[i]) for i in range(len(names))]).rstrip()+'\n')
+        for row in rows:
+            sink.write('  '.join([row[i].ljust(widths[i]) for i in range(len(names))]).rstrip()+'\n')
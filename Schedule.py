@@ -7,7 +7,10 @@ from Location import Location
 from Location import LocationTable
 from Load import Load
 from Load import LoadList
-from datetime import time
+from Timeline import Timeline
+from Report import REPORT_WRITERS
+from timemath import format_time
+import sys
 
 class Schedule:
     """The Schedule class holds references to the other data structures (LocationsList, PackagesList, and LoadsList) needed to execute the menu's command options."""
@@ -15,63 +18,69 @@ class Schedule:
         #Although the Schedule object will reference much more complex data structures, it will contain only references to them and no complex data itself.
 
     def __init__(self, locations, packages, loads):
-        """Initializes the Schedule's data members to reference the provided data structures."""
-        #Space complexity: O(1)
-        #Although the objects being referenced are more complex, the Schedule object only stores references to them, and their data is not accessed in initializing the Schedule.
-        #Time complexity: O(1)
-        #Just three assignments of reference variables are performed.
+        """Initializes the Schedule's data members to reference the provided data structures, and builds a Timeline of the packages' status changes.
+        The Schedule should be created after the packages have been delivered (see TruckList.deliver())."""
+        #Space complexity: O(N)
+        #Although the objects being referenced are more complex, the Schedule object only stores references to them, along with the Timeline, which is O(N).
+        #Time complexity: O(N log(N))
+        #Building the Timeline sorts the packages' status changes by time.
 
         self.locations=locations
         self.packages=packages
         self.loads=loads
+        self.timeline=Timeline(packages, loads)
 
     def print_schedule(self):
         """This method prints the entire schedule, by printing the route travelled for each load of packages."""
         #Space complexity: O(N^2)
         #The method accesses the PackageTable and LocationTable objects referenced by the Schedule, each of which is O(N^2) space complexity.
-        #Time complexity: O(N^2)
-        #A loop calls the Load.print_route() method, which will then loop through each of the load route's stops to print.
+        #Time complexity: O(N)
         #However many loads there are and however stops are distributed among them, there will ultimately be no more stops in total than packages
         #(excluding starting and stopping at the hub, which even if doubling the number of stops would still be O(N)+O(N)=O(N)).
-        #So, this will result in performing those print operations for stops O(N) times, each of which will check O(N) packages in the load,
-        #multiplying to O(N^2) time complexity overall.
+        #Each load's packages are grouped by stop once, so each stop and package is printed once (see Report.py).
 
-        print('Delivery Schedule:')
-        print()
-        mileage=0.0
-        for load in self.loads.list:
-            load.print_route(self.locations, self.packages)
-            mileage+=load.route[len(load.route)-1][2]
-        print('Total Miles: '+'{:.1f}'.format(mileage))
-        print()
+        self.write_schedule(sys.stdout)
 
     def status_all(self, status_time):
         """This method displays information and status for all packages at a specified time."""
         #Space complexity: O(N^2)
         #The method accesses the PackageTable and LocationTable objects referenced by the Schedule, each of which is O(N^2) space complexity.
         #Time complexity: O(N)
-        #A loop calls the Package.print_package_status() method, which is O(1), for each package (N times). This results in N*O(1)=O(N) time complexity.
+        #The status of every package is taken from a snapshot of the Timeline (see Timeline.snapshot()), then one line is printed for each package (N times).
         
-        print('Status of all packages at '+status_time.strftime('%I:%M %p')+':')
-        print('Package ID:   Weight:     Destination:                                                 Deadline:     Status:')
-        for p in self.packages.table[1:]:
-              p.print_package_status(self.packages, self.locations, self.loads, status_time)
-        print()
+        self.write_status(sys.stdout, status_time)
 
     def status_search(self, status_time, search_term):
         """This method displays information and status for each package matching a provided search term at a specified time, using the PackageList's lookup() method."""
         #Space complexity: O(N^2)
         #The method accesses the PackageTable and LocationTable objects referenced by the Schedule, each of which is O(N^2) space complexity.
         #Time complexity: O(N)
-        #This method calls the PackageTable.lookup() method, which is O(N).
-        #Then, a loop calls the Package.print_package_status() method, which is O(1), for each package (N times). This portion has N*O(1)=O(N) time complexity.
-        #Combined, these two portions of the method give O(N)+O(N)=O(2N)=O(N) time complexity for the method.
+        #This method calls the PackageTable.lookup() method, then prints one line for each matching package (up to N times).
         
-        print('Status of packages matching \"'+str(search_term)+'\" at '+status_time.strftime('%I:%M %p')+':')
-        print('Package ID:   Weight:     Destination:                                                 Deadline:     Status:')
-        matches=self.packages.lookup(self.locations, self.loads, search_term, status_time)
-        if matches==[]:
-            print('No matching packages found')
-        for p in matches:
-              p.print_package_status(self.packages, self.locations, self.loads, status_time)
-        print()
+        self.write_status(sys.stdout, status_time, search_term)
+
+    def write_schedule(self, sink, report_format='text'):
+        """This method writes the entire schedule to a file-like sink, in the specified format ('text', 'csv', or 'jsonl'; see Report.py)."""
+        #Space complexity: O(1)
+        #Output is written in buffered chunks rather than built as one string.
+        #Time complexity: O(N)
+
+        writer=REPORT_WRITERS[report_format](sink)
+        writer.write_schedule(self.locations, self.packages, self.loads)
+
+    def write_status(self, sink, status_time, search_term=None, report_format='text'):
+        """This method writes the status at a specified time of all packages, or of those matching a search term if one is provided,
+        to a file-like sink in the specified format ('text', 'csv', or 'jsonl'; see Report.py)."""
+        #Space complexity: O(N)
+        #A snapshot of the packages' statuses is taken, and output is written in buffered chunks rather than built as one string.
+        #Time complexity: O(N)
+
+        writer=REPORT_WRITERS[report_format](sink)
+        snapshot=self.timeline.snapshot(status_time)
+        if search_term is None:
+            title='Status of all packages at '+format_time(status_time, '%I:%M %p')+':'
+            matches=(self.packages.table[id] for id in range(1, len(self.packages.table)))
+        else:
+            title='Status of packages matching \"'+str(search_term)+'\" at '+format_time(status_time, '%I:%M %p')+':'
+            matches=self.packages.lookup(self.locations, self.loads, search_term, status_time, self.timeline)
+        writer.write_statuses(title, matches, self.locations, self.loads, snapshot)
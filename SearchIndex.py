@@ -0,0 +1,116 @@
+#Benjamin Gamman, 001439763
+"""SearchIndex.py defines the SearchIndex class, a set of inverted indexes over packages' fields used to answer searches without checking every package."""
+
+from timemath import parse_time
+
+#Substrings up to this length are indexed directly; longer search terms are matched through the intersection of their substrings of this length.
+NGRAM_LENGTH=3
+
+def ngrams(text, n=NGRAM_LENGTH):
+    """This function returns the set of all substrings of the provided text with length from 1 up to n."""
+    #Time complexity: O(L)
+    #There are at most n substrings starting at each of the L characters of the text.
+    #Space complexity: O(L)
+
+    found=set()
+    for i in range(len(text)):
+        for j in range(i+1, min(i+n, len(text))+1):
+            found.add(text[i:j])
+    return found
+
+class SearchIndex:
+    """The SearchIndex class holds hash maps from exact field values (zip code, state, weight, and deadline) to package IDs,
+    an n-gram index of location addresses and cities for substring searches, and the IDs of the packages going to each location."""
+    #Space complexity: O(N)
+    #Each package appears once in each of the exact-match maps and once in the list of its destination's packages.
+    #The n-gram index holds O(L) entries for each location's address and city, L being their (limited) length.
+
+    def __init__(self, packages, locations):
+        """Initializes the SearchIndex from the packages in the provided PackageTable and the locations in the provided LocationTable."""
+        #Time complexity: O(N)
+        #Each package and each location is indexed once.
+        #Space complexity: O(N)
+
+        #Substring searches are answered at the level of locations, as each location's address and city are shared by all of its packages.
+        #Each n-gram of an address or city maps to the keys of the locations containing it; the locations' zip codes and states are mapped the same way.
+        self.locations=locations
+        self.text_ngrams={}
+        self.zips={}
+        self.states={}
+        for l in locations.table:
+            for gram in ngrams(l.address)|ngrams(l.city):
+                self.text_ngrams.setdefault(gram, set()).add(l.key)
+            self.zips.setdefault(l.zip, set()).add(l.key)
+            self.states.setdefault(l.state, set()).add(l.key)
+
+        #Packages are listed by destination (a negative destination refers to a location from the end of the table, as when indexing the table with it),
+        #and mapped by their weight as searched for ("X kg") and by deadline.
+        self.by_destination={}
+        self.weights={}
+        self.deadlines={}
+        for p in packages.table[1:]:
+            self.by_destination.setdefault(self.location_key(p.destination), set()).add(p.id)
+            self.weights.setdefault(str(p.weight)+' kg', set()).add(p.id)
+            self.deadlines.setdefault(p.deadline, set()).add(p.id)
+
+    def location_key(self, destination):
+        """This method returns the key of the location referred to by a package's destination."""
+        #Time complexity: O(1)
+        if destination<0:
+            destination+=len(self.locations.table)
+        return destination
+
+    def add(self, package):
+        """This method adds a package to the index, such as one added to the PackageTable after import."""
+        #Time complexity: O(1)
+        self.by_destination.setdefault(self.location_key(package.destination), set()).add(package.id)
+        self.weights.setdefault(str(package.weight)+' kg', set()).add(package.id)
+        self.deadlines.setdefault(package.deadline, set()).add(package.id)
+
+    def move(self, id, old_destination, new_destination):
+        """This method updates the index when the destination of the package with the provided ID is changed."""
+        #Time complexity: O(1)
+        self.by_destination.get(self.location_key(old_destination), set()).discard(id)
+        self.by_destination.setdefault(self.location_key(new_destination), set()).add(id)
+
+    def find_text(self, term):
+        """This method returns the set of keys of the locations whose address or city contains the provided term."""
+        #Time complexity: O(L+K)
+        #A term up to the n-gram length is looked up directly. A longer term's L n-grams are looked up and their sets of locations intersected,
+        #starting from the smallest, and each of the K remaining candidates is checked to contain the whole term.
+        #Space complexity: O(K)
+
+        if term=='':
+            return set([l.key for l in self.locations.table])
+        if len(term)<=NGRAM_LENGTH:
+            return set(self.text_ngrams.get(term, set()))
+        postings=[]
+        for i in range(len(term)-NGRAM_LENGTH+1):
+            postings.append(self.text_ngrams.get(term[i:i+NGRAM_LENGTH], set()))
+        postings.sort(key=len)
+        candidates=set(postings[0])
+        for posting in postings[1:]:
+            candidates&=posting
+            if candidates==set():
+                break
+        found=set()
+        for key in candidates:
+            l=self.locations.table[key]
+            if term in l.address or term in l.city:
+                found.add(key)
+        return found
+
+    def find(self, term):
+        """This method returns the set of IDs of packages whose weight, destination address, city, state, zip code, or deadline matches the provided term,
+        in the same way as PackageTable.lookup(). The term is parsed as a deadline once, if it contains ':'."""
+        #Time complexity: O(L+M)
+        #Each field is matched with O(1) hash lookups (plus the n-gram lookup in find_text()), and the M matching packages are collected.
+        #Space complexity: O(M)
+
+        keys=self.find_text(term)|self.zips.get(term, set())|self.states.get(term, set())
+        matches=set(self.weights.get(term, set()))
+        for key in keys:
+            matches|=self.by_destination.get(key, set())
+        if ':' in term:
+            matches|=self.deadlines.get(parse_time(term, '%I:%M %p'), set())
+        return matches
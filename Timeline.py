@@ -0,0 +1,144 @@
+#Benjamin Gamman, 001439763
+"""Timeline.py defines the Timeline class, a precomputed index of every package's status changes over the day, used to answer status queries without re-deriving each package's status."""
+
+from array import array
+from bisect import bisect_right
+
+#Status codes, in the order a package can pass through them; STATUS_NAMES gives the name of each as used in searches.
+DELAYED=0
+AT_HUB=1
+EN_ROUTE=2
+DELIVERED=3
+STATUS_NAMES=['delayed', 'at hub', 'en route', 'delivered']
+
+def package_status(delivery_time, departure_time, delay_time, status_time):
+    """This function returns the status code of a package at a specified time, from its delivery time, its load's departure time, and its delay time."""
+    #Time complexity: O(1)
+    #Space complexity: O(1)
+
+    if delivery_time<=status_time:
+        return DELIVERED
+    elif departure_time<=status_time:
+        return EN_ROUTE
+    elif delay_time>status_time:
+        return DELAYED
+    else:
+        return AT_HUB
+
+class Timeline:
+    """The Timeline class holds a sorted list of status-change events for all packages, built once after delivery times have been determined.
+    Each package's own events are also kept in order, so its status at any time is found with a binary search,
+    and the packages whose status changed between two times are found by scanning only the events between them."""
+    #Space complexity: O(N)
+    #Each package has at most three status changes (arriving at the hub, departing, and being delivered), so there are at most 3N events.
+
+    def __init__(self, packages, loads):
+        """Initializes the Timeline from the delivery times, load departure times, and delay times of the packages in the provided PackageTable and LoadList."""
+        #Time complexity: O(N log(N))
+        #Each package's events are found in O(1) time, then all events are sorted by time.
+        #Space complexity: O(N)
+
+        #For each package, its status is evaluated at the earliest possible time and at each time one of its three times is reached, as its status can only change at those times.
+        #Each change is recorded as an event with the time, package ID, and the statuses before and after.
+        #A package's events are stored consecutively, from package_start[id-1] to package_start[id], with its status before any event in initial_status.
+        size=len(packages.table)
+        self.initial_status=bytearray(size)
+        self.package_start=array('l', [0])
+        self.package_times=array('l')
+        self.package_status=bytearray()
+        events=[]
+        for id in range(1, size):
+            p=packages.table[id]
+            if p.load_ind>=0:
+                departure_time=loads.list[p.load_ind].departure_time
+            else:
+                departure_time=p.delivery_time
+            times=sorted(set([p.delay_time, departure_time, p.delivery_time]))
+            status=package_status(p.delivery_time, departure_time, p.delay_time, times[0]-1)
+            self.initial_status[id]=status
+            for t in times:
+                new_status=package_status(p.delivery_time, departure_time, p.delay_time, t)
+                if new_status!=status:
+                    self.package_times.append(t)
+                    self.package_status.append(new_status)
+                    events.append((t, id, status, new_status))
+                    status=new_status
+            self.package_start.append(len(self.package_times))
+
+        #All events are sorted by time (then by package ID) and stored in parallel arrays.
+        events.sort()
+        self.event_times=array('l', [e[0] for e in events])
+        self.event_ids=array('l', [e[1] for e in events])
+        self.event_old=bytearray([e[2] for e in events])
+        self.event_new=bytearray([e[3] for e in events])
+
+        #The most recent snapshot is kept, so that a following snapshot only applies the events between the two times.
+        self.snapshot_time=None
+        self.snapshot_status=None
+
+    def status(self, id, status_time):
+        """This method returns the status code of the package with the provided ID at a specified time."""
+        #Time complexity: O(1)
+        #A package has at most three events, so the binary search over them takes constant time.
+        #Space complexity: O(1)
+
+        start=self.package_start[id-1]
+        end=self.package_start[id]
+        i=bisect_right(self.package_times, status_time, start, end)
+        if i==start:
+            return self.initial_status[id]
+        return self.package_status[i-1]
+
+    def snapshot(self, status_time):
+        """This method returns a bytes object holding the status code of every package at a specified time, indexed by package ID.
+        The previous snapshot is updated by applying only the events between its time and the specified time (forward or backward),
+        so repeated queries at nearby times (such as a dashboard polling for the current status) take time proportional to the number of changes."""
+        #Time complexity: O(N) for the first snapshot, O(log(E)+C) after that
+        #The first snapshot is built from the status at the start of the day. Later ones find the events between the two times with a binary search and apply the C events found.
+        #(Copying the result is a single block copy of N bytes.)
+        #Space complexity: O(N)
+
+        if self.snapshot_time is None:
+            self.snapshot_status=bytearray(self.initial_status)
+            end=bisect_right(self.event_times, status_time)
+            for i in range(end):
+                self.snapshot_status[self.event_ids[i]]=self.event_new[i]
+        elif status_time>self.snapshot_time:
+            start=bisect_right(self.event_times, self.snapshot_time)
+            end=bisect_right(self.event_times, status_time)
+            for i in range(start, end):
+                self.snapshot_status[self.event_ids[i]]=self.event_new[i]
+        elif status_time<self.snapshot_time:
+            start=bisect_right(self.event_times, status_time)
+            end=bisect_right(self.event_times, self.snapshot_time)
+            for i in range(end-1, start-1, -1):
+                self.snapshot_status[self.event_ids[i]]=self.event_old[i]
+        self.snapshot_time=status_time
+        return bytes(self.snapshot_status)
+
+    def with_status(self, status, status_time):
+        """This method returns a list of the IDs of all packages with the provided status (a status code or name) at a specified time, in order of ID."""
+        #Time complexity: O(N)
+        #See snapshot(); the snapshot is then scanned once for the status code.
+        #Space complexity: O(N)
+
+        if isinstance(status, str):
+            status=STATUS_NAMES.index(status)
+        snapshot=self.snapshot(status_time)
+        matches=[]
+        i=snapshot.find(status, 1)
+        while i!=-1:
+            matches.append(i)
+            i=snapshot.find(status, i+1)
+        return matches
+
+    def changed(self, start_time, end_time):
+        """This method returns a list of the status changes made after start_time and up to end_time, in order of time,
+        as tuples of the time, package ID, and the package's new status code."""
+        #Time complexity: O(log(N)+C)
+        #Two binary searches find the range of C events between the two times, which are then copied.
+        #Space complexity: O(C)
+
+        start=bisect_right(self.event_times, start_time)
+        end=bisect_right(self.event_times, end_time)
+        return [(self.event_times[i], self.event_ids[i], self.event_new[i]) for i in range(start, end)]
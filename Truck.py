@@ -7,12 +7,42 @@ from Location import Location
 from Location import LocationTable
 from Load import Load
 from Load import LoadList
+from Route import Route
 from timemath import add_times
 from timemath import subtract_times
 from timemath import calc_time
-from datetime import datetime
-from datetime import time
-from math import fabs
+from timemath import make_time
+from localsearch import improve_route
+from Routing import next_stop_greedy
+from Routing import GreedyRouting
+from concurrent.futures import ProcessPoolExecutor
+from heapq import heapify
+from heapq import heappop
+
+#The LocationTable used by a worker process when routes are planned in parallel, set once when the worker starts.
+_worker_locations=None
+
+def _init_worker(locations):
+    """This function stores the LocationTable in a worker process when the process pool starts, so that it is shared read-only by every route that worker plans
+    (where processes are forked, the distance matrix's memory is shared with the parent process rather than copied)."""
+    #Space complexity: O(1)
+    #Time complexity: O(1)
+
+    global _worker_locations
+    _worker_locations=locations
+
+def _plan_worker(strategy, load, packages, speed_mph, improve, improve_budget):
+    """This function runs in a worker process to plan one load's route: it computes the strategy's candidate stop orders and, if enabled, improves each of them."""
+    #Space complexity: O(N)
+    #Time complexity: O(N^2)
+    #The same as ordering the load's stops sequentially.
+
+    plan=strategy.plan(load, packages, _worker_locations, speed_mph)
+    if improve==True:
+        for key in plan:
+            stop_keys, fixed_stops=plan[key]
+            plan[key]=(improve_route(stop_keys, _worker_locations, fixed_stops, load.departure_time, speed_mph, improve_budget), fixed_stops)
+    return plan
 
 class Truck:
     """The Truck class defines a set of values relevant to the actual delivery of the packages (speed, truck number, and the time that truck will be available to pick up its next load)."""
@@ -27,6 +57,7 @@ class Truck:
         
         self.number=num
         self.speed_mph=speed
+        self.start_time=start_time
         self.time_available=start_time
 
 class TruckList:
@@ -34,8 +65,11 @@ class TruckList:
     #Space complexity: O(N)
     #The TruckList contains a variable number of Truck objects which are each O(1).
     
-    def __init__(self, num_trucks, start_time, speed):
-        """Initializes TruckList by generating the specified number of Truck objects."""
+    def __init__(self, num_trucks, start_time, speed, improve=False, improve_budget=0.05, strategy=None, workers=1):
+        """Initializes TruckList by generating the specified number of Truck objects.
+        The strategy is the RoutingStrategy used to order each load's stops; the original GreedyRouting strategy is used if none is provided.
+        If workers is greater than 1, the stop orders for all loads are planned in parallel in that many worker processes before trucks and departure times are assigned.
+        If improve is True, each route is improved with 2-opt and Or-opt moves after it is constructed, spending at most improve_budget seconds per route."""
         #Space complexity: O(N)
         #Time complexity: O(N)
         #O(1) operations for each Truck initialized in the process are performed N times (for the number of trucks, which cannot exceed the number of packages to be delivered).
@@ -45,48 +79,122 @@ class TruckList:
         for n in range(num_trucks):
             new_truck=Truck(n+1, start_time, speed)
             self.list.append(new_truck)
+        self.improve=improve
+        self.improve_budget=improve_budget
+        if strategy is None:
+            strategy=GreedyRouting()
+        self.strategy=strategy
+        self.workers=workers
+
+        #The time each truck broke down, by truck number, as recorded by the Replanner; it is kept with the plan so that later events still see the breakdown.
+        self.broken={}
+
+    def plan_parallel(self, loads, packages, locations):
+        """This method plans the stop orders of all loads in parallel worker processes and returns a dictionary of each load's plan (see RoutingStrategy.plan()), keyed by load index.
+        Since the truck and actual departure time of each load are not yet known, each load is planned with an estimated departure time:
+        the earliest time any truck is available, or the latest delay time of its packages if later."""
+        #Space Complexity: O(N)
+        #Only the data each load's route depends on (its stops, packages, and estimated departure time) is sent to the workers; the LocationTable is sent once per worker.
+        #Time complexity: O(N^2/W)
+        #Ordering each load is O(N^2) in the worst case, and the loads are divided between W worker processes.
+
+        earliest=self.list[1].time_available
+        for t in self.list[1:]:
+            if t.time_available<earliest:
+                earliest=t.time_available
+        futures={}
+        with ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker, initargs=(locations,)) as pool:
+            for load in loads.list:
+                estimate=Load(load.capacity, load.label)
+                estimate.index=load.index
+                estimate.stops=set(load.stops)
+                estimate.package_list=list(load.package_list)
+                estimate.truck_requirement=load.truck_requirement
+                estimate.departure_time=earliest
+                load_packages=PackageTable()
+                load_packages.table={}
+                for id in load.package_list:
+                    p=packages.table[id]
+                    copy=Package(id)
+                    copy.destination=p.destination
+                    copy.deadline=p.deadline
+                    copy.delay_time=p.delay_time
+                    copy.truck_requirement=p.truck_requirement
+                    load_packages.table[id]=copy
+                    if p.delay_time>estimate.departure_time:
+                        estimate.departure_time=p.delay_time
+                truck=self.list[load.truck_requirement] if load.truck_requirement!=0 else self.list[1]
+                futures[load.index]=pool.submit(_plan_worker, self.strategy, estimate, load_packages,
+                                                truck.speed_mph, self.improve, self.improve_budget)
+            plans={}
+            for index in futures:
+                plans[index]=futures[index].result()
+        return plans
 
     def next_stop_greedy(self, prev_stop, stops_set, locations):
-        """This method employs a greedy algorithm with some built-in correction to select and return the next stop from a list of options given the previous stop."""
-        #This is defined as a separate method from the rest of the routing algorithm because it is used repeatedly (in TruckList.deliver()), so is more efficiently defined once here.
+        """This method employs a greedy algorithm with some built-in correction to select and return the next stop from a list of options given the previous stop.
+        The algorithm itself is defined by the next_stop_greedy() function in Routing.py, where it is shared with the GreedyRouting strategy."""
         #Space Complexity: O(N^2)
-        #The method accesses the LocationTable object, which is O(N^2).
         #Time complexity: O(N)
-        #Each use of this greedy selection performs two (non-nested) loops through the provided set of stops (which cannot exceed the total number of packages in length).
-        #Each loop is therefore O(N), and O(N)+O(N)=O(2N)=O(N).
-        
-        #First, applies a simple greedy algorithm to select the location within the provided set that is closest to the previous stop.
-        #"Ties" in which two options are the same distance away are not addressed yet, as they will be in the second loop for corrections.
-        dist=100
-        next_stop=0
-        for stop in stops_set:
-            dist_diff=dist-locations.distances[stop][prev_stop]
-            if dist_diff>0.001:
-                next_stop=stop
-                dist=locations.distances[stop][prev_stop]
-
-        #Then, each option is checked against the "greedy" winner. If their distances differ by less than 0.5 miles and the further option is closer to the hub, it is selected instead.
-        #The distance that is checked against remains unchanged though, to avoid a chain of switches in which each is within 0.5 miles of the last but may be much further from the original "greedy" choice.
-        #Choosing the point further from the hub here decreases the likelihood of leaving it for last, resulting in a long return distance to the hub at the end of the route.
-        #This must be done in a second separate loop to ensure that only the best "greedy" choice is compared to other options on this basis, not any intermediate options.        
-        for stop in stops_set:
-            if (fabs(locations.distances[stop][prev_stop]-locations.distances[next_stop][prev_stop])<0.5
-            and locations.distances[stop][0]-locations.distances[next_stop][0]>1.0):
-                next_stop=stop
-        return next_stop
+
+        return next_stop_greedy(prev_stop, stops_set, locations)
+
+    def apply_updates(self, pending, time, by_destination, undelivered, packages, locations):
+        """This method applies the destination updates due by the provided time, taking them from pending (a heap of update times and package IDs),
+        and moves each updated package to its new destination's group in by_destination (a dictionary of sets of package IDs, keyed by destination).
+        The correct location is found with the LocationTable's address index. Updates for packages no longer undelivered, or whose corrected address is not in the LocationTable, are dropped.
+        Returns True if any package was updated."""
+        #Space Complexity: O(1)
+        #Time complexity: O(U log(U))
+        #Each of U updates is taken from the heap once over the whole route, so stops with no updates due cost O(1).
+
+        updated=False
+        while pending!=[] and pending[0][0]<=time:
+            update_time, id=heappop(pending)
+            if id not in undelivered:
+                continue
+            key=locations.find(packages.table[id].corrected_address)
+            if key>=0:
+                group=by_destination[packages.table[id].destination]
+                group.discard(id)
+                if group==set():
+                    del by_destination[packages.table[id].destination]
+                packages.update_destination(id, key, locations)
+                by_destination.setdefault(key, set()).add(id)
+                updated=True
+        return updated
+
+    def deliver_stop(self, key, time, by_destination, undelivered, packages):
+        """This method delivers the undelivered packages going to the location with the provided key at the provided time,
+        removing their group from by_destination (see apply_updates()) and them from the undelivered set."""
+        #Space Complexity: O(1)
+        #Time complexity: O(P)
+        #Only the P packages going to the stop are checked.
+
+        for id in by_destination.pop(key, set()):
+            packages.table[id].delivery_time=time
+            undelivered.discard(id)
 
     def deliver(self, loads, packages, locations):
         """This method determines routes for all loads of packages and "delivers" the using the trucks in TruckList."""
         #Space Complexity: O(N^2)
         #The method accesses the PackageTable and LocationTable objects, each of which is O(N^2) space complexity.
         #Time complexity: O(N^3)
-        #Choosing stops by calling the core greedy selection method gives O(N^2) time complexity:
-        #At most one call for each stop, each of which loops through a list of possible stops no greater than N, and performing an O(N) task O(N) times gives O(N)*O(N)=O(N^2) complexity.
-        #Other portions of the algorithm use nested loops to dynamically check for and apply available updates to packages destinations while they have been loaded and are en route.
-        #It can logically be abstracted that the location check loop will execute only once for each package that needs to be updated (it is then marked as not needing update), 
-        #so even though this task is nested within other loops handling other functions, it will still only add
-        #(number of updates*number of locations)=O(N)*O(N)=O(N2) operations to the program, not multiply that number by the number of loops those operations are split between,
-        #and then the overall time complexity of the section it is contained within is O(N2) + O(N2) = O(N2).
+        #Choosing stops with the routing strategy gives O(N^2) time complexity for either GreedyRouting or InsertionRouting (see Routing.py).
+        #Delivering a load's packages along its route checks only the packages going to each stop, and each update to a package's destination is taken from a heap once,
+        #so the delivery of a load with P packages and S stops is O(S+P log(P)) rather than checking every undelivered package at every stop.
+        #The location lookup executes only once for each package that needs to be updated, and each lookup in the LocationTable's address index is O(1).
+
+        #If enabled, the stop orders of all loads are first planned in parallel, as they depend on each other only through the time each load departs.
+        #Each load's truck and departure time are then assigned in the sequential pass below, which chooses the planned order that applies at that departure time.
+        #A load required to be on a truck that is not in the TruckList cannot be delivered.
+        for load in loads.list:
+            if load.truck_requirement>=len(self.list):
+                raise ValueError('Load '+load.label+' must be delivered by truck '+str(load.truck_requirement)+', but there are only '+str(len(self.list)-1)+' trucks.')
+
+        plans={}
+        if self.workers>1 and len(loads.list)>1:
+            plans=self.plan_parallel(loads, packages, locations)
 
         #The routing process iterates through each load in LoadList, determining their routes sequentially as later loads' delivery times may be affected by earlier loads' times.
         for load in loads.list:
@@ -109,249 +217,114 @@ class TruckList:
                 if packages.table[id].delay_time>load.departure_time:
                     load.departure_time=packages.table[id].delay_time
 
-            #The route must start at the hub, so the initial stop (stop "0") added to the load's route data member is there (location 0).
-            #The stop's location key is added as a list because the route data will later become a matrix of information, so this will allow other "columns" to be appended later.
-            #A new set is created of remaining stops that can be modified, leaving the load's original set of stops intact.
-            load.route.append([locations.table[0].key])
-            remaining_stops=set()
-            for stop in load.stops:
-                remaining_stops.add(stop)
-
-            #The earliest deadline on the route and the location of the package with that deadline are determined.
-            #If packages are tied with the same earliest deadline, the location closest to the hub is chosen.
-            first_deadline_stop=0
-            first_deadline=time(23,59)
-            for id in load.package_list:
-                if (packages.table[id].deadline!=time(0,0) and packages.table[id].deadline<first_deadline):
-                    first_deadline=packages.table[id].deadline
-                    first_deadline_stop=packages.table[id].destination
-                elif (packages.table[id].deadline==first_deadline
-                and locations.distances[packages.table[id].destination][0]<locations.distances[first_deadline_stop][0]):
-                    first_deadline=packages.table[id].deadline
-                    first_deadline_stop=packages.table[id].destination
-                    
-            #If that deadline is within an hour of the load's departure time, the following steps are used to determine a route.
-            #The first stop added to the route is the first deadline location determined previously.
-            if add_times(load.departure_time, time(1,0))>=first_deadline:
-                deadline=True
-                next_stop=first_deadline_stop
-                
-                #While any remaining stops have that same deadline, the nearest of those locations from the preceding location is added to the route next.
-                #This is a greedy selection, but not using the method above because it must consider only locations with the same deadline,
-                #and this variation of the greedy selection is employed only here.
-                #It breaks ties based on average distances, choosing the location with greater average distance first,
-                #on the basis that it will be more advantageous to leave shorter distances available for later at no cost to distance here.
-                while deadline==True:
-                    load.route.append([next_stop])
-                    remaining_stops.remove(next_stop)
-                    deadline=False
-                    next_stop_dist=100
-                    next_stop=0
-                    for stop in remaining_stops:
-                        if locations.table[stop].deadline==first_deadline:
-                            deadline=True
-                            stop_dist=locations.distances[stop][load.route[len(load.route)-1][0]]
-                            if (next_stop_dist-stop_dist>0.001
-                            or (fabs(next_stop_dist-stop_dist)<=0.001
-                            and locations.table[stop].avg_dist>locations.table[next_stop].avg_dist)):
-                                next_stop=stop
-                                next_stop_dist=stop_dist
-                                
-                #After those stops have been added to the route, the greedy selection method above selects next stops to add to the route until the remaining stops set is empty.
-                #This means that all known destinations have been visited, but does not necessarily complete the route;
-                #destination keys of packages with unknown/incorrect addresses were not added to the load's set of stops, so they may not have been visited yet.
-                #This will be accounted for later in the portion of the algorithm determining times.
-                while remaining_stops!=set():
-                    next_stop=self.next_stop_greedy(load.route[len(load.route)-1][0], remaining_stops, locations)
-                    load.route.append([next_stop])
-                    remaining_stops.remove(next_stop)
-                    
-            #If the load's first deadline is more than an hour after departure, these steps are taken instead.
+            #The strategy chooses the order of the load's known stops. The route must start at the hub, so the initial stop (stop "0") added to the load's route data member is there (location 0).
+            #Each stop's location key is added as a list because the route data will later become a matrix of information, so this will allow other "columns" to be appended later.
+            #Packages without known destinations are not considered for now; they will be accounted for later in the portion of the algorithm determining times.
+            #If the load's route was planned in parallel, the planned order is used unless the strategy finds that it does not apply at the actual departure time.
+            planned=None
+            if load.index in plans:
+                planned=self.strategy.select(plans[load.index], load, packages, locations, self.list[load.truck_assigned].speed_mph)
+            if planned is not None:
+                stop_keys, fixed_stops=planned
             else:
+                stop_keys, fixed_stops=self.strategy.order(load, packages, locations, self.list[load.truck_assigned].speed_mph)
 
-                #The route's first stop is determined based on two poles within the load's required stops that are far from each other and on average from other locations.
-                #This is similar to the process used to assign locations to regions during import,
-                #but restricted to stops in the load being considered and without the ring-based constraints (as a load may be heavily skewed toward one ring or another).
-                #Pole 1 of the route is set as the stop with the highest average distance.
-                #Pole 2 is set as the stop furthest from Pole 1.
-                #The "tie-breaking" calculations used in determining the overall regional poles earlier are not employed here.
-                #Given the smaller number of locations in a load vs. the entire set of destinations, ties are less likely,
-                #and breaking them in a precise way is less likely to be worth the calculations as it will affect only one load rather than the overall distribution of the packages.
-                route_pole1=0
-                high_dist=0
-                for l in load.stops:
-                    if locations.table[l].avg_dist>high_dist:
-                        route_pole1=l
-                        high_dist=locations.table[l].avg_dist
-                route_pole2=route_pole1
-                high_dist=0
-                for l in load.stops:
-                    if locations.distances[l][route_pole1]>high_dist:
-                        route_pole2=l
-                        high_dist=locations.distances[l][route_pole1]
-
-                #The first stop is selected as the location in the load's set of stops that has the highest sum of distances to the two route poles, minus its distance from the hub.
-                #(The route poles themselves are excluded from consideration as a start point.)
-                #Considering the sum of pole distances results in a start point that is more or less midway between the poles, and somewhat out from a direct line between them
-                #(based on the idea of the Pythagorean theorem, it will be further from the poles than a point along that direct line).
-                #This helps make the route more of a circuit in shape, while also factoring in the distance to the hub helps avoid a long initial distance to get to the start point.
-                first_stop=0
-                high_dist=0
-                for l in load.stops:
-                    composite_dist=(locations.distances[l][route_pole1]
-                                    +locations.distances[l][route_pole2]
-                                    -locations.distances[l][0])
-                    if composite_dist>high_dist and l!=route_pole1 and l!=route_pole2:
-                        first_stop=l
-                        high_dist=composite_dist
-                load.route.append([first_stop])
-                remaining_stops.remove(first_stop)
-
-                #After that first stop is selected, the above greedy selection method is used to choose the order of the known remaining stops.
-                #As with the previous case, packages without known destinations are not considered for now.
-                while remaining_stops!=set():
-                    next_stop=self.next_stop_greedy(load.route[len(load.route)-1][0], remaining_stops, locations)
-                    load.route.append([next_stop])
-                    remaining_stops.remove(next_stop)                            
-
-            #Next, the route data member is expanded into a matrix including the location key, distance from previous stop,
-            #total distance of the route so far, and elapsed time from the start of the route for each stop.
-            #Actual delivery times are still excluded for now, as these pieces of information will be used to adjust the route's start time.
-            #The initial information for starting at the hub is added first (0 miles from itself, 0 miles travelled so far, and 0:00 elapsed on the route).
-            #Then a loop calculates those values based on each other sequentially combined with the previous stop's values, for each stop currently on the route.
-            load.route[0].append(0.0)
-            load.route[0].append(0.0)
-            load.route[0].append(time(0,0))
-            for i in range(1, len(load.route)):
-                load.route[i].append(locations.distances[load.route[i][0]][load.route[i-1][0]])
-                load.route[i].append(load.route[i][1]+load.route[i-1][2])
-                route_time=calc_time(load.route[i][2], self.list[load.truck_assigned].speed_mph)
-                load.route[i].append(route_time)
+            #If enabled, the order of the stops is then improved with 2-opt and Or-opt moves, within the time budget.
+            #Stops visited first for an early deadline are kept in place, and no move may cause another stop to miss its deadline.
+            #A planned order was already improved by its worker, so this rechecks it at the actual departure time, which is quick as few moves remain.
+            speed=self.list[load.truck_assigned].speed_mph
+            if self.improve==True:
+                stop_keys=improve_route(stop_keys, locations, fixed_stops, load.departure_time, speed, self.improve_budget)
+
+            #Next, the route is built as a Route (see Route.py), holding the location key, distance from previous stop, total distance of the route so far,
+            #elapsed time from the start of the route, and time reached for each stop. The route must start at the hub, so the first stop is there (location 0),
+            #0 miles from itself with 0 miles travelled so far and 0:00 elapsed. The distances so far are found with a cumulative sum of the legs,
+            #and the elapsed time at each stop is calculated once from the distance so far.
+            #Packages without known destinations are not considered for now; they will be accounted for later in the portion of the algorithm determining times.
+            load.route=Route(load.departure_time)
+            load.route.extend(stop_keys, locations, speed)
 
             #This section of the algorithm begins to consider packages with unknown/incorrect addresses.
             #If such a package is included in the load, a marker variable is set reflecting that an update is expected.
             #In that case, the load's departure time is updated to be as late as possible while still meeting the last deadline along the route.
             #This maximizes the chance that any package loaded onto a truck without a known destination at that time will be updated with the correct destination before reaching that stop,
             #so that it can be delivered with any others that may be at the same location and avoid returning and making redundant stops later.
+            #Elapsed times do not depend on the departure time, so moving the departure only updates each stop's time.
             update_expected=False
             for id in load.package_list:
-                if packages.table[id].update_time!=time(0,0):
+                if packages.table[id].update_time!=0:
                     update_expected=True
             if update_expected==True:
-                last_deadline=time(0,0)
+                last_deadline=0
                 last_deadline_route_index=0
-                for stop in load.route:
-                    if locations.table[stop[0]].deadline!=time(0,0):
-                        last_deadline=locations.table[stop[0]].deadline
-                        last_deadline_route_index=load.route.index(stop)          
-                delayed_time=subtract_times(last_deadline, add_times(load.route[last_deadline_route_index][3], time(0,1)))
+                for i in range(len(load.route)):
+                    if locations.table[load.route.keys[i]].deadline!=0:
+                        last_deadline=locations.table[load.route.keys[i]].deadline
+                        last_deadline_route_index=i
+                delayed_time=subtract_times(last_deadline, add_times(load.route.elapsed[last_deadline_route_index], make_time(0,1)))
                 if delayed_time>load.departure_time:
                     load.departure_time=delayed_time
+                    load.route.set_departure(delayed_time)
 
             #This section handles the actual "delivery" of packages to the stops on the load's route.
-            #All of the load's packages are initially added to the undelivered set, while the delivered set is initially empty.
-            #For each stop along the route, the time of the stop (departure time plus time on the route so far) is added to the next column of the route matrix.
-            #Then, each of the packages in the undelivered set are checked.
+            #The load's packages are first grouped by destination, so that only the packages going to a stop are checked there (see deliver_stop()),
+            #and the packages expecting an update to their destination are kept in a heap ordered by update time, so that only the updates due by a stop's time are applied there (see apply_updates()).
+            #Packages without known destinations are grouped under location key -1 until they are updated.
             undelivered=set(load.package_list)
-            delivered=set()
-            load.route[0].append(load.departure_time)
+            by_destination={}
+            pending=[]
+            for id in load.package_list:
+                by_destination.setdefault(packages.table[id].destination, set()).add(id)
+                if packages.table[id].update_time!=0:
+                    pending.append((packages.table[id].update_time, id))
+            heapify(pending)
+
+            #At each stop, any updates received by then are applied first, reflecting the system relaying updated information to the truck/driver as it comes in,
+            #so that even though a package might have been loaded without knowing its destination, and the route was determined without that knowledge but included the same destination for other packages,
+            #if the truck goes to that stop after the package's information is updated, it can be delivered along with the others.
+            #Then the packages going to the stop are delivered (removed from the undelivered set and marked with the stop's time).
             for i in range(1, len(load.route)):
-                route_time=calc_time(load.route[i][2], self.list[load.truck_assigned].speed_mph)
-                load.route[i].append(add_times(load.departure_time, route_time))
-                for id in undelivered:
-
-                    #If an update is expected (meaning to a package's destination) and the update time is at or before the current stop's time,
-                    #the package's destination data is changed to the location key matching the correct address.
-                    #This reflects the system relaying updated information to the truck/driver as it comes in, so that even though a package might have been loaded without knowing its destination,
-                    #and the route was determined without that knowledge but included the same destination for other packages,
-                    #if the truck goes to that stop after the package's information is updated, it can be delivered along with the others.
-                    #Its expected update time is then reset so that it isn't re-updated at each stop, and it is added to the correct location's package list as well.
-                    if (update_expected==True
-                    and packages.table[id].update_time!=time(0,0)
-                    and packages.table[id].update_time<=load.route[i][4]):
-                        for l in locations.table:
-                            if l.address==packages.table[id].corrected_address:
-                                packages.table[id].destination=l.key
-                                packages.table[id].update_time=time(0,0)
-                                l.package_list.append(id)
-
-                    #Then, if a package's destination matches the current stop, it is delivered (added to the delivered set and marked with the stop's time).
-                    if packages.table[id].destination==load.route[i][0]:
-                        packages.table[id].delivery_time=load.route[i][4]
-                        delivered.add(id)
-                        
-            #After delivering packages to a stop, the set of undelivered is updated to remove any that are now in the delivered set.
-            #This improves efficiency by reducing the number of packages that must be checked at each subsequent stop,
-            #and keeps track of any leftover packages after the route’s initially known locations have all been visited.
-            undelivered=undelivered.difference(delivered)
+                self.apply_updates(pending, load.route.times[i], by_destination, undelivered, packages, locations)
+                self.deliver_stop(load.route.keys[i], load.route.times[i], by_destination, undelivered, packages)
 
             #This section handles what happens if a package is left undelivered after the previously calculated route.
             #(This would occur if an update was expected, and the correct stop either was not already on the route or was reached before the update was made.)
-            #First, a set of known destinations is made (undelivered packages' positive location keys).
+            #The known destinations are those of the undelivered packages' groups with positive location keys.
             #(There would be known destinations at this point if updates had already been made but were not for stops along the portion of the route following the update time.)
             #As long as undelivered packages remain in the load, the truck will continue extending the route to deliver them.
+            #Stops added from here on are timed by adding the time to travel each leg to the elapsed time at the previous stop.
             while undelivered!=set():
-                next_stop=0
                 known_destinations=set()
-                for id in undelivered:
-                    if packages.table[id].destination>0:
-                        known_destinations.add(packages.table[id].destination)
+                for key in by_destination:
+                    if key>0:
+                        known_destinations.add(key)
 
                 #If there are known destinations, the greedy selection method is used to choose the next stop from among them,
-                # which is then added to the route and the package is delivered as above.
+                # which is then added to the route and the packages are delivered as above.
                 if known_destinations!=set():
-                    next_stop=self.next_stop_greedy(load.route[len(load.route)-1][0], known_destinations, locations)
-                    load.route.append([next_stop])
-                    i=len(load.route)-1
-                    load.route[i].append(locations.distances[load.route[i][0]][load.route[i-1][0]])
-                    load.route[i].append(load.route[i][1]+load.route[i-1][2])
-                    leg_time=calc_time(load.route[i][1], self.list[load.truck_assigned].speed_mph)
-                    load.route[i].append(add_times(load.route[i-1][3], leg_time))
-                    load.route[i].append(add_times(load.departure_time, load.route[i][3]))
-                    for id in undelivered:
-                        if (update_expected==True
-                        and packages.table[id].update_time!=time(0,0)
-                        and packages.table[id].update_time<=load.route[i][4]):
-                            for l in locations.table:
-                                if l.address==packages.table[id].corrected_address:
-                                    packages.table[id].destination=l.key
-                                    packages.table[id].update_time=(0,0)
-                                    l.package_list.append(id)
-                        if packages.table[id].destination==load.route[i][0]:
-                            packages.table[id].delivery_time=load.route[i][4]
-                            delivered.add(id)
-                    undelivered=undelivered.difference(delivered)
-                    
+                    next_stop=self.next_stop_greedy(load.route.keys[len(load.route)-1], known_destinations, locations)
+                    i=load.route.append(next_stop, locations, speed)
+                    self.apply_updates(pending, load.route.times[i], by_destination, undelivered, packages, locations)
+                    self.deliver_stop(load.route.keys[i], load.route.times[i], by_destination, undelivered, packages)
+
                 #If there are no known destinations at this point, meaning that packages are still awaiting updated information, the truck returns to the hub to wait.
-                #The next expected update time is determined, and if it is later than the time the truck returns to the hub, the truck continues to wait until that time.
+                #The next expected update time is at the top of the heap, and if it is later than the time the truck returns to the hub, the truck continues to wait until that time.
                 #This case adds a second consecutive "stop" at the hub to the route if needed, the first showing the truck's arrival time and the second showing its departure.
                 #After that, the loop will repeat, and at least that package's location will be added to known destinations, triggering the previous case.
                 else:
-                    load.route.append([0])
-                    i=len(load.route)-1
-                    load.route[i].append(locations.distances[0][load.route[i-1][0]])
-                    load.route[i].append(load.route[i][1]+load.route[i-1][2])
-                    leg_time=calc_time(load.route[i][1], self.list[load.truck_assigned].speed_mph)
-                    load.route[i].append(add_times(load.route[i-1][3], leg_time))
-                    load.route[i].append(add_times(load.departure_time, load.route[i][3]))
-                    next_update_time=time(23,59)
-                    for id in undelivered:
-                        if packages.table[id].update_time!=time(0,0) and packages.table[id].update_time<next_update_time:
-                            next_update_time=packages.table[id].update_time                    
-                    if next_update_time>load.route[i][4]:
-                        load.route.append([0])
-                        load.route[i+1].append(0.0)
-                        load.route[i+1].append(load.route[i][1])
-                        load.route[i+1].append(subtract_times(next_update_time, load.departure_time))
-                        load.route[i+1].append(next_update_time)
+                    i=load.route.append(0, locations, speed)
+                    while pending!=[] and pending[0][1] not in undelivered:
+                        heappop(pending)
+                    if pending!=[] and pending[0][0]>load.route.times[i]:
+                        load.route.wait(pending[0][0])
+
+                    #Updates due by the time the truck leaves the hub again are applied there, as updates are otherwise only applied at stops with deliveries.
+                    #(A truck that returns after the update time would otherwise never learn the package's destination.)
+                    #If no remaining package can be updated, the packages cannot be delivered.
+                    if self.apply_updates(pending, load.route.times[len(load.route)-1], by_destination, undelivered, packages, locations)==False:
+                        raise ValueError('Packages '+str(sorted(undelivered))+' cannot be delivered: their destinations are unknown and no update is expected.')
 
             #Lastly, a final stop is added to the route to mark the truck's return to the hub and display the route's final length and end time.
             #The assigned truck's availability time is also updated to the route's end time, signifying that it will then be available to deliver another load as this method repeats for any following.
-            load.route.append([0])
-            i=len(load.route)-1
-            load.route[i].append(locations.distances[0][load.route[i-1][0]])
-            load.route[i].append(load.route[i][1]+load.route[i-1][2])
-            leg_time=calc_time(load.route[i][1], self.list[load.truck_assigned].speed_mph)
-            load.route[i].append(add_times(load.route[i-1][3], leg_time))
-            load.route[i].append(add_times(load.departure_time, load.route[i][3]))
-            self.list[load.truck_assigned].time_available=load.route[i][4]
+            i=load.route.append(0, locations, speed)
+            self.list[load.truck_assigned].time_available=load.route.times[i]
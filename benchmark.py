@@ -0,0 +1,205 @@
+#Benjamin Gamman, 001439763
+"""benchmark.py times each stage of planning (importing the network and packages, sorting loads, delivering, building the schedule, searching, and writing reports)
+on synthetic data of increasing size (see generate.py), and writes the results to a JSON file. A previous results file can be provided to report stages that have become slower.
+Run as a script: python benchmark.py [--sizes 40,1000,10000,100000] [--output benchmark.json] [--compare previous.json] [--seed 0]"""
+
+from generate import generate_network
+from generate import generate_manifest
+from generate import location_count
+from generate import load_capacity
+from networkcache import cache_path
+from Location import LocationTable
+from Package import PackageTable
+from Load import LoadList
+from Truck import TruckList
+from Schedule import Schedule
+from timemath import make_time
+from time import perf_counter
+import gc
+import json
+import os
+import platform
+import sys
+import tempfile
+import tracemalloc
+
+#The resource module is only available on Unix; elsewhere the process's peak memory is not reported.
+try:
+    import resource
+except ImportError:
+    resource=None
+
+#The sizes benchmarked by default, in packages.
+SIZES=[40, 1000, 10000, 100000]
+
+#The search terms timed in the lookup stage, each searched at 10:00 AM (see PackageTable.lookup()).
+SEARCH_TERMS=['Main St', '84115', '10:30 am', '5 kg', 'en route', 'Salt Lake City & delivered']
+
+def peak_rss():
+    """This function returns the peak resident memory of the process in kilobytes, or None where it cannot be found."""
+    #Time complexity: O(1)
+    if resource is None:
+        return None
+    peak=resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    #Linux reports kilobytes, but macOS reports bytes.
+    if sys.platform=='darwin':
+        peak//=1024
+    return peak
+
+class StageTimer:
+    """The StageTimer class runs the stages of a benchmark one at a time, recording the time each takes, the memory it allocates, and the process's peak memory after it."""
+    #Space complexity: O(S)
+    #One result is recorded for each of S stages.
+
+    def __init__(self, size, trace_memory=True):
+        """Initializes a StageTimer for a benchmark of the provided size. If trace_memory is True, the peak memory allocated by each stage is traced (see tracemalloc)."""
+        self.size=size
+        self.trace_memory=trace_memory
+        self.results=[]
+
+    def run(self, stage, function, repeatable=False):
+        """This method runs a stage's function, records its results, and returns the function's return value.
+        If memory is traced, a repeatable function is run a second time to trace it, so that tracing does not slow the timed run; otherwise the timed run itself is traced."""
+        #Time complexity: O(F)
+        #The function is run once, or twice if it is repeatable and memory is traced.
+
+        gc.collect()
+        traced=self.trace_memory==True and repeatable==False
+        if traced==True:
+            tracemalloc.start()
+        start=perf_counter()
+        value=function()
+        seconds=perf_counter()-start
+        allocated=None
+        if traced==True:
+            allocated=tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        elif self.trace_memory==True:
+            tracemalloc.start()
+            function()
+            allocated=tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        self.results.append({'size':self.size, 'stage':stage, 'seconds':seconds, 'traced':traced,
+                             'allocated_kb':allocated//1024 if allocated is not None else None, 'peak_rss_kb':peak_rss()})
+        print('{0:>8}  {1:<22}{2:>10.4f} s'.format(self.size, stage, seconds), flush=True)
+        return value
+
+def benchmark_size(size, data_dir, seed=0, trace_memory=True):
+    """This function generates data for the provided number of packages in data_dir, times each stage of planning it, and returns the list of each stage's results.
+    Stages are timed in the order a plan is computed (see Planner.py), each using the results of the last. Sorting and delivery change the plan, so they cannot be repeated
+    and have their memory traced as they are timed, which slows them; their times are only comparable between runs with the same setting."""
+    #Time complexity: O(N^3)
+    #See TruckList.deliver().
+    #Space complexity: O(N^2)
+
+    num_locations=location_count(size)
+    capacity=load_capacity(size, num_locations)
+    locations_file=os.path.join(data_dir, 'locations_'+str(size)+'.csv')
+    packages_file=os.path.join(data_dir, 'packages_'+str(size)+'.csv')
+    addresses=generate_network(locations_file, num_locations, seed)
+    generate_manifest(packages_file, addresses, size, seed)
+
+    timer=StageTimer(size, trace_memory)
+    def import_locations():
+        locations=LocationTable()
+        locations.import_csv(locations_file)
+        return locations
+    network=timer.run('import_locations', import_locations, repeatable=True)
+    def import_cached():
+        locations=LocationTable()
+        locations.import_cached(locations_file)
+        return locations
+    def compile_network():
+        if os.path.exists(cache_path(locations_file)):
+            os.remove(cache_path(locations_file))
+        return import_cached()
+    timer.run('compile_network', compile_network, repeatable=True)
+    network=timer.run('import_cached', import_cached, repeatable=True)
+    def import_packages():
+        locations=network.copy()
+        packages=PackageTable()
+        packages.import_csv(packages_file, locations)
+        return locations, packages
+    locations, packages=timer.run('import_packages', import_packages, repeatable=True)
+    loads=LoadList(len(packages.table)-1, capacity, ['Express', 'Delay', 'Final'])
+    timer.run('sort_loads', lambda: loads.sort(packages, locations))
+    trucks=TruckList(2, make_time(8,0), 18)
+    timer.run('deliver', lambda: trucks.deliver(loads, packages, locations))
+    schedule=timer.run('schedule', lambda: Schedule(locations, packages, loads), repeatable=True)
+    def lookup():
+        count=0
+        for term in SEARCH_TERMS:
+            for p in packages.lookup(locations, loads, term, make_time(10,0), schedule.timeline):
+                count+=1
+        return count
+    timer.run('lookup', lookup, repeatable=True)
+    with open(os.devnull, 'w') as sink:
+        timer.run('status_report', lambda: schedule.write_status(sink, make_time(10,0)), repeatable=True)
+        timer.run('schedule_report', lambda: schedule.write_schedule(sink), repeatable=True)
+    for result in timer.results:
+        result['locations']=num_locations
+        result['load_capacity']=capacity
+        result['loads']=len(loads.list)
+    return timer.results
+
+def compare(results, previous, tolerance=0.25, min_seconds=0.01):
+    """This function returns a list of descriptions of the stages in results that took more than tolerance (a fraction) longer than in previous results,
+    ignoring stages that took less than min_seconds in both, whose times vary too much to compare. Stages are matched by size and name."""
+    #Time complexity: O(S)
+    #Space complexity: O(S)
+
+    earlier={}
+    for result in previous:
+        earlier[(result['size'], result['stage'])]=result['seconds']
+    slower=[]
+    for result in results:
+        key=(result['size'], result['stage'])
+        if key not in earlier or max(result['seconds'], earlier[key])<min_seconds:
+            continue
+        if result['seconds']>earlier[key]*(1+tolerance):
+            slower.append(str(result['size'])+' '+result['stage']+': '+'{0:.4f}'.format(earlier[key])+' s to '+'{0:.4f}'.format(result['seconds'])+' s')
+    return slower
+
+def main():
+    """This function runs the benchmark with the command line's settings, writes the results file, and exits with status 1 if any stage became slower than in the compared results."""
+    sizes=SIZES
+    output='benchmark.json'
+    previous=None
+    seed=0
+    trace_memory=True
+    args=sys.argv[1:]
+    i=0
+    while i<len(args):
+        if args[i]=='--sizes':
+            sizes=[int(s) for s in args[i+1].split(',')]
+        elif args[i]=='--output':
+            output=args[i+1]
+        elif args[i]=='--compare':
+            previous=args[i+1]
+        elif args[i]=='--seed':
+            seed=int(args[i+1])
+        elif args[i]=='--no-trace':
+            trace_memory=False
+            i-=1
+        else:
+            sys.exit('Unknown option: '+args[i])
+        i+=2
+
+    results=[]
+    with tempfile.TemporaryDirectory() as data_dir:
+        for size in sizes:
+            results+=benchmark_size(size, data_dir, seed, trace_memory)
+    report={'python':platform.python_version(), 'platform':platform.platform(), 'seed':seed, 'trace_memory':trace_memory, 'results':results}
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=1)
+    print('Results written to '+output)
+    if previous is not None:
+        with open(previous) as f:
+            slower=compare(results, json.load(f)['results'])
+        for line in slower:
+            print('Slower: '+line)
+        if slower!=[]:
+            sys.exit(1)
+
+if __name__=='__main__':
+    main()
@@ -0,0 +1,62 @@
+#Benjamin Gamman, 001439763
+"""csvimport.py defines functions used to read and validate the rows of the csv files imported by the LocationTable and PackageTable, and the error raised for an invalid row."""
+
+from timemath import parse_time
+import csv
+
+class CSVFormatError(ValueError):
+    """The CSVFormatError class is the error raised when a row of an imported csv file is missing or has an invalid value, naming the file, line, and field."""
+
+    def __init__(self, file_name, line_num, message):
+        """Initializes the error with the file name, line number, and a description of the problem. A file-like object is named by its name attribute, if it has one."""
+        if hasattr(file_name, 'read'):
+            file_name=getattr(file_name, 'name', '<input>')
+        ValueError.__init__(self, file_name+', line '+str(line_num)+': '+message)
+        self.file_name=file_name
+        self.line_num=line_num
+
+def read_rows(file_name, min_columns):
+    """This function reads all rows of a csv file at once, closing the file afterward, and returns them as a list of lists of strings.
+    A file-like object (such as an uploaded file held in memory) can be provided instead of a path, in which case it is read but not closed.
+    Blank lines at the end of the file are ignored, and a CSVFormatError is raised for a row with fewer than min_columns columns."""
+    #Time complexity: O(N)
+    #The file is read and split into rows by the csv module in one pass.
+    #Space complexity: O(N)
+
+    if hasattr(file_name, 'read'):
+        rows=list(csv.reader(file_name))
+        file_name=getattr(file_name, 'name', '<input>')
+    else:
+        with open(file_name, newline='') as f:
+            rows=list(csv.reader(f))
+    while rows!=[] and rows[len(rows)-1]==[]:
+        rows.pop()
+    for i in range(len(rows)):
+        if len(rows[i])<min_columns:
+            raise CSVFormatError(file_name, i+1, 'expected at least '+str(min_columns)+' columns, found '+str(len(rows[i])))
+    return rows
+
+def read_int(value, file_name, line_num, field):
+    """This function returns the integer value of a field, raising a CSVFormatError naming the field if it is not a whole number."""
+    #Time complexity: O(1)
+    try:
+        return int(value)
+    except ValueError:
+        raise CSVFormatError(file_name, line_num, field+' must be a whole number, found "'+value+'"') from None
+
+def read_float(value, file_name, line_num, field):
+    """This function returns the numeric value of a field, raising a CSVFormatError naming the field if it is not a number."""
+    #Time complexity: O(1)
+    try:
+        return float(value)
+    except ValueError:
+        raise CSVFormatError(file_name, line_num, field+' must be a number, found "'+value+'"') from None
+
+def read_time(value, time_format, file_name, line_num, field):
+    """This function returns the time value (in seconds since midnight) of a field, raising a CSVFormatError naming the field if it does not match the time format.
+    Parsed times are cached (see timemath.parse_time()), so times that repeat across rows, such as deadlines, are only parsed once."""
+    #Time complexity: O(1)
+    try:
+        return parse_time(value, time_format)
+    except ValueError:
+        raise CSVFormatError(file_name, line_num, field+' must be a time formatted as "'+time_format+'", found "'+value+'"') from None
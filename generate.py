@@ -0,0 +1,139 @@
+#Benjamin Gamman, 001439763
+"""generate.py defines functions that generate synthetic locations and packages csv files in the formats imported by the LocationTable and PackageTable, for benchmarks and testing.
+The same seed always generates the same files. Run as a script to generate a pair of files:
+python generate.py locations.csv num_locations packages.csv num_packages [seed]"""
+
+from math import ceil
+from math import hypot
+from math import sqrt
+import csv
+import random
+import sys
+
+#The streets used to make addresses, each location being given a distinct house number and street.
+STREETS=['Main St', 'State St', 'W 2100 S', 'S 900 E', 'Highland Dr', 'Redwood Rd', 'S 700 E', 'W 3300 S', 'Wasatch Blvd', 'E 4500 S',
+         'Van Winkle Expy', 'Bangerter Hwy', 'S 1300 E', 'W 5400 S', 'Foothill Dr', 'S 500 W']
+
+#The deadlines given to packages with one, with the share of packages given each (the rest are due at the end of the day).
+DEADLINES=[('09:00 AM', 0.02), ('10:30 AM', 0.3)]
+
+def location_count(num_packages):
+    """This function returns the number of locations used for a benchmark of the provided number of packages: about six times its square root, from 27 (as in the shipped data) to 2000."""
+    #Time complexity: O(1)
+    return min(2000, max(27, int(6*sqrt(num_packages))))
+
+def load_capacity(num_packages, num_locations, bundle_size=3):
+    """This function returns a load capacity large enough for any group of packages that must be loaded together in a manifest generated by generate_manifest():
+    the packages going to each of the locations joined by one bundle, plus a delayed package. It is at least 16, the capacity of the shipped data's trucks."""
+    #Time complexity: O(1)
+    return max(16, bundle_size*ceil(num_packages/(num_locations-1))+1)
+
+def generate_network(locations_file, num_locations, seed=0, size=20.0):
+    """This function writes a locations csv file with the provided number of locations (the first being the hub) placed at random in a square of the provided size in miles,
+    with the hub at its center, and returns the list of their addresses.
+    The distance between two locations is the straight-line distance between them stretched by a random detour of 15% to 35%, as road distances are,
+    and the distances are written as a lower triangle, one row per location, as in the shipped data."""
+    #Time complexity: O(N^2)
+    #One distance is generated for each pair of locations.
+    #Space complexity: O(N)
+    #Each row is written as it is generated.
+
+    rng=random.Random(seed)
+    points=[(size/2, size/2)]
+    addresses=['4001 South 700 East']
+    for i in range(1, num_locations):
+        points.append((rng.uniform(0, size), rng.uniform(0, size)))
+        addresses.append(str(100+10*(i//len(STREETS)))+' '+STREETS[i%len(STREETS)])
+    with open(locations_file, 'w', newline='') as f:
+        writer=csv.writer(f)
+        for i in range(num_locations):
+            row=['Hub' if i==0 else 'Location '+str(i), addresses[i]]
+            for j in range(i):
+                row.append('{0:.1f}'.format(hypot(points[i][0]-points[j][0], points[i][1]-points[j][1])*rng.uniform(1.15, 1.35)))
+            row.append('0.0')
+            writer.writerow(row+['']*(num_locations-i-1))
+    return addresses
+
+def generate_manifest(packages_file, addresses, num_packages, seed=0, bundle_rate=0.01, bundle_size=3,
+                      truck_rate=0.05, delay_rate=0.05, correction_rate=0.005):
+    """This function writes a packages csv file with the provided number of packages going to the provided addresses (the first being the hub, which receives none).
+    Destinations are spread evenly across the locations, so that no location receives more than its share, and each package is given a random weight and possibly a deadline.
+    The rates set the share of packages that are bundled with others (in groups of up to bundle_size, going to different locations), required to be on truck 2,
+    delayed until 9:05 AM, or listed with a wrong address to be corrected at 10:20 AM.
+    No package has more than one of these notes, and no location receives more than one bundle, so that the groups of packages that must be loaded together
+    are never larger than load_capacity() allows."""
+    #Time complexity: O(N)
+    #Space complexity: O(N)
+
+    rng=random.Random(seed)
+    destinations=[]
+    while len(destinations)<num_packages:
+        keys=list(range(1, len(addresses)))
+        rng.shuffle(keys)
+        destinations+=keys
+    destinations=destinations[:num_packages]
+
+    #Chooses a note for each package, then forms bundles from runs of bundled packages going to locations not already in a bundle.
+    notes=[]
+    for i in range(num_packages):
+        r=rng.random()
+        if r<bundle_rate:
+            notes.append('bundle')
+        elif r<bundle_rate+truck_rate:
+            notes.append('truck')
+        elif r<bundle_rate+truck_rate+delay_rate:
+            notes.append('delay')
+        elif r<bundle_rate+truck_rate+delay_rate+correction_rate:
+            notes.append('correction')
+        else:
+            notes.append('')
+    bundles={}
+    bundled_locations=set()
+    current=[]
+    for i in range(num_packages):
+        if notes[i]!='bundle':
+            continue
+        if destinations[i] in bundled_locations:
+            notes[i]=''
+            continue
+        bundled_locations.add(destinations[i])
+        current.append(i+1)
+        if len(current)==bundle_size:
+            bundles[current[0]]=current[1:]
+            current=[]
+    if len(current)>1:
+        bundles[current[0]]=current[1:]
+
+    with open(packages_file, 'w', newline='') as f:
+        writer=csv.writer(f)
+        for i in range(num_packages):
+            id=i+1
+            deadline='EOD'
+            r=rng.random()
+            for time, share in DEADLINES:
+                if r<share:
+                    deadline=time
+                    break
+                r-=share
+            row=[id, addresses[destinations[i]], 'Salt Lake City', 'UT', '84'+str(100+destinations[i]%100), deadline, rng.randint(1, 60), '', '', '', '', '', '']
+            if id in bundles:
+                row[7]='/'.join([str(b) for b in bundles[id]])
+                row[12]='Must be delivered with '+', '.join([str(b) for b in bundles[id]])
+            elif notes[i]=='truck':
+                row[9]='2'
+                row[12]='Can only be on truck 2'
+            elif notes[i]=='delay':
+                row[8]='9:05'
+                row[12]='Delayed on flight---will not arrive to depot until 9:05 am'
+            elif notes[i]=='correction':
+                row[1]='300 State St'
+                row[10]='10:20'
+                row[11]=addresses[destinations[i]]
+                row[12]='Wrong address listed'
+            writer.writerow(row)
+
+if __name__=='__main__':
+    seed=int(sys.argv[5]) if len(sys.argv)>5 else 0
+    addresses=generate_network(sys.argv[1], int(sys.argv[2]), seed)
+    generate_manifest(sys.argv[3], addresses, int(sys.argv[4]), seed)
+    print('Generated '+sys.argv[2]+' locations in '+sys.argv[1]+' and '+sys.argv[4]+' packages in '+sys.argv[3])
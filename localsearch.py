@@ -0,0 +1,165 @@
+#Benjamin Gamman, 001439763
+"""localsearch.py defines functions used to improve the order of a route's stops after it has been constructed, using 2-opt and Or-opt moves."""
+
+from Feasibility import DeadlineOracle
+from heapq import nsmallest
+from time import perf_counter
+
+def tour_length(tour, locations):
+    """This function returns the total distance travelled along a tour (a list of location keys)."""
+    #Space complexity: O(1)
+    #Time complexity: O(N)
+
+    total=0.0
+    for i in range(1, len(tour)):
+        total+=locations.distances[tour[i-1]][tour[i]]
+    return total
+
+def two_opt(tour, locations):
+    """This function returns a copy of a tour (a list of location keys starting and ending at the hub) improved with 2-opt moves until none shortens it, without regard to deadlines.
+    Unlike improve_route(), it has no time budget, so the same tour is always improved the same way; it is meant for estimating the length of short routes (see LoadList.estimate_route())."""
+    #Space complexity: O(N)
+    #Time complexity: O(N^2) per pass
+    #Each pair of edges is checked once per pass, and passes repeat until no move shortens the tour.
+
+    tour=list(tour)
+    improved=True
+    while improved==True:
+        improved=False
+        for i in range(1, len(tour)-2):
+            for j in range(i+1, len(tour)-1):
+                if (locations.distances[tour[i-1]][tour[j]]+locations.distances[tour[i]][tour[j+1]]
+                    <locations.distances[tour[i-1]][tour[i]]+locations.distances[tour[j]][tour[j+1]]-0.0001):
+                    tour[i:j+1]=tour[i:j+1][::-1]
+                    improved=True
+    return tour
+
+def improve_route(stops, locations, fixed=0, departure_time=0, speed_mph=18, time_budget=0.05, neighbor_count=8):
+    """This function improves the order of a route's stops (a list of location keys, not including the hub) using 2-opt and Or-opt moves, and returns the improved list.
+    The route is treated as a tour starting and ending at the hub. The first "fixed" stops are kept in place, so that stops which must be visited first (such as early deadlines) are not moved.
+    A move is only made if it shortens the tour without increasing the number of stops reached after their deadline.
+    Moves are only considered between each stop and its nearest neighbors on the route, and stops whose surroundings have not changed are skipped ("don't-look bits").
+    The search stops after time_budget seconds, returning the best order found so far."""
+    #Space complexity: O(N*K)
+    #Each of N stops holds a list of its K nearest neighbors on the route.
+    #Time complexity: O(N*K*M)
+    #Each pass over the active stops evaluates O(K) candidate moves per stop in O(1) time each, and each of M improving moves costs O(N) to check deadlines and apply.
+    #Deadlines are only checked from the first position a move changes (see DeadlineOracle), as the stops before it are reached at the same times.
+    #The time budget bounds the total regardless of M.
+
+    deadline_at=perf_counter()+time_budget
+    tour=[0]+list(stops)+[0]
+    m=len(tour)
+    if m-fixed<4:
+        return list(stops)
+    dist=locations.distances
+    pos={}
+    for i in range(1, m-1):
+        pos[tour[i]]=i
+
+    #Builds each stop's list of nearest neighbors among the other stops on the route, nearest first.
+    route_stops=tour[1:m-1]
+    neighbors={}
+    for a in route_stops:
+        row=dist.row(a)
+        neighbors[a]=nsmallest(neighbor_count+1, route_stops, key=row.__getitem__)
+        if a in neighbors[a]:
+            neighbors[a].remove(a)
+        neighbors[a]=neighbors[a][:neighbor_count]
+
+    oracle=DeadlineOracle(tour, locations, departure_time, speed_mph)
+    late=oracle.late()
+
+    def d(x, y):
+        return dist[tour[x]][tour[y]]
+
+    def two_opt_delta(x, y):
+        #Reversing tour[x+1..y] replaces edges (x, x+1) and (y, y+1) with (x, y) and (x+1, y+1).
+        return d(x, y)+d(x+1, y+1)-d(x, x+1)-d(y, y+1)
+
+    def or_opt_delta(s, e, p, reverse):
+        #Moving the segment tour[s..e] to between positions p and p+1, reversed or not.
+        removed=d(s-1, s)+d(e, e+1)-d(s-1, e+1)
+        if reverse:
+            added=d(p, e)+d(s, p+1)-d(p, p+1)
+        else:
+            added=d(p, s)+d(e, p+1)-d(p, p+1)
+        return added-removed
+
+    def apply_or_opt(s, e, p, reverse):
+        segment=tour[s:e+1]
+        if reverse:
+            segment.reverse()
+        rest=tour[:s]+tour[e+1:]
+        if p>e:
+            p-=e-s+1
+        return rest[:p+1]+segment+rest[p+1:]
+
+    active=list(route_stops)
+    in_active=set(active)
+    while active!=[] and perf_counter()<deadline_at:
+        a=active.pop()
+        in_active.discard(a)
+        i=pos[a]
+        moved=False
+
+        #2-opt moves making a adjacent to one of its nearest neighbors, from either side of a.
+        candidates=[]
+        for c in neighbors[a]:
+            j=pos[c]
+            if j>i:
+                candidates.append((i, j))
+                candidates.append((i-1, j-1))
+            else:
+                candidates.append((j, i))
+                candidates.append((j-1, i-1))
+        for x, y in candidates:
+            if x<fixed or y>m-2 or y<=x+1:
+                continue
+            if two_opt_delta(x, y)<-0.0001:
+                new_tour=tour[:x+1]+tour[x+1:y+1][::-1]+tour[y+1:]
+                new_late=oracle.late_with(new_tour, x)
+                if new_late<=late:
+                    touched=[tour[x], tour[x+1], tour[y], tour[y+1]]
+                    oracle.accept(new_tour, x)
+                    tour=new_tour
+                    late=new_late
+                    moved=True
+                    break
+
+        #Or-opt moves relocating a segment of one to three stops starting at a next to one of a's nearest neighbors.
+        if moved==False:
+            for length in (1, 2, 3):
+                s=i
+                e=i+length-1
+                if s<=fixed or e>m-2:
+                    break
+                for c in neighbors[a]:
+                    j=pos[c]
+                    for p, reverse in ((j, False), (j-1, True)):
+                        if p<fixed or p+1>m-1 or (p>=s-1 and p<=e):
+                            continue
+                        if or_opt_delta(s, e, p, reverse)<-0.0001:
+                            new_tour=apply_or_opt(s, e, p, reverse)
+                            new_late=oracle.late_with(new_tour, min(s-1, p))
+                            if new_late<=late:
+                                touched=[tour[s-1], tour[e+1], tour[p], tour[p+1]]+tour[s:e+1]
+                                oracle.accept(new_tour, min(s-1, p))
+                                tour=new_tour
+                                late=new_late
+                                moved=True
+                                break
+                    if moved==True:
+                        break
+                if moved==True:
+                    break
+
+        #If a move was made, stop positions are updated and the stops at the ends of the changed edges are checked again.
+        if moved==True:
+            for k in range(1, m-1):
+                pos[tour[k]]=k
+            for stop in touched+[a]:
+                if stop!=0 and stop not in in_active:
+                    active.append(stop)
+                    in_active.add(stop)
+    return tour[1:m-1]
@@ -1,21 +1,11 @@
 #Benjamin Gamman, 001439763
-"""main.py creates instances of data structures defined in other files, then handles input and output to interact with those data structures through a menu."""
+"""main.py plans the day's deliveries using the Planner defined in Planner.py, then handles input and output to interact with the resulting schedule through a menu."""
 #Overall time complexity: O(
 #Overall space complexity: O(
 
-from Package import Package
-from Package import PackageTable
-from Location import Location
-from Location import LocationTable
-from Load import Load
-from Load import LoadList
-from Truck import Truck
-from Truck import TruckList
-from Schedule import Schedule
-from timemath import add_times
-from timemath import calc_time
-from datetime import datetime
-from datetime import time
+from Planner import Planner
+from timemath import make_time
+from timemath import parse_time
 import sys
 
 def display_menu():
@@ -34,66 +24,81 @@ def display_menu():
 TRUCK_SPEED=18
 TRUCK_CAPACITY=16
 NUM_TRUCKS=2
-START_TIME=time(8,0)
+START_TIME=make_time(8,0)
 
-#Calls on classes and methods defined in other files to initialize and populate the program's data structures.
+def run_menu(schedule):
+    """This function handles input and output through the menu for the provided Schedule until the user exits."""
+    #Handles input and output through the mmenu, utilizing other methods to generate requested output.
+    #This portion of the program has:
+    #Time complexity O(N) as the more complex calculations have already been completed and results stored
+    #Space complexity O(N^2) as the PackageTable and LocationTable constructs are accessed and used by the functions called on the schedule.
 
-locations=LocationTable()
-locations.import_csv('locations.csv')
-
-packages=PackageTable()
-packages.import_csv('packages.csv', locations)
-
-loads=LoadList((len(packages.table)-1), TRUCK_CAPACITY, ['Express', 'Delay', 'Final'])
-loads.sort(packages, locations)
-    
-trucks=TruckList(NUM_TRUCKS, START_TIME, TRUCK_SPEED)
-trucks.deliver(loads, packages, locations)
-
-schedule=Schedule(locations, packages, loads)
-
-#Handles input and output through the mmenu, utilizing other methods to generate requested output.
-#This portion of the program has:
-#Time complexity O(N) as the more complex calculations have already been completed and results stored
-#Space complexity O(N^2) as the PackageTable and LocationTable constructs are accessed and used by the functions called on the schedule.
-
-command='p'
-while command!='q':
-    if command=='p':
-        schedule.print_schedule()
-    elif command=='a':
-        try:
-            time_str=input('Enter a time for which to view status (enter as "X:XX am" or "X:XX pm"):')
-            status_time=datetime.time(datetime.strptime(time_str, '%I:%M %p'))
-            print()
-            schedule.status_all(status_time)
-        except:
-            print('Invalid time entered.')
+    command='p'
+    while command!='q':
+        if command=='p':
+            schedule.print_schedule()
+        elif command=='a':
+            try:
+                time_str=input('Enter a time for which to view status (enter as "X:XX am" or "X:XX pm"):')
+                status_time=parse_time(time_str, '%I:%M %p')
+                print()
+                schedule.status_all(status_time)
+            except:
+                print('Invalid time entered.')
+                print()
+        elif command=='s':
+            print('Use one of the following to search:')
+            print('-Package ID')
+            print('-Weight (enter as "X kg", no decimal)')
+            print('-Destination Address (case sensitive, returns all street addresses containing the search term)')
+            print('-Destination City (case sensitive, returns all cities containing the search term)')
+            print('-Destination State (enter the state\'s two-letter abbreviation, capitalized)')
+            print('-Zip Code (enter the five digit zip code)')
+            print('-Deadline (enter as "X:XX am" or "X:XX pm")')
+            print('-Status (enter "delivered", "en route", "at hub", or "delayed")')
+            print('Separate search terms with "&" to find packages matching all of them (such as "84115 & en route").')
             print()
-    elif command=='s':
-        print('Use one of the following to search:')
-        print('-Package ID')
-        print('-Weight (enter as "X kg", no decimal)')
-        print('-Destination Address (case sensitive, returns all street addresses containing the search term)')
-        print('-Destination City (case sensitive, returns all cities containing the search term)')
-        print('-Destination State (enter the state\'s two-letter abbreviation, capitalized)')
-        print('-Zip Code (enter the five digit zip code)')
-        print('-Deadline (enter as "X:XX am" or "X:XX pm")')
-        print('-Status (enter "delivered", "en route", "at hub", or "delayed")')
+            search_term=input('Enter a search term:')
+            try:
+                time_str=input('Enter a time for which to view status (enter as "X:XX am" or "X:XX pm"):')
+                status_time=parse_time(time_str, '%I:%M %p')
+                print()
+                schedule.status_search(status_time, search_term)
+            except:
+                print('Invalid time entered.')
+                print()
+        else:
+            print('Command not recognized, please enter a valid command.')
+        display_menu()
+        command=input('Enter command:')
         print()
-        search_term=input('Enter a search term:')
+
+def main():
+    """This function plans the day's deliveries from the csv files using the situational constants above, then runs the menu.
+    If run with --serve (and optionally a port number), the plan is served over HTTP instead (see PlanService.py).
+    If run with --sweep and a grid of parameter values (such as --sweep num_trucks=2,3 truck_speed=18,25 start_time=08:00,09:00), a table of the results of every combination
+    is printed instead (see ScenarioSweep.py), with the situational constants above used for any parameter not given."""
+    #The planner computes the plan when the schedule is first requested (see Planner.py).
+    planner=Planner('locations.csv', 'packages.csv', NUM_TRUCKS, TRUCK_CAPACITY, TRUCK_SPEED, START_TIME)
+    if len(sys.argv)>1 and sys.argv[1]=='--sweep':
+        from ScenarioSweep import ScenarioSweep
+        from ScenarioSweep import read_grid
+        import os
         try:
-            time_str=input('Enter a time for which to view status (enter as "X:XX am" or "X:XX pm"):')
-            status_time=datetime.time(datetime.strptime(time_str, '%I:%M %p'))
-            print()
-            schedule.status_search(status_time, search_term)
-        except:
-            print('Invalid time entered.')
-            print()
-    else:
-        print('Command not recognized, please enter a valid command.')
-    display_menu()
-    command=input('Enter command:')
-    print()
+            grid=read_grid(sys.argv[2:], {'num_trucks':NUM_TRUCKS, 'truck_capacity':TRUCK_CAPACITY, 'truck_speed':TRUCK_SPEED, 'start_time':START_TIME})
+        except ValueError as e:
+            sys.exit(str(e))
+        sweep=ScenarioSweep('locations.csv', 'packages.csv', workers=os.cpu_count() or 1)
+        sweep.write_table(sweep.run(grid), sys.stdout)
+        sys.exit()
+    if len(sys.argv)>1 and sys.argv[1]=='--serve':
+        from PlanService import PlanService
+        service=PlanService(planner, port=int(sys.argv[2]) if len(sys.argv)>2 else 8080)
+        print('Serving the delivery plan at http://'+service.host+':'+str(service.port)+'/')
+        service.run()
+        sys.exit()
+    run_menu(planner.schedule)
+    sys.exit()
 
-sys.exit()
+if __name__=='__main__':
+    main()
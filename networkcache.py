@@ -0,0 +1,128 @@
+#Benjamin Gamman, 001439763
+"""networkcache.py defines functions used to write a LocationTable's network data to a binary network file, and to read it back by memory-mapping the file.
+The file holds the distance matrix, the neighbor index, and each location's information (including its ring and region), and is keyed by a hash of the source csv file,
+so that it is only rebuilt when the network changes. Run as a script to compile a network file: python networkcache.py locations.csv [network file]"""
+
+from DistanceMatrix import DistanceMatrix
+from DistanceMatrix import map_file
+from NeighborIndex import NeighborIndex
+import hashlib
+import json
+import os
+import struct
+import sys
+
+#The file starts with MAGIC, followed by a header holding (in order): the source file's SHA-256 hash, the number of locations, the size of each distance in bytes,
+#the max_neighbors setting used (-1 if none), the number of neighbors stored per location, and the offset and length of each section.
+#Sections (location information as JSON, the distance matrix, the neighbor keys, and the neighbor distances) each start at a multiple of ALIGNMENT bytes.
+MAGIC=b'DSNETWK1'
+
+#The version of the data compiled from the csv file (such as the normalization of addresses, the rings and regions assigned, and the neighbor index), which is hashed along with the file,
+#so that network files compiled by an earlier version are rebuilt rather than used. It must be increased whenever import_csv() changes what it computes.
+FORMAT_VERSION=2
+HEADER=struct.Struct('<32sqqqqqqqqqq')
+ALIGNMENT=64
+
+def source_hash(locations_file):
+    """This function returns the SHA-256 hash of FORMAT_VERSION and the contents of a file, as bytes, used as the key of the file's network file."""
+    #Time complexity: O(N)
+    #The file is read and hashed in chunks.
+    #Space complexity: O(1)
+
+    digest=hashlib.sha256(('network format '+str(FORMAT_VERSION)+'\n').encode('utf-8'))
+    with open(locations_file, 'rb') as f:
+        chunk=f.read(1048576)
+        while chunk!=b'':
+            digest.update(chunk)
+            chunk=f.read(1048576)
+    return digest.digest()
+
+def cache_path(locations_file):
+    """This function returns the default path of the network file compiled from a csv file (the same path, with the extension .netcache)."""
+    #Time complexity: O(1)
+    return os.path.splitext(locations_file)[0]+'.netcache'
+
+def aligned(offset):
+    """This function returns the first multiple of ALIGNMENT at or after an offset."""
+    #Time complexity: O(1)
+    return (offset+ALIGNMENT-1)//ALIGNMENT*ALIGNMENT
+
+def write_network(locations, network_file, digest):
+    """This function writes the network data of a LocationTable (its locations' information, address index, distance matrix, and neighbor index),
+    as imported from a csv file with the provided hash, to a network file.
+    The file is written under a temporary name and then renamed, so that other processes never map a partly written file. If writing fails, the temporary file is removed
+    and the OSError is raised."""
+    #Time complexity: O(N^2)
+    #Each entry of the distance matrix is written once.
+    #Space complexity: O(N^2)
+
+    info=[]
+    for l in locations.table:
+        info.append([l.name, l.address, l.city, l.state, l.zip, l.avg_dist, l.ring, l.region])
+    info=json.dumps({'locations':info, 'address_index':locations.address_index}).encode('utf-8')
+    matrix=locations.distances.to_bytes()
+    keys, dists=locations.neighbors.to_bytes()
+    n=len(locations.table)
+    itemsize=len(matrix)//(n*n) if n>0 else 8
+    max_neighbors=locations.max_neighbors if locations.max_neighbors is not None else -1
+
+    #The offset of each section is found, then the header and sections are written with padding between them.
+    sections=[info, matrix, keys, dists]
+    offsets=[]
+    offset=aligned(len(MAGIC)+HEADER.size)
+    for section in sections:
+        offsets.append(offset)
+        offset=aligned(offset+len(section))
+    header=HEADER.pack(digest, n, itemsize, max_neighbors, locations.neighbors.max_neighbors,
+                       offsets[0], len(info), offsets[1], offsets[2], offsets[3], len(matrix))
+    temp_file=network_file+'.'+str(os.getpid())+'.tmp'
+    try:
+        with open(temp_file, 'wb') as f:
+            f.write(MAGIC+header)
+            for i in range(len(sections)):
+                f.write(b'\0'*(offsets[i]-f.tell()))
+                f.write(sections[i])
+        os.replace(temp_file, network_file)
+    except OSError:
+        if os.path.exists(temp_file):
+            os.remove(temp_file)
+        raise
+
+def read_network(network_file, digest, dtype='float64', backend=None, max_neighbors=None):
+    """This function reads a network file by memory-mapping it, and returns a tuple of a list of each location's information
+    (name, address, city, state, zip, average distance, ring, and region), the address index, the DistanceMatrix, and the NeighborIndex.
+    None is returned if the file does not exist, cannot be read, or does not match the source hash and the provided settings."""
+    #Time complexity: O(N)
+    #The location information is decoded, and a view of each row of the distance matrix and neighbor index is created; their entries are read from the file only when accessed.
+    #Space complexity: O(N)
+
+    if not os.path.exists(network_file) or os.path.getsize(network_file)<len(MAGIC)+HEADER.size:
+        return None
+    try:
+        buffer=map_file(network_file)
+    except OSError:
+        return None
+    if buffer[:len(MAGIC)]!=MAGIC:
+        return None
+    (file_digest, n, itemsize, file_max_neighbors, stored_neighbors,
+     info_offset, info_length, matrix_offset, keys_offset, dists_offset, matrix_length)=HEADER.unpack_from(buffer, len(MAGIC))
+    expected_itemsize=4 if dtype=='float32' else 8
+    expected_neighbors=max_neighbors if max_neighbors is not None else -1
+    if file_digest!=digest or itemsize!=expected_itemsize or file_max_neighbors!=expected_neighbors or matrix_length!=n*n*itemsize:
+        return None
+
+    #The file's absolute path is recorded, so that worker processes map the same file regardless of their working directory.
+    info=json.loads(bytes(buffer[info_offset:info_offset+info_length]).decode('utf-8'))
+    network_file=os.path.abspath(network_file)
+    distances=DistanceMatrix.from_buffer(buffer, n, dtype, backend, matrix_offset, (network_file, matrix_offset))
+    neighbors=NeighborIndex.from_buffer(distances, stored_neighbors, buffer, keys_offset, dists_offset, network_file)
+    return info['locations'], info['address_index'], distances, neighbors
+
+if __name__=='__main__':
+    from Location import LocationTable
+    locations_file=sys.argv[1]
+    network_file=sys.argv[2] if len(sys.argv)>2 else cache_path(locations_file)
+    locations=LocationTable()
+    locations.import_csv(locations_file)
+    write_network(locations, network_file, source_hash(locations_file))
+    print('Compiled '+str(len(locations.table))+' locations from '+locations_file+' to '+network_file)
@@ -0,0 +1,217 @@
+#Benjamin Gamman, 001439763
+"""profiling.py defines the Profiler class, which records where planning time goes: the wall and CPU time of each stage of the pipeline, how many times frequently called
+functions run (such as Load.add() and next_stop_greedy()), lookups in the distance matrix, and peak memory. Results can be exported as JSON or as a Chrome trace file
+(viewable in chrome://tracing or Perfetto). Instrumentation is only installed while a Profiler is enabled, so planning runs exactly the same code, at no cost, otherwise.
+Run as a script to profile planning the day's deliveries: python profiling.py [locations.csv] [packages.csv] [profile.json] [trace.json]"""
+
+from time import perf_counter
+from time import thread_time
+import importlib
+import json
+import os
+import sys
+import threading
+import tracemalloc
+
+#The resource module is only available on Unix; elsewhere the process's peak memory is not reported.
+try:
+    import resource
+except ImportError:
+    resource=None
+
+#The functions timed as stages, each given as the module defining it and its name (with its class, for a method). Calls to stages may be nested, such as a routing strategy inside delivery.
+STAGES=[('Location', 'LocationTable.import_csv'), ('Location', 'LocationTable.import_cached'), ('Package', 'PackageTable.import_csv'),
+        ('Package', 'PackageTable.build_groups'), ('Package', 'PackageTable.build_index'), ('Load', 'LoadList.sort'), ('Load', 'LoadList.build'),
+        ('Truck', 'TruckList.deliver'), ('Truck', 'TruckList.plan_parallel'), ('Routing', 'GreedyRouting.order'), ('Routing', 'InsertionRouting.order'),
+        ('localsearch', 'improve_route'), ('Schedule', 'Schedule.__init__'), ('Feasibility', 'check_plan'), ('Replanner', 'Replanner.apply')]
+
+#The functions whose calls are only counted, as they run too often to time each call without slowing planning noticeably.
+COUNTERS=[('Load', 'Load.add'), ('Routing', 'next_stop_greedy'), ('DistanceMatrix', 'DistanceMatrix.__getitem__'), ('DistanceMatrix', 'DistanceMatrix.row'),
+          ('DistanceMatrix', 'DistanceMatrix.nearest'), ('DistanceMatrix', 'DistanceMatrix.within'), ('NeighborIndex', 'NeighborIndex.within'),
+          ('Location', 'LocationTable.find'), ('Package', 'PackageTable.update_destination'), ('Package', 'PackageTable.lookup')]
+
+def peak_rss():
+    """This function returns the peak resident memory of the process in kilobytes, or None where it cannot be found."""
+    #Time complexity: O(1)
+    if resource is None:
+        return None
+    peak=resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    #Linux reports kilobytes, but macOS reports bytes.
+    if sys.platform=='darwin':
+        peak//=1024
+    return peak
+
+class Profiler:
+    """The Profiler class records the stages and counts of planning while it is enabled, either between enable() and disable() or in a with statement:
+        with Profiler() as profiler:
+            planner.plan()
+        profiler.write_json('profile.json')
+    Enabling it replaces each function listed in STAGES and COUNTERS (in its module or class, and in any module that imported it by name) with a wrapper that records its calls,
+    and disabling it puts the original functions back. Only one Profiler can be enabled at a time, and calls made in worker processes (see TruckList.plan_parallel()) are not recorded.
+    If trace_memory is True, the peak memory allocated during each outermost stage is also traced (see tracemalloc), which slows planning considerably."""
+    #Space complexity: O(C)
+    #One record is kept for each of C calls to a stage, along with one count for each counted function.
+
+    #The Profiler currently enabled, if any.
+    active=None
+
+    def __init__(self, trace_memory=False):
+        """Initializes a Profiler, which records nothing until it is enabled."""
+        #Time complexity: O(1)
+        #Space complexity: O(1)
+
+        self.trace_memory=trace_memory
+        self.spans=[]
+        self.counts={}
+        self.patches=[]
+        self.depth=threading.local()
+        self.start_time=0.0
+
+    def __enter__(self):
+        self.enable()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.disable()
+        return False
+
+    def enable(self):
+        """This method installs the wrappers that record stages and counts. Records from an earlier time the Profiler was enabled are kept."""
+        #Time complexity: O(F*M)
+        #Each of F functions is replaced in its module or class, and in each of M loaded modules that imported it by name.
+
+        if Profiler.active is not None:
+            raise ValueError('Another Profiler is already enabled.')
+        Profiler.active=self
+        if self.start_time==0.0:
+            self.start_time=perf_counter()
+        for module_name, name in STAGES:
+            self.patch(module_name, name, self.timed)
+        for module_name, name in COUNTERS:
+            self.counts.setdefault(name, 0)
+            self.patch(module_name, name, self.counted)
+
+    def disable(self):
+        """This method puts back the original functions, so that planning runs without any instrumentation."""
+        #Time complexity: O(F*M)
+
+        for owner, attribute, original in reversed(self.patches):
+            setattr(owner, attribute, original)
+        self.patches=[]
+        if Profiler.active is self:
+            Profiler.active=None
+
+    def patch(self, module_name, name, make_wrapper):
+        """This method replaces the named function of a module (or method of one of its classes) with the wrapper returned by make_wrapper,
+        recording each replacement so that disable() can reverse it. A function is also replaced in every loaded module that imported it by name (such as next_stop_greedy() in Truck.py)."""
+        #Time complexity: O(M)
+
+        module=importlib.import_module(module_name)
+        parts=name.split('.')
+        if len(parts)==2:
+            owner=getattr(module, parts[0])
+            original=owner.__dict__[parts[1]]
+            self.patches.append((owner, parts[1], original))
+            setattr(owner, parts[1], make_wrapper(name, original))
+            return
+        original=getattr(module, name)
+        wrapper=make_wrapper(name, original)
+        for other in list(sys.modules.values()):
+            if getattr(other, name, None) is original:
+                self.patches.append((other, name, original))
+                setattr(other, name, wrapper)
+
+    def counted(self, name, function):
+        """This method returns a wrapper for a function that counts its calls under the provided name."""
+        counts=self.counts
+        def wrapper(*args, **kwargs):
+            counts[name]+=1
+            return function(*args, **kwargs)
+        wrapper.__wrapped__=function
+        return wrapper
+
+    def timed(self, name, function):
+        """This method returns a wrapper for a function that records each call as a stage under the provided name: its start, wall time, CPU time (of its thread), and nesting depth,
+        along with the peak memory traced during the call if it is an outermost stage and memory is traced."""
+        profiler=self
+        def wrapper(*args, **kwargs):
+            depth=getattr(profiler.depth, 'value', 0)
+            profiler.depth.value=depth+1
+            traced=profiler.trace_memory==True and depth==0 and not tracemalloc.is_tracing()
+            if traced==True:
+                tracemalloc.start()
+            start=perf_counter()
+            cpu_start=thread_time()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                wall=perf_counter()-start
+                cpu=thread_time()-cpu_start
+                allocated=None
+                if traced==True:
+                    allocated=tracemalloc.get_traced_memory()[1]
+                    tracemalloc.stop()
+                profiler.depth.value=depth
+                profiler.spans.append((name, start-profiler.start_time, wall, cpu, depth, threading.get_ident(), allocated))
+        wrapper.__wrapped__=function
+        return wrapper
+
+    def stages(self):
+        """This method returns a dictionary of the totals recorded for each stage, keyed by name: its number of calls, total wall and CPU time in seconds,
+        and (if memory was traced) the largest peak memory allocated during one call, in kilobytes. Time spent in nested stages is included in the stage containing them."""
+        #Time complexity: O(C)
+        #Space complexity: O(S)
+
+        totals={}
+        for name, start, wall, cpu, depth, thread, allocated in self.spans:
+            if name not in totals:
+                totals[name]={'calls':0, 'wall_seconds':0.0, 'cpu_seconds':0.0, 'peak_allocated_kb':None}
+            stage=totals[name]
+            stage['calls']+=1
+            stage['wall_seconds']+=wall
+            stage['cpu_seconds']+=cpu
+            if allocated is not None and (stage['peak_allocated_kb'] is None or allocated//1024>stage['peak_allocated_kb']):
+                stage['peak_allocated_kb']=allocated//1024
+        return totals
+
+    def report(self):
+        """This method returns a dictionary of everything recorded: the totals for each stage, the count of each counted function's calls, and the process's peak memory."""
+        #Time complexity: O(C)
+        return {'stages':self.stages(), 'counts':dict(self.counts), 'peak_rss_kb':peak_rss()}
+
+    def write_json(self, path):
+        """This method writes the report (see report()) to a JSON file."""
+        #Time complexity: O(C)
+        with open(path, 'w') as f:
+            json.dump(self.report(), f, indent=1)
+
+    def write_chrome_trace(self, path):
+        """This method writes each recorded call to a stage as a complete event in the Chrome trace event format, with the counts recorded as a counter event at the end."""
+        #Time complexity: O(C)
+        #Space complexity: O(C)
+
+        pid=os.getpid()
+        events=[]
+        end=0.0
+        for name, start, wall, cpu, depth, thread, allocated in self.spans:
+            args={'cpu_ms':round(cpu*1000, 3)}
+            if allocated is not None:
+                args['peak_allocated_kb']=allocated//1024
+            events.append({'name':name, 'cat':'planning', 'ph':'X', 'ts':round(start*1000000, 1), 'dur':round(wall*1000000, 1), 'pid':pid, 'tid':thread, 'args':args})
+            end=max(end, start+wall)
+        events.sort(key=lambda e: e['ts'])
+        events.append({'name':'counts', 'ph':'C', 'ts':round(end*1000000, 1), 'pid':pid, 'args':dict(self.counts)})
+        with open(path, 'w') as f:
+            json.dump({'traceEvents':events, 'displayTimeUnit':'ms'}, f)
+
+if __name__=='__main__':
+    from Planner import Planner
+    args=sys.argv[1:]+['locations.csv', 'packages.csv', 'profile.json', 'trace.json'][len(sys.argv)-1:]
+    with Profiler() as profiler:
+        Planner(args[0], args[1]).plan()
+    profiler.write_json(args[2])
+    profiler.write_chrome_trace(args[3])
+    for name, stage in profiler.stages().items():
+        print('{0:<32}{1:>6} calls{2:>12.4f} s wall{3:>12.4f} s CPU'.format(name, stage['calls'], stage['wall_seconds'], stage['cpu_seconds']))
+    for name, count in profiler.counts.items():
+        print('{0:<32}{1:>12} calls'.format(name, count))
@@ -0,0 +1,51 @@
+#Benjamin Gamman, 001439763
+"""snapshot.py defines functions used to copy a plan's data (or send it to a worker process) as a pickled snapshot that leaves out the parts of its network shared by every plan
+(the distance matrix, neighbor index, and address index; see LocationTable.copy()), so that a snapshot is O(N) in size however large the network is."""
+
+import io
+import pickle
+
+def shared_parts(locations):
+    """This function returns a dictionary of the parts of a LocationTable's network shared with every LocationTable copied from the same network: its distance matrix, neighbor index, and address index."""
+    #Time complexity: O(1)
+    return {'distances':locations.distances, 'neighbors':locations.neighbors, 'address_index':locations.address_index}
+
+class _SnapshotPickler(pickle.Pickler):
+    """The _SnapshotPickler class pickles a plan's data, writing the shared parts of its network as references by name."""
+
+    def __init__(self, file, shared):
+        pickle.Pickler.__init__(self, file, pickle.HIGHEST_PROTOCOL)
+        self.shared={}
+        for name in shared:
+            self.shared[id(shared[name])]=name
+
+    def persistent_id(self, obj):
+        return self.shared.get(id(obj))
+
+class _SnapshotUnpickler(pickle.Unpickler):
+    """The _SnapshotUnpickler class unpickles a plan's data written by a _SnapshotPickler, restoring the references to the shared parts of the network."""
+
+    def __init__(self, file, shared):
+        pickle.Unpickler.__init__(self, file)
+        self.shared=shared
+
+    def persistent_load(self, pid):
+        return self.shared[pid]
+
+def snapshot(data, locations):
+    """This function returns a snapshot (as bytes) of any data of a plan (such as a tuple of its LocationTable and PackageTable) whose network is shared with the provided LocationTable.
+    The shared parts of the network are left out, so the snapshot is O(N) in size."""
+    #Time complexity: O(N)
+    #Space complexity: O(N)
+
+    buffer=io.BytesIO()
+    _SnapshotPickler(buffer, shared_parts(locations)).dump(data)
+    return buffer.getvalue()
+
+def restore(data, locations):
+    """This function returns a new copy of the data held in a snapshot, sharing the distance matrix, neighbor index, and address index of the provided LocationTable
+    (which must be of the same network as the LocationTable the snapshot was taken with)."""
+    #Time complexity: O(N)
+    #Space complexity: O(N)
+
+    return _SnapshotUnpickler(io.BytesIO(data), shared_parts(locations)).load()
@@ -0,0 +1,30 @@
+#Benjamin Gamman, 001439763
+"""test_loads.py checks that LoadList.build() plans the shipped data no worse than LoadList.sort() does for fleets of more than two trucks. Run with: python -m unittest test_loads"""
+
+from Planner import Planner
+from Feasibility import check_plan
+import os
+import unittest
+
+DIRECTORY=os.path.dirname(os.path.abspath(__file__))
+
+class BuildTest(unittest.TestCase):
+    """The BuildTest class compares the plans of the shipped locations and packages with loads built by LoadList.build() and sorted by LoadList.sort()."""
+
+    def plan(self, num_trucks, build_loads, truck_speed):
+        """This method plans the shipped data and returns its FeasibilityReport (see check_plan())."""
+        planner=Planner(os.path.join(DIRECTORY, 'locations.csv'), os.path.join(DIRECTORY, 'packages.csv'), num_trucks=num_trucks, truck_speed=truck_speed, build_loads=build_loads)
+        planner.plan()
+        return check_plan(planner.packages, planner.loads)
+
+    def test_build_no_worse_than_sort(self):
+        for truck_speed in (18, 25):
+            sorted_report=self.plan(2, False, truck_speed)
+            for num_trucks in (3, 4, 8):
+                with self.subTest(num_trucks=num_trucks, truck_speed=truck_speed):
+                    report=self.plan(num_trucks, True, truck_speed)
+                    self.assertLessEqual(report.violations(), sorted_report.violations())
+                    self.assertLessEqual(round(report.miles, 1), round(sorted_report.miles, 1))
+
+if __name__=='__main__':
+    unittest.main()
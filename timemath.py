@@ -1,45 +1,72 @@
 #Benjamin Gamman, 001439763
-"""timemath.py defines functions used to perform basic calculations with time values."""
+"""timemath.py defines functions used to perform basic calculations with time values.
+Times are represented internally as integer numbers of seconds since midnight, and are only converted to datetime.time objects for display."""
 
+from datetime import datetime
 from datetime import time
-from math import ceil
+from functools import lru_cache
+
+SECONDS_PER_DAY=86400
+
+def make_time(hours, minutes=0, seconds=0):
+    """This function returns the time value (in seconds since midnight) for the provided hours, minutes, and seconds."""
+    #Space complexity: O(1)
+    #Time complexity: O(1)
+
+    return hours*3600+minutes*60+seconds
+
+def to_seconds(t):
+    """This function converts a datetime.time object to a time value in seconds since midnight."""
+    #Space complexity: O(1)
+    #Time complexity: O(1)
+
+    return t.hour*3600+t.minute*60+t.second
+
+def to_time(seconds):
+    """This function converts a time value in seconds since midnight to a datetime.time object, for display. Times past midnight are given as the time of day on the following day."""
+    #Space complexity: O(1)
+    #Time complexity: O(1)
+
+    seconds=seconds%SECONDS_PER_DAY
+    return time(seconds//3600, (seconds%3600)//60, seconds%60)
+
+def format_time(seconds, time_format='%H:%M:%S'):
+    """This function formats a time value in seconds since midnight using a strftime format string, noting the number of days later if the time is past midnight."""
+    #Space complexity: O(1)
+    #Time complexity: O(1)
+
+    time_str=to_time(seconds).strftime(time_format)
+    if seconds>=SECONDS_PER_DAY:
+        time_str+=' (+'+str(seconds//SECONDS_PER_DAY)+'d)'
+    return time_str
+
+@lru_cache(maxsize=4096)
+def parse_time(time_str, time_format):
+    """This function parses a string using a strptime format string and returns the time value in seconds since midnight.
+    Results are cached, as the same few times (such as deadlines) are parsed many times during import."""
+    #Space complexity: O(1)
+    #The cache holds a fixed maximum number of results.
+    #Time complexity: O(1)
+
+    return to_seconds(datetime.strptime(time_str, time_format))
 
 def add_times(t1, t2):
-    """This function adds together two provided time values and returns the resulting sum."""
+    """This function adds together two provided time values and returns the resulting sum. Sums past midnight are not wrapped around."""
     #Space complexity: O(1)
     #Time complexity: O(1)
     
-    hours=(t1.hour+t2.hour+int((t1.minute+t2.minute)/60))%24
-    minutes=((t1.minute+t2.minute)%60+int((t1.second+t2.second)/60))%60
-    seconds=(t1.second+t2.second)%60
-    new_time=time(hours, minutes, seconds)
-    return new_time
+    return t1+t2
 
 def subtract_times(t1, t2):
     """This function subtracts one provided time value from another and returns the resulting dfference."""
     #Space complexity: O(1)
     #Time complexity: O(1)
     
-    t1_seconds=t1.hour*3600+t1.minute*60+t1.second
-    t2_seconds=t2.hour*3600+t2.minute*60+t2.second
-    new_seconds=t1_seconds-t2_seconds
-    hours=int(new_seconds/3600)
-    minutes=int((new_seconds%3600)/60)
-    seconds=(new_seconds%60)
-    new_time=time(hours, minutes, seconds)
-    return new_time
+    return t1-t2
 
 def calc_time(dist, speed_mph):
-    """This function calculates how long it takes to travel a specified distance (in miles) at the specified speed (in mph) and returns the calculated time."""
+    """This function calculates how long it takes to travel a specified distance (in miles) at the specified speed (in mph) and returns the calculated time, rounded to the nearest second."""
     #Space complexity: O(1)
     #Time complexity: O(1)
     
-    elapsed_secs=dist/speed_mph*3600
-    hours=int(elapsed_secs/3600)
-    minutes=int((elapsed_secs%3600)/60)
-    seconds=round(elapsed_secs%60)
-    if seconds==60:
-        minutes+=1
-        seconds=0
-    elapsed_time=time(hours, minutes, seconds)
-    return elapsed_time
+    return round(dist/speed_mph*3600)